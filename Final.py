@@ -1,275 +1,310 @@
-import streamlit as st
-from datetime import datetime
-
-# --- Default Values for Inputs (for Reset functionality) ---
-DEFAULT_VALUES = {
-    "selling_price_inr": 500.0,
-    "selected_material": "PLA",
-    "material_spool_cost_inr": 1200.0,
-    "material_used_grams": 50.0,
-    "print_duration_hours": 3.0,
-    "printer_wattage_p1s": 180,
-    "electricity_cost_per_kwh_inr": 7.0,
-    "include_labor": "No",
-    "labor_hours": 0.5,
-    "labor_hourly_rate_inr": 150.0,
-    "other_costs_per_print_inr": 20.0,
+import os
+import sys
+import time
+import numpy as np
+from datetime import datetime, timedelta
+
+from cost_engine import DEFAULT_VALUES
+from cost_graph import IncrementalCostModel
+from instrumentation import count, profile_mode, registry, run_profiled, start_exporters, timer
+from job_batch import PrintJob, QuoteResult
+from material_catalog import load_material_catalog
+from quote_cache import quote_cache
+from quote_history import get_quote_history
+from risk_analysis import DEFAULT_SAMPLES, RiskSpec, simulate_job
+from slicer_import import SLICER_ERRORS, import_upload, match_material
+from sweep import SWEEP_FIELDS, break_even_contour, downsample, sweep_grid
+from tariff import FLAT_TARIFF, load_tariffs
+from theme_css import get_base_css, get_theme_css
+
+# --- Supported Materials (from the material catalog, loaded once per process) ---
+MATERIAL_CATALOG = load_material_catalog()
+MATERIALS_LIST = MATERIAL_CATALOG.names
+
+# --- Electricity tariffs (flat rate from the form, or a named time-of-use schedule) ---
+TARIFFS = load_tariffs()
+TARIFF_OPTIONS = [FLAT_TARIFF] + list(TARIFFS)
+
+# --- Monte Carlo risk inputs (percentages in the UI, fractions in RiskSpec) ---
+RISK_DEFAULTS = {
+    "risk_enabled": False,
+    "risk_grams_tol_pct": 10.0,
+    "risk_hours_tol_pct": 10.0,
+    "risk_wattage_tol_pct": 10.0,
+    "risk_tariff_tol_pct": 0.0,
+    "risk_failure_rate_pct": 5.0,
+    "risk_distribution": "normal",
+    "risk_samples": DEFAULT_SAMPLES,
 }
-
-# --- Supported Materials ---
-MATERIALS_LIST = [
-    "PLA", "PETG", "ABS", "ASA", "TPU (Flexible)",
-    "PC (Polycarbonate)", "Nylon", "PVA (Support)", "Other (Manual Input)"
-]
+RISK_SAMPLE_OPTIONS = [100_000, 250_000, 500_000, 1_000_000, 2_000_000]
+
+# --- Scaling mode (PRINTCALC_SCALING=1, for many concurrent sessions) ---
+# The theme toggle, sweep and history run as st.fragment, so a click inside one of them reruns just that
+# part instead of the CSS, form and everything else. The results card has no widgets of its own, so it stays
+# part of the full rerun. Sessions also never keep the sweep's cost model between reruns (see
+# SWEEP_MODEL_MAX_POINTS for the default mode). Materials, tariffs and CSS are process-wide already:
+# module-level constants and lru_caches shared by every session.
+SCALING_MODE = os.environ.get("PRINTCALC_SCALING", "") not in ("", "0")
+
+# --- Streamlit is imported lazily ---
+# Importing streamlit costs ~300 ms, so scripts, workers and the `price` CLI that import this module only
+# pay for it when the UI actually runs. All UI functions below use this module-level `st`.
+st = None
+
+def load_streamlit():
+    global st
+    if st is None:
+        import streamlit
+        st = streamlit
+    return st
 
 # --- Function to initialize or reset session state for inputs ---
+# Keyed widgets keep their own state and ignore `value=`/`index=` after the first render, so a reset has to
+# drop them too or they'd keep showing (and writing back) the old values
+INPUT_WIDGET_KEYS = (
+    "mat_sel_stable", "tariff_sel_stable", "sp_stable", "mat_gram_stable", "pdh_stable", "msc_stable", "pwp_stable",
+    "psd_stable", "pst_stable", "ecpk_stable", "il_stable", "lh_stable", "lhr_stable", "ocp_stable",
+    "risk_on_stable", "rgt_stable", "rht_stable", "rwt_stable", "rtt_stable", "rfr_stable", "rdist_stable",
+    "rsamp_stable",
+)
+
 def initialize_input_state(force_reset=False):
+    if force_reset:
+        for widget_key in INPUT_WIDGET_KEYS:
+            st.session_state.pop(widget_key, None)
     for key, value in DEFAULT_VALUES.items():
         if force_reset or key not in st.session_state:
             st.session_state[key] = value
-    if 'selected_material' not in st.session_state or st.session_state.selected_material not in MATERIALS_LIST:
+    if 'selected_material' not in st.session_state or st.session_state.selected_material not in MATERIAL_CATALOG:
         st.session_state.selected_material = DEFAULT_VALUES['selected_material']
+    # Tariff and print start are UI-only (bulk pricing takes them per run/row), so they live outside DEFAULT_VALUES
+    if force_reset or st.session_state.get('tariff_name') not in TARIFF_OPTIONS:
+        st.session_state.tariff_name = FLAT_TARIFF
+    if force_reset or 'print_start_date' not in st.session_state:
+        next_hour = (datetime.now() + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+        st.session_state.print_start_date = next_hour.date()
+        st.session_state.print_start_time = next_hour.time()
+    for key, value in RISK_DEFAULTS.items():
+        if force_reset or key not in st.session_state:
+            st.session_state[key] = value
+
+# --- Prefill spool cost and printer power when the material changes ---
+def apply_material_defaults(material=None):
+    record = MATERIAL_CATALOG.get(material or st.session_state.mat_sel_stable)
+    st.session_state.selected_material = record.name
+    st.session_state.material_spool_cost_inr = record.spool_cost_inr
+    st.session_state.printer_wattage_p1s = record.printer_wattage
+    # Drop the form widgets' own state so they re-render from the values above
+    for widget_key in ("msc_stable", "pwp_stable"):
+        st.session_state.pop(widget_key, None)
+
+# --- Fill grams / hours (and material, when recognised) from an uploaded slicer file ---
+def apply_slicer_file():
+    upload = st.session_state.slicer_upload_stable
+    if upload is None:
+        st.session_state.pop('slicer_import_message', None)
+        return
+    try:
+        estimate = import_upload(upload.getvalue(), upload.name)
+    except SLICER_ERRORS as exc:
+        st.session_state.slicer_import_message = ("error", f"Couldn't read {upload.name}: {exc}")
+        return
+    st.session_state.material_used_grams = round(estimate.grams, 2)
+    st.session_state.print_duration_hours = round(estimate.hours, 2)
+    for widget_key in ("mat_gram_stable", "pdh_stable"):
+        st.session_state.pop(widget_key, None)
+    material = match_material(estimate.material, MATERIAL_CATALOG)
+    if material:
+        apply_material_defaults(material)
+        st.session_state.pop('mat_sel_stable', None)
+    st.session_state.slicer_import_message = ("success", (
+        f"{estimate.slicer}: {estimate.grams:,.2f} g over {estimate.hours:,.2f} h"
+        + (f", {estimate.material}" if estimate.material else "")
+    ))
+
+# The function itself outside scaling mode (or on a Streamlit without st.fragment). This script is re-executed
+# on every rerun, so the functions and their wrappers are recreated each time, just as an @st.fragment
+# decorator here would be; Streamlit keys fragments by their position in the page, not the function object.
+def as_fragment(fn):
+    if not SCALING_MODE or not hasattr(st, "fragment"):
+        return fn
+    return st.fragment(fn)
+
+# --- What-if sweep (one vectorized pricing call for the whole grid) ---
+SWEEP_DISPLAY_POINTS = 60
+# Outside scaling mode a session keeps its sweep's IncrementalCostModel, so re-sweeping over the same inputs
+# only recomputes what changed, but only for grids up to this many points: the model holds ~16 B per point
+# (~4 MB at 500x500). Bigger grids get a throwaway model and any kept one is dropped, so no session holds
+# a full-resolution 1000x1000 grid.
+SWEEP_MODEL_MAX_POINTS = 250_000
+
+def render_sweep_section():
+    import altair as alt
+    import pandas as pd
+
+    fields = list(SWEEP_FIELDS)
+    with st.expander("📈 What-if Sweep", expanded=False):
+        with st.form(key="sweep_form_stable"):
+            x_col, y_col = st.columns(2)
+            with x_col:
+                x_field = st.selectbox("Vary (X axis)", fields, index=fields.index("selling_price_inr"),
+                                       format_func=SWEEP_FIELDS.get, key="sweep_x_stable")
+                x_range = st.slider("X range (% of current value)", 0, 300, (50, 150), step=5, key="sweep_xr_stable")
+            with y_col:
+                y_choice = st.selectbox("Against (Y axis)", ["none"] + fields, index=1 + fields.index("material_used_grams"),
+                                        format_func=lambda f: SWEEP_FIELDS.get(f, "— none —"), key="sweep_y_stable")
+                y_field = None if y_choice == "none" else y_choice
+                y_range = st.slider("Y range (% of current value)", 0, 300, (50, 150), step=5, key="sweep_yr_stable")
+            metric = st.radio("Show", ("profit", "profit_margin"), horizontal=True, key="sweep_metric_stable",
+                              format_func=lambda m: "Profit (₹)" if m == "profit" else "Margin (%)")
+            steps = st.number_input("Grid resolution (points per axis)", min_value=10, max_value=1000, value=200, step=10, key="sweep_steps_stable")
+            run_sweep = st.form_submit_button("Run Sweep")
+
+        if not run_sweep:
+            return
+        if y_field == x_field:
+            st.warning("Pick two different inputs for the X and Y axes.")
+            return
+
+        base_inputs = {key: st.session_state[key] for key in DEFAULT_VALUES}
+
+        def sweep_values(field, pct_range):
+            current = float(base_inputs[field]) or 1.0
+            return np.linspace(current * pct_range[0] / 100, current * pct_range[1] / 100, int(steps))
+
+        x_values = sweep_values(x_field, x_range)
+        y_values = sweep_values(y_field, y_range) if y_field else None
+        started = time.perf_counter()
+        if SCALING_MODE or len(x_values) * (len(y_values) if y_field else 1) > SWEEP_MODEL_MAX_POINTS:
+            st.session_state.pop("sweep_model", None)
+            sweep_model = IncrementalCostModel()
+        else:
+            sweep_model = st.session_state.setdefault("sweep_model", IncrementalCostModel())
+        grid = sweep_grid(base_inputs, x_field, x_values, y_field, y_values, model=sweep_model)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"Priced {grid['profit'].size:,} scenarios in {elapsed_ms:.1f} ms.")
+
+        x_title = SWEEP_FIELDS[x_field]
+        metric_title = "Profit (₹)" if metric == "profit" else "Margin (%)"
+        if y_field is None:
+            line_df = pd.DataFrame({"x": grid["x_values"], "value": grid[metric][0]})
+            line = alt.Chart(line_df).mark_line().encode(x=alt.X("x:Q", title=x_title), y=alt.Y("value:Q", title=metric_title))
+            zero = alt.Chart(pd.DataFrame({"value": [0.0]})).mark_rule(strokeDash=[4, 4]).encode(y="value:Q")
+            st.altair_chart(line + zero, use_container_width=True)
+            return
+
+        shown = downsample(grid, SWEEP_DISPLAY_POINTS)
+        xs, ys = shown["x_values"], shown["y_values"]
+        x_step = (xs[1] - xs[0]) if len(xs) > 1 else 1.0
+        y_step = (ys[1] - ys[0]) if len(ys) > 1 else 1.0
+        xx, yy = np.meshgrid(xs, ys)
+        heat_df = pd.DataFrame({
+            "x": xx.ravel(), "x2": xx.ravel() + x_step, "y": yy.ravel(), "y2": yy.ravel() + y_step,
+            "value": shown[metric].ravel(),
+        })
+        heatmap = alt.Chart(heat_df).mark_rect().encode(
+            x=alt.X("x:Q", title=x_title), x2="x2:Q", y=alt.Y("y:Q", title=SWEEP_FIELDS[y_field]), y2="y2:Q",
+            color=alt.Color("value:Q", title=metric_title, scale=alt.Scale(scheme="redyellowgreen", domainMid=0)),
+            tooltip=[alt.Tooltip("x:Q", title=x_title, format=",.2f"),
+                     alt.Tooltip("y:Q", title=SWEEP_FIELDS[y_field], format=",.2f"),
+                     alt.Tooltip("value:Q", title=metric_title, format=",.2f")],
+        )
+        contour_x, contour_y = break_even_contour(grid)
+        contour_df = pd.DataFrame({"x": contour_x, "y": contour_y}).dropna()
+        contour = alt.Chart(contour_df).mark_line(color="black", strokeWidth=2).encode(x="x:Q", y="y:Q")
+        st.altair_chart(heatmap + contour, use_container_width=True)
+        st.caption("Black line: break-even (zero profit).")
+
+# --- Quote history browser ---
+def render_history_section():
+    with st.expander("🗂️ Quote History", expanded=False):
+        with st.form(key="history_form_stable"):
+            hist_col1, hist_col2, hist_col3 = st.columns(3)
+            with hist_col1:
+                material = st.selectbox("Material", ["All"] + MATERIALS_LIST, key="hist_mat_stable")
+            with hist_col2:
+                max_margin = st.number_input("Margin below (%)", value=100.0, step=5.0, format="%.1f", key="hist_margin_stable")
+            with hist_col3:
+                days = st.number_input("Last N days", min_value=1, value=30, step=1, key="hist_days_stable")
+            show = st.form_submit_button("Show Quotes")
+        if not show:
+            return
+        quotes = get_quote_history().query(
+            material=None if material == "All" else material,
+            since=datetime.now() - timedelta(days=int(days)), max_margin=max_margin, limit=500,
+        )
+        if not quotes:
+            st.info("No saved quotes match these filters.")
+            return
+        st.caption(f"Showing the {len(quotes):,} most recent matching quotes (max 500).")
+        st.dataframe(quotes, use_container_width=True, hide_index=True)
+
+# --- Results card (metrics + cost breakdown for the last calculated quote) ---
+def render_results_card():
+    with timer("app.results"):
+        quote_job, quote = st.session_state.quote_job, st.session_state.quote_result
+        st.markdown("<div class='custom-hr'></div>", unsafe_allow_html=True)
+        with st.container():
+            st.markdown("<div class='card-container results-output'>", unsafe_allow_html=True)
+            st.markdown("<h2>📊 PROFITABILITY ANALYSIS</h2>", unsafe_allow_html=True)
+        
+            res_col1, res_col2, res_col3 = st.columns(3)
+            with res_col1: st.metric(label="Target Selling Price", value=f"₹{quote_job.selling_price_inr:,.2f}")
+            with res_col2: st.metric(label="Estimated Total Cost", value=f"₹{quote.total_cost:,.2f}")
+            with res_col3:
+                delta_val = f"{quote.profit_margin:,.1f}%"
+                profit_val = quote.profit
+                profit_label = "Estimated Profit" if profit_val >=0 else "Estimated Loss"
+                st.metric(label=profit_label, value=f"₹{profit_val:,.2f}", delta=delta_val, 
+                          delta_color="normal" if profit_val >=0 else "inverse")
+            risk = st.session_state.get('quote_risk')
+            if risk:
+                risk_col1, risk_col2, risk_col3 = st.columns(3)
+                with risk_col1: st.metric(label="Expected Profit (simulated)", value=f"₹{risk['expected_profit']:,.2f}", delta=f"{risk['expected_margin']:,.1f}%",
+                                          delta_color="normal" if risk['expected_profit'] >= 0 else "inverse")
+                with risk_col2: st.metric(label="Profit Range (P5 – P95)", value=f"₹{risk['profit_p5']:,.0f} – ₹{risk['profit_p95']:,.0f}")
+                with risk_col3: st.metric(label="Probability of Loss", value=f"{risk['prob_loss']:.1%}")
+                st.caption(f"Monte Carlo over {risk['samples']:,} samples of material, time, power and rate drift plus failed-print reprints.")
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        with st.container():
+            st.markdown("<div class='card-container cost-details'>", unsafe_allow_html=True)
+            st.markdown("<h3>📋 Detailed Cost Breakdown</h3>", unsafe_allow_html=True)
+            st.markdown(f"""
+            <div class="cost-breakdown">
+                <ul>
+                    <li>Material Cost ({quote_job.selected_material}): <span><strong>₹{quote.material_cost:,.2f}</strong></span></li>
+                    <li>Electricity Cost ({st.session_state.quote_tariff_name}, avg ₹{quote_job.electricity_cost_per_kwh_inr:,.2f}/kWh): <span><strong>₹{quote.electricity_cost:,.2f}</strong></span></li>
+                    <li>Labor Cost: <span><strong>₹{quote.labor_cost:,.2f}</strong> (Accounted for: {quote_job.include_labor})</span></li>
+                    <li>Other Per-Print Costs: <span><strong>₹{quote.other_costs:,.2f}</strong></span></li>
+                </ul>
+            </div>
+            """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+# --- Theme toggle (the theme CSS is rendered here, so in scaling mode a toggle only reruns this fragment) ---
+def toggle_theme():
+    st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
+    if not SCALING_MODE and 'results_calculated' in st.session_state: del st.session_state['results_calculated']
 
-# --- CSS Definitions ---
-def get_css(theme_mode):
-    common_font_family = "'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif"
-    brand_color_light = "#D92E2E"  # Strong, clear Red for 3Idiots (Light theme)
-    brand_color_dark = "#FF6B6B"   # Brighter, vibrant Red for 3Idiots (Dark theme)
-
-    if theme_mode == 'light':
-        css_vars = f"""
-            --bg-color: #FFFFFF; /* Pure White for max brightness */
-            --card-bg-color: #F8F9FA; /* Very light grey for cards, distinct from pure white bg */
-            --text-primary: #181C20; /* Very dark, almost black for high contrast */
-            --text-secondary: #525860; /* Clear medium-dark grey */
-            --accent-primary: #007AFF; /* Classic, strong Blue */
-            --accent-secondary: {brand_color_light};
-            --border-color: #DDE2E7; /* Softer, but clear border */
-            --input-bg: #FFFFFF;
-            --input-text: #181C20; /* Ensure input text is dark */
-            --input-border: #BCCCDC; /* Clearer input border */
-            --success-text: #28A745;
-            --shadow-soft: 0 2px 8px rgba(0, 0, 0, 0.06); /* Softer, cleaner shadow */
-            --shadow-medium: 0 4px 12px rgba(0, 0, 0, 0.08);
-            --button-primary-bg: {brand_color_light};
-            --button-primary-text: #FFFFFF;
-            --button-primary-hover-bg: #B82222; /* Darken red */
-            --button-secondary-bg: #E9ECEF; /* Light grey button */
-            --button-secondary-text: #343A40; /* Dark text on light grey button */
-            --button-secondary-hover-bg: #DDE2E7;
-            --theme-button-bg: #F8F9FA;
-            --theme-button-text: var(--accent-primary);
-            --theme-button-border: var(--accent-primary);
-            --theme-button-hover-bg: #E2E6EA;
-            --selectbox-dropdown-bg: #FFFFFF;
-            --selectbox-dropdown-text: var(--text-primary);
-            --selectbox-dropdown-hover-bg: #F0F2F6;
-        """
-    else: # Dark Theme
-        css_vars = f"""
-            --bg-color: #0F172A; /* Deep Navy */
-            --card-bg-color: #1E293B; /* Dark Slate Blue */
-            --text-primary: #E2E8F0; /* Bright Off-white */
-            --text-secondary: #94A3B8; /* Soft Light Grey */
-            --accent-primary: #38BDF8; /* Vibrant Sky Blue */
-            --accent-secondary: {brand_color_dark};
-            --border-color: #334155; /* Mid-dark border */
-            --input-bg: #0F172A; /* Match main bg for seamless look */
-            --input-text: #E2E8F0; /* Ensure input text is light */
-            --input-border: #4A5569; /* Clearer input border for dark */
-            --success-text: #6EE7B7; /* Bright Mint Green */
-            --shadow-soft: 0 2px 8px rgba(0, 0, 0, 0.15);
-            --shadow-medium: 0 4px 12px rgba(0, 0, 0, 0.25);
-            --button-primary-bg: {brand_color_dark};
-            --button-primary-text: #0F172A; /* Dark text on bright button */
-            --button-primary-hover-bg: #FF4A4A; /* Brighter red on hover */
-            --button-secondary-bg: #334155; /* Darker grey button */
-            --button-secondary-text: var(--text-primary);
-            --button-secondary-hover-bg: #4A5569;
-            --theme-button-bg: var(--card-bg-color);
-            --theme-button-text: var(--accent-primary);
-            --theme-button-border: var(--accent-primary);
-            --theme-button-hover-bg: var(--input-bg);
-            --selectbox-dropdown-bg: #1E293B;
-            --selectbox-dropdown-text: var(--text-primary);
-            --selectbox-dropdown-hover-bg: #334155;
-        """
-
-    css = f"""
-<style>
-:root {{
-    {css_vars}
-}}
-/* --- Base App Styling --- */
-body {{ margin: 0; font-family: {common_font_family}; line-height: 1.65; /* Improved line height */ }}
-.stApp {{
-    background-color: var(--bg-color);
-    color: var(--text-primary);
-}}
-
-/* --- Headers & Titles --- */
-h1 {{
-    color: var(--accent-secondary); /* Brand Color */
-    text-align: center; font-weight: 700; /* Slightly less bold than 800 for stability */
-    margin-bottom: 0.35rem; letter-spacing: -0.03em;
-    font-size: 2.4em; padding-top: 1.2rem;
-}}
-.sub-title {{
-    color: var(--text-secondary);
-    text-align: center; font-size: 1.1em; margin-bottom: 2rem; font-weight: 400;
-}}
-h2 {{ /* Section Headers */
-    color: var(--accent-primary);
-    font-size: 1.7em; font-weight: 600; /* Balanced weight */
-    border-bottom: 2px solid var(--accent-primary);
-    padding-bottom: 10px; margin-top: 35px; margin-bottom: 25px;
-}}
-h3 {{ /* Input Group Headers */
-    color: var(--text-primary);
-    font-size: 1.2em; font-weight: 600; margin-top: 22px; margin-bottom: 16px;
-    border-left: 3px solid var(--accent-secondary); /* Thinner, cleaner brand accent */
-    padding-left: 12px;
-}}
-
-/* --- Containers & Cards --- */
-.main-container-wrapper {{ padding: 0 1rem; max-width: 1100px; margin: 0 auto; }} /* Slightly narrower */
-.card-container {{
-    background-color: var(--card-bg-color);
-    padding: 28px 32px; border-radius: 10px; /* Standard rounding */
-    box-shadow: var(--shadow-medium);
-    margin-bottom: 30px;
-    border: 1px solid var(--border-color);
-}}
-.card-container h2 {{ margin-top: 0; }}
-
-/* --- Metric Styling --- */
-div[data-testid="stMetric"] {{
-    background-color: var(--card-bg-color);
-    border: 1px solid var(--border-color);
-    border-left: 4px solid var(--accent-primary); /* Slightly thinner accent */
-    border-radius: 8px; padding: 18px; /* Balanced padding */
-    box-shadow: var(--shadow-soft);
-}}
-div[data-testid="stMetric"] > label[data-testid="stMetricLabel"] > div {{
-    font-weight: 500; /* Less aggressive weight */
-    color: var(--accent-primary) !important; /* Ensure Streamlit doesn't override with less contrast */
-    text-transform: uppercase; font-size: 0.8em; letter-spacing: 0.04em;
-}}
-div[data-testid="stMetric"] p {{ /* Metric value */
-    color: var(--text-primary) !important; /* Ensure visibility */
-    font-size: 1.9em; font-weight: 600; /* Strong, but not overly bold */
-}}
-div[data-testid="stMetric"] div[data-testid="stMetricDelta"] {{
-    color: var(--text-secondary) !important;
-    font-size: 0.9em; font-weight: 500;
-}}
-
-/* --- Input Widget Styling (CRITICAL FOR VISIBILITY) --- */
-.stTextInput label, .stNumberInput label, .stRadio label, .stSelectbox label {{
-    color: var(--text-primary) !important; /* CRITICAL: High contrast labels */
-    font-weight: 500; font-size: 0.95em; margin-bottom: 6px; display: inline-block;
-}}
-/* Input fields themselves */
-div[data-testid="stNumberInput"] input, 
-div[data-testid="stTextInput"] input, 
-div[data-testid="stSelectbox"] div[data-baseweb="select"] > div {{
-    background-color: var(--input-bg) !important;
-    color: var(--input-text) !important; /* CRITICAL: High contrast input text */
-    border: 1px solid var(--input-border) !important;
-    border-radius: 6px; padding: 10px;
-    transition: border-color 0.2s ease, box-shadow 0.2s ease;
-}}
-/* Focus state for inputs */
-div[data-testid="stNumberInput"] input:focus, 
-div[data-testid="stTextInput"] input:focus, 
-div[data-testid="stSelectbox"] div[data-baseweb="select"] > div:focus-within {{
-    border-color: var(--accent-secondary) !important;
-    box-shadow: 0 0 0 2px var(--accent-secondary) !important; /* Use box-shadow for outline effect */
-}}
-/* Selectbox dropdown items (CRITICAL FOR VISIBILITY) */
-div[data-baseweb="popover"] ul li {{
-    background-color: var(--selectbox-dropdown-bg) !important;
-    color: var(--selectbox-dropdown-text) !important; /* CRITICAL */
-}}
-div[data-baseweb="popover"] ul li:hover {{
-    background-color: var(--selectbox-dropdown-hover-bg) !important;
-}}
-/* Radio button option text (CRITICAL FOR VISIBILITY) */
-div[data-testid="stRadio"] label span {{
-    font-size: 0.95em;
-    color: var(--input-text) !important; /* CRITICAL */
-    padding-left: 4px; /* Space from radio circle */
-}}
-
-
-/* --- Button Styling (CRITICAL FOR VISIBILITY) --- */
-.stButton>button {{
-    border-radius: 6px; padding: 10px 18px; font-weight: 500; /* Balanced weight */
-    font-size: 0.95em;
-    transition: all 0.2s ease-in-out; border: none;
-    box-shadow: var(--shadow-soft);
-    line-height: 1.5;
-}}
-.stButton>button:hover {{
-    transform: translateY(-1px); /* Subtle hover */
-    box-shadow: var(--shadow-medium);
-}}
-.stButton>button.primary-action {{ /* Used for Calculate button via CSS */
-    background-color: var(--button-primary-bg); color: var(--button-primary-text) !important; /* CRITICAL text color */
-}}
-.stButton>button.primary-action:hover {{ background-color: var(--button-primary-hover-bg); }}
-
-.stButton>button.secondary-action {{ /* Used for Reset button via CSS */
-    background-color: var(--button-secondary-bg); color: var(--button-secondary-text) !important; /* CRITICAL text color */
-}}
-.stButton>button.secondary-action:hover {{ background-color: var(--button-secondary-hover-bg); }}
-
-/* Theme Switcher Button */
-.stButton>button.theme-button {{
-    background-color: var(--theme-button-bg); color: var(--theme-button-text) !important; /* CRITICAL text color */
-    border: 1px solid var(--theme-button-border);
-    padding: 6px 12px; font-size: 0.9em;
-}}
-.stButton>button.theme-button:hover {{ background-color: var(--theme-button-hover-bg); }}
-
-/* --- Cost Breakdown Specific --- */
-.cost-breakdown ul {{ list-style-type: none; padding-left: 0; }}
-.cost-breakdown li {{
-    padding: 10px 5px; border-bottom: 1px solid var(--border-color);
-    font-size: 1em; display: flex; justify-content: space-between; align-items: center;
-    transition: background-color 0.15s ease;
-}}
-.cost-breakdown li:hover {{ background-color: var(--card-bg-color); }} /* Subtle hover, match card for light, distinct for dark */
-.cost-breakdown li:last-child {{ border-bottom: none; }}
-.cost-breakdown strong {{
-    color: var(--success-text) !important; /* CRITICAL: Ensure success text is visible */
-    font-weight: 500; font-size: 1.05em;
-}}
-
-/* --- Horizontal Rule & Footer --- */
-.custom-hr {{
-    border: none; height: 1px;
-    background-color: var(--border-color); /* Solid, clean line */
-    margin: 35px 0;
-}}
-.footer {{
-    text-align: center; color: var(--text-secondary);
-    font-size: 0.85em; /* Slightly smaller footer */
-    padding: 20px 0; margin-top: 25px;
-    border-top: 1px solid var(--border-color);
-}}
-.footer strong {{ color: var(--accent-secondary); }}
-</style>
-"""
-    return css
+def render_theme_switcher():
+    with timer("app.theme"):
+        st.markdown(get_theme_css(st.session_state.theme), unsafe_allow_html=True)
+        theme_icon = "🌙" if st.session_state.theme == 'light' else "☀️"
+        theme_text = "Dark" if st.session_state.theme == 'light' else "Light"
+        # Apply custom class for specific styling if needed, or rely on general .stButton>button for this context
+        st.button(f"{theme_icon} {theme_text}", key="theme_switcher_stable", help=f"Switch to {theme_text} Theme", use_container_width=True, on_click=toggle_theme) # Removed type for full CSS control
 
 def run_streamlit_calculator_stable_final():
+    load_streamlit()
     if 'theme' not in st.session_state:
         st.session_state.theme = 'light'
     initialize_input_state()
 
     st.set_page_config(page_title="3D Print Profit Calculator by 3Idiots", layout="wide", initial_sidebar_state="collapsed")
-    st.markdown(get_css(st.session_state.theme), unsafe_allow_html=True)
+    with timer("app.css"):
+        st.markdown(get_base_css(), unsafe_allow_html=True)
 
     current_time = datetime.now()
 
@@ -279,22 +314,37 @@ def run_streamlit_calculator_stable_final():
             st.markdown("<h1>✨ 3D Print Profit Calculator ✨</h1>", unsafe_allow_html=True)
             st.markdown("<p class='sub-title'>by <strong>3Idiots</strong> for Smart Printing 🇮🇳</p>", unsafe_allow_html=True)
         with header_cols[1]:
-            theme_icon = "🌙" if st.session_state.theme == 'light' else "☀️"
-            theme_text = "Dark" if st.session_state.theme == 'light' else "Light"
-            # Apply custom class for specific styling if needed, or rely on general .stButton>button for this context
-            if st.button(f"{theme_icon} {theme_text}", key="theme_switcher_stable", help=f"Switch to {theme_text} Theme", use_container_width=True): # Removed type for full CSS control
-                st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
-                if 'results_calculated' in st.session_state: del st.session_state['results_calculated']
-                st.rerun()
+            as_fragment(render_theme_switcher)()
     
     st.markdown("<div class='custom-hr'></div>", unsafe_allow_html=True)
 
     st.markdown("<div class='main-container-wrapper'>", unsafe_allow_html=True)
 
-    with st.container():
+    with st.container(), timer("app.form"):
         st.markdown("<div class='card-container'>", unsafe_allow_html=True)
         st.markdown("<h2>⚙️ CONFIGURE YOUR PRINT JOB</h2>", unsafe_allow_html=True)
         
+        # Outside the form so a change can prefill the catalog defaults before the form renders
+        st.selectbox(
+            "Print Material", MATERIALS_LIST,
+            index=MATERIAL_CATALOG.index_of(st.session_state.selected_material),
+            key="mat_sel_stable", help="Choose the filament type; spool cost and printer power are prefilled from the material catalog.",
+            on_change=apply_material_defaults
+        )
+        st.session_state.tariff_name = st.selectbox(
+            "Electricity Tariff", TARIFF_OPTIONS, index=TARIFF_OPTIONS.index(st.session_state.tariff_name),
+            key="tariff_sel_stable", help="Flat rate uses the per-kWh cost below; time-of-use tariffs bill by when the print runs."
+        )
+        time_of_use = st.session_state.tariff_name != FLAT_TARIFF
+        st.file_uploader(
+            "Import from Slicer File (optional)", type=["gcode", "gco", "3mf"], key="slicer_upload_stable",
+            help="G-code or sliced 3MF; fills in material used, print duration and (if recognised) the material.",
+            on_change=apply_slicer_file
+        )
+        if 'slicer_import_message' in st.session_state:
+            level, message = st.session_state.slicer_import_message
+            (st.success if level == "success" else st.error)(message)
+
         with st.form(key="calculator_form_stable"):
             input_col1, input_col2 = st.columns(2)
             with input_col1:
@@ -303,15 +353,10 @@ def run_streamlit_calculator_stable_final():
                     "Target Selling Price (₹)", min_value=0.0,
                     value=st.session_state.selling_price_inr, step=50.0, format="%.2f", key="sp_stable"
                 )
-                st.session_state.selected_material = st.selectbox(
-                    "Print Material", MATERIALS_LIST,
-                    index=MATERIALS_LIST.index(st.session_state.selected_material),
-                    key="mat_sel_stable", help="Choose the filament type."
-                )
                 st.session_state.material_used_grams = st.number_input(
                     "Material Used (grams)", min_value=0.0,
                     value=st.session_state.material_used_grams, step=1.0, format="%.2f", key="mat_gram_stable",
-                    help="Get this from your slicer software."
+                    help="Get this from your slicer software, or import the sliced file above."
                 )
                 st.session_state.print_duration_hours = st.number_input(
                     "Print Duration (hours)", min_value=0.0,
@@ -330,11 +375,16 @@ def run_streamlit_calculator_stable_final():
                     value=st.session_state.printer_wattage_p1s, step=5,  key="pwp_stable",
                     help="P1S: ~150-250W (varies by material/settings)."
                 )
-                st.session_state.electricity_cost_per_kwh_inr = st.number_input(
-                    "Electricity Cost per kWh (₹)", min_value=0.0,
-                    value=st.session_state.electricity_cost_per_kwh_inr, step=0.10, format="%.2f", key="ecpk_stable",
-                    help="Check your local electricity tariff."
-                )
+                if time_of_use:
+                    start_date_col, start_time_col = st.columns(2)
+                    with start_date_col: st.session_state.print_start_date = st.date_input("Print Start Date", value=st.session_state.print_start_date, key="psd_stable")
+                    with start_time_col: st.session_state.print_start_time = st.time_input("Print Start Time", value=st.session_state.print_start_time, step=900, key="pst_stable", help="Electricity is billed at the tariff rates in force while the print runs.")
+                else:
+                    st.session_state.electricity_cost_per_kwh_inr = st.number_input(
+                        "Electricity Cost per kWh (₹)", min_value=0.0,
+                        value=st.session_state.electricity_cost_per_kwh_inr, step=0.10, format="%.2f", key="ecpk_stable",
+                        help="Check your local electricity tariff."
+                    )
 
             st.markdown("<h3>⏱️ Labor & Operational Overheads</h3>", unsafe_allow_html=True)
             op_costs_col1, op_costs_col2 = st.columns([0.35, 0.65])
@@ -355,6 +405,23 @@ def run_streamlit_calculator_stable_final():
                 help="Consumables, wear & tear, etc."
             )
 
+            with st.expander("🎲 Risk Analysis (Monte Carlo)", expanded=st.session_state.risk_enabled):
+                st.session_state.risk_enabled = st.checkbox(
+                    "Simulate estimate drift and failed prints", value=st.session_state.risk_enabled, key="risk_on_stable",
+                    help="Prices the job over many random variations of the inputs below and reports the spread of profit."
+                )
+                risk_col1, risk_col2, risk_col3 = st.columns(3)
+                with risk_col1:
+                    st.session_state.risk_grams_tol_pct = st.number_input("Material Used ± (%)", min_value=0.0, max_value=100.0, value=st.session_state.risk_grams_tol_pct, step=1.0, format="%.1f", key="rgt_stable")
+                    st.session_state.risk_hours_tol_pct = st.number_input("Print Duration ± (%)", min_value=0.0, max_value=100.0, value=st.session_state.risk_hours_tol_pct, step=1.0, format="%.1f", key="rht_stable")
+                with risk_col2:
+                    st.session_state.risk_wattage_tol_pct = st.number_input("Printer Power ± (%)", min_value=0.0, max_value=100.0, value=st.session_state.risk_wattage_tol_pct, step=1.0, format="%.1f", key="rwt_stable")
+                    st.session_state.risk_tariff_tol_pct = st.number_input("Electricity Rate ± (%)", min_value=0.0, max_value=100.0, value=st.session_state.risk_tariff_tol_pct, step=1.0, format="%.1f", key="rtt_stable")
+                with risk_col3:
+                    st.session_state.risk_failure_rate_pct = st.number_input("Failure Rate per Attempt (%)", min_value=0.0, max_value=90.0, value=st.session_state.risk_failure_rate_pct, step=1.0, format="%.1f", key="rfr_stable", help="A failed attempt wastes part of the material and machine time before the reprint.")
+                    st.session_state.risk_distribution = st.selectbox("Distribution", ("normal", "uniform", "triangular"), index=("normal", "uniform", "triangular").index(st.session_state.risk_distribution), key="rdist_stable", help="For normal, the ± tolerance covers ~95% of samples.")
+                st.session_state.risk_samples = st.select_slider("Samples", RISK_SAMPLE_OPTIONS, value=st.session_state.risk_samples, format_func="{:,}".format, key="rsamp_stable")
+
             st.markdown("<br>", unsafe_allow_html=True)
             form_button_cols = st.columns([0.55, 0.45])
             with form_button_cols[0]:
@@ -431,36 +498,61 @@ def run_streamlit_calculator_stable_final():
 
     # --- Post-form logic ---
     if submitted and not reset_pressed: # This logic is fine. `submitted` is true if the "Calculate" button was pressed.
-        st.session_state.results_calculated = True
-        # ... (Calculation logic as before) ...
-        selling_price = st.session_state.selling_price_inr
-        material_selected = st.session_state.selected_material
-        material_cost_per_kg = st.session_state.material_spool_cost_inr
-        material_used = st.session_state.material_used_grams
-        duration_hours = st.session_state.print_duration_hours
-        wattage = st.session_state.printer_wattage_p1s
-        elec_cost_kwh = st.session_state.electricity_cost_per_kwh_inr
-        include_labor_calc = st.session_state.include_labor
-        labor_hrs = st.session_state.labor_hours if include_labor_calc == "Yes" else 0
-        labor_rate = st.session_state.labor_hourly_rate_inr if include_labor_calc == "Yes" else 0
-        other_costs = st.session_state.other_costs_per_print_inr
-
-        cost_per_gram_material = (material_cost_per_kg / 1000) if material_cost_per_kg > 0 else 0
-        mat_cost = cost_per_gram_material * material_used
-        kwh_used = (wattage / 1000) * duration_hours
-        electricity_cost = kwh_used * elec_cost_kwh
-        labor_cost = labor_hrs * labor_rate
-        total_cost = mat_cost + electricity_cost + labor_cost + other_costs
-        profit = selling_price - total_cost
-        profit_margin = (profit / selling_price * 100) if selling_price > 0 else 0
+        with timer("app.calculate"):
+            count("app.calculations")
+            st.session_state.results_calculated = True
+            # ... (Calculation logic as before) ...
+            selling_price = st.session_state.selling_price_inr
+            material_selected = st.session_state.selected_material
+            material_cost_per_kg = st.session_state.material_spool_cost_inr
+            material_used = st.session_state.material_used_grams
+            duration_hours = st.session_state.print_duration_hours
+            wattage = st.session_state.printer_wattage_p1s
+            elec_cost_kwh = st.session_state.electricity_cost_per_kwh_inr
+            if time_of_use:
+                # Time-weighted average rate over the print, so the rest of the pipeline stays flat-rate
+                print_start = datetime.combine(st.session_state.print_start_date, st.session_state.print_start_time)
+                elec_cost_kwh = TARIFFS[st.session_state.tariff_name].effective_rate(print_start, duration_hours)
+            include_labor_calc = st.session_state.include_labor
+            labor_hrs = st.session_state.labor_hours if include_labor_calc == "Yes" else 0
+            labor_rate = st.session_state.labor_hourly_rate_inr if include_labor_calc == "Yes" else 0
+            other_costs = st.session_state.other_costs_per_print_inr
+
+            # Identical quotes (from any session) are served from the shared LRU instead of recomputed.
+            # On a miss, this session's cost graph only recomputes the components whose inputs changed.
+            cost_model = st.session_state.setdefault("cost_model", IncrementalCostModel())
+            def compute_incrementally():
+                cost_model.update(dict({key: st.session_state[key] for key in DEFAULT_VALUES}, electricity_cost_per_kwh_inr=elec_cost_kwh))
+                return cost_model.as_dict()
+            costs = quote_cache.get_or_compute(
+                material_selected, selling_price, material_cost_per_kg, material_used, duration_hours,
+                wattage, elec_cost_kwh, include_labor_calc, labor_hrs, labor_rate, other_costs,
+                compute=compute_incrementally
+            )
         
-        st.session_state.update({
-            "calc_selling_price": selling_price, "calc_total_cost": total_cost,
-            "calc_profit": profit, "calc_profit_margin": profit_margin,
-            "calc_material_cost": mat_cost, "calc_electricity_cost": electricity_cost,
-            "calc_labor_cost": labor_cost, "calc_other_costs": other_costs,
-            "calc_include_labor": include_labor_calc, "calc_material_selected": material_selected
-        })
+            # The job exactly as priced (time-of-use average rate included) and its result, as two records
+            quote_job = PrintJob.from_mapping(st.session_state)
+            quote_job.electricity_cost_per_kwh_inr = elec_cost_kwh
+            st.session_state.quote_job = quote_job
+            st.session_state.quote_result = QuoteResult.from_dict(costs)
+            st.session_state.quote_tariff_name = st.session_state.tariff_name
+            st.session_state.quote_risk = None
+            if st.session_state.risk_enabled:
+                with timer("app.risk"):
+                    risk_spec = RiskSpec(
+                        st.session_state.risk_grams_tol_pct / 100, st.session_state.risk_hours_tol_pct / 100,
+                        st.session_state.risk_wattage_tol_pct / 100, st.session_state.risk_tariff_tol_pct / 100,
+                        st.session_state.risk_failure_rate_pct / 100, st.session_state.risk_distribution,
+                    )
+                    # Fixed seed: the same inputs always show the same risk figures
+                    st.session_state.quote_risk = simulate_job(quote_job.as_dict(), risk_spec, st.session_state.risk_samples, seed=0)
+            # Queued for the background writer; never blocks the rerun on disk
+            get_quote_history().record({
+                "material": material_selected, "selling_price": selling_price, "material_spool_cost": material_cost_per_kg,
+                "material_used_grams": material_used, "print_duration_hours": duration_hours, "printer_wattage": wattage,
+                "electricity_cost_per_kwh": elec_cost_kwh, "include_labor": include_labor_calc, "labor_hours": labor_hrs,
+                "labor_hourly_rate": labor_rate, "other_costs": other_costs,
+            }, costs, created_at=current_time)
     elif reset_pressed: # This was part of the form, so if it's true, the form was submitted by it.
         initialize_input_state(force_reset=True)
         if 'results_calculated' in st.session_state: del st.session_state['results_calculated']
@@ -468,48 +560,39 @@ def run_streamlit_calculator_stable_final():
 
 
     if st.session_state.get('results_calculated', False):
-        st.markdown("<div class='custom-hr'></div>", unsafe_allow_html=True)
-        with st.container():
-            st.markdown("<div class='card-container results-output'>", unsafe_allow_html=True)
-            st.markdown("<h2>📊 PROFITABILITY ANALYSIS</h2>", unsafe_allow_html=True)
-            
-            res_col1, res_col2, res_col3 = st.columns(3)
-            with res_col1: st.metric(label="Target Selling Price", value=f"₹{st.session_state.calc_selling_price:,.2f}")
-            with res_col2: st.metric(label="Estimated Total Cost", value=f"₹{st.session_state.calc_total_cost:,.2f}")
-            with res_col3:
-                delta_val = f"{st.session_state.calc_profit_margin:,.1f}%"
-                profit_val = st.session_state.calc_profit
-                profit_label = "Estimated Profit" if profit_val >=0 else "Estimated Loss"
-                st.metric(label=profit_label, value=f"₹{profit_val:,.2f}", delta=delta_val, 
-                          delta_color="normal" if profit_val >=0 else "inverse")
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        with st.container():
-            st.markdown("<div class='card-container cost-details'>", unsafe_allow_html=True)
-            st.markdown("<h3>📋 Detailed Cost Breakdown</h3>", unsafe_allow_html=True)
-            st.markdown(f"""
-            <div class="cost-breakdown">
-                <ul>
-                    <li>Material Cost ({st.session_state.calc_material_selected}): <span><strong>₹{st.session_state.calc_material_cost:,.2f}</strong></span></li>
-                    <li>Electricity Cost: <span><strong>₹{st.session_state.calc_electricity_cost:,.2f}</strong></span></li>
-                    <li>Labor Cost: <span><strong>₹{st.session_state.calc_labor_cost:,.2f}</strong> (Accounted for: {st.session_state.calc_include_labor})</span></li>
-                    <li>Other Per-Print Costs: <span><strong>₹{st.session_state.calc_other_costs:,.2f}</strong></span></li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        render_results_card()
     elif not (submitted or reset_pressed or st.session_state.get('results_calculated', False)): # Initial state or after reset before new calc
          with st.container():
             st.markdown("<div class='card-container initial-message'>", unsafe_allow_html=True)
             st.info("ℹ️ Configure your print job parameters above and hit 'Calculate Profitability' to see the detailed analysis.")
             st.markdown("</div>", unsafe_allow_html=True)
 
+    with timer("app.sweep"):
+        as_fragment(render_sweep_section)()
+    with timer("app.history"):
+        as_fragment(render_history_section)()
+
     st.markdown("</div>", unsafe_allow_html=True)
 
     st.markdown("<div class='custom-hr'></div>", unsafe_allow_html=True)
     st.markdown(f"<div class='footer'>Engineered by <strong>3Idiots</strong> ✨ | {current_time.strftime('%B %Y')}</div>", unsafe_allow_html=True)
     st.caption("Disclaimer: All calculations are estimates. Actual costs and profits may vary.")
 
+# --- One app rerun, with the opt-in metrics / profiling from instrumentation.py ---
+def run_app():
+    start_exporters()
+    registry.gauge("quote_cache", quote_cache.stats)
+    count("app.reruns")
+    with timer("app.rerun"):
+        mode = profile_mode()
+        if mode:
+            run_profiled(run_streamlit_calculator_stable_final, mode, label="rerun")
+        else:
+            run_streamlit_calculator_stable_final()
+
 if __name__ == "__main__":
-    run_streamlit_calculator_stable_final()
\ No newline at end of file
+    # `python Final.py price <jobs.csv|jobs.jsonl> ...` prices an export headlessly; otherwise run the app.
+    if len(sys.argv) > 1 and sys.argv[1] == "price":
+        from bulk_pricing import main as bulk_pricing_main
+        sys.exit(bulk_pricing_main(sys.argv[2:]))
+    run_app()
\ No newline at end of file
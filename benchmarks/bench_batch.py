@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import calculate_costs, price_batch
+
+# --- Batch engine vs. per-job Python loop ---
+# Usage: python benchmarks/bench_batch.py --rows 50000
+
+def make_jobs(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "selling_price": rng.uniform(0, 2000, rows),
+        "material_spool_cost": rng.uniform(0, 4000, rows),
+        "material_used_grams": rng.uniform(1, 1000, rows),
+        "print_duration_hours": rng.uniform(0.1, 48, rows),
+        "printer_wattage": rng.integers(100, 350, rows).astype(np.float64),
+        "electricity_cost_per_kwh": rng.uniform(3, 12, rows),
+        "labor_hours": rng.uniform(0, 2, rows),
+        "labor_hourly_rate": rng.uniform(0, 300, rows),
+        "other_costs": rng.uniform(0, 100, rows),
+    }
+
+def run_loop(jobs):
+    columns = [jobs[name].tolist() for name in jobs]
+    return [calculate_costs(*row) for row in zip(*columns)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vectorized batch pricing with a scalar Python loop.")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.rows)
+
+    loop_best = min(_timed(run_loop, jobs) for _ in range(args.repeat))
+    batch_best = min(_timed(lambda j: price_batch(**j), jobs) for _ in range(args.repeat))
+
+    # Both paths must agree before the numbers mean anything
+    scalar = run_loop(jobs)
+    batch = price_batch(**jobs)
+    for key in ("total_cost", "profit", "profit_margin"):
+        expected = np.array([row[key] for row in scalar])
+        if not np.allclose(batch[key], expected, rtol=1e-12, atol=1e-9):
+            raise SystemExit(f"Mismatch in {key} between batch and scalar results")
+
+    print(f"rows:        {args.rows:,}")
+    print(f"python loop: {loop_best * 1000:9.2f} ms  ({args.rows / loop_best:,.0f} rows/s)")
+    print(f"vectorized:  {batch_best * 1000:9.2f} ms  ({args.rows / batch_best:,.0f} rows/s)")
+    print(f"speedup:     {loop_best / batch_best:9.1f}x")
+
+def _timed(fn, jobs):
+    start = time.perf_counter()
+    fn(jobs)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import theme_css
+from theme_css import get_base_css, get_css, get_theme_css
+
+# --- Theme CSS: rebuilt every rerun (before) vs. cached per process (after) ---
+# Usage: python benchmarks/bench_css.py [--reruns 50]
+#
+# --reruns also times full app reruns through AppTest, plain and with a theme toggle, once with the cached
+# builders and once with them swapped for their uncached __wrapped__ versions (Final.py re-imports them from
+# theme_css on every rerun, so the swap takes effect). A build is well under a microsecond against tens of
+# milliseconds per rerun, so expect the two to differ by less than run-to-run noise. AppTest always reruns the
+# whole script, so the toggle timings are full reruns; in scaling mode a real toggle reruns only the theme
+# fragment and resends only the ~1.6 KB variables block.
+
+def build_uncached(theme):
+    return get_theme_css.__wrapped__(theme) + get_base_css.__wrapped__()
+
+def time_per_call(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn("light" if i % 2 else "dark")
+    return (time.perf_counter() - start) / calls
+
+@contextlib.contextmanager
+def uncached_css():
+    saved = theme_css.get_theme_css, theme_css.get_base_css
+    theme_css.get_theme_css, theme_css.get_base_css = get_theme_css.__wrapped__, get_base_css.__wrapped__
+    try:
+        yield
+    finally:
+        theme_css.get_theme_css, theme_css.get_base_css = saved
+
+def time_reruns(reruns, toggle=False):
+    # Full script reruns through Streamlit's test harness; needs streamlit installed
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "Final.py"), default_timeout=30).run()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        if toggle:
+            app.button(key="theme_switcher_stable").click()
+        app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return (time.perf_counter() - start) / reruns
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure theme CSS generation and per-rerun cost.")
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--reruns", type=int, default=0, help="Also time full app reruns via AppTest.")
+    args = parser.parse_args()
+
+    uncached = time_per_call(build_uncached, args.calls)
+    cached = time_per_call(get_css, args.calls)
+    print(f"get_css rebuilt each rerun: {uncached * 1e6:8.2f} us/call")
+    print(f"get_css cached:             {cached * 1e6:8.2f} us/call  ({uncached / cached:,.0f}x faster)")
+    print(f"stylesheet payload:         {len(get_base_css()):,} B shared + {len(get_theme_css('light')):,} B per theme")
+
+    if args.reruns:
+        for label, toggle in (("app rerun", False), ("theme toggle", True)):
+            with uncached_css():
+                before = time_reruns(args.reruns, toggle)
+            after = time_reruns(args.reruns, toggle)
+            print(f"{label + ' (AppTest):':<28}{before * 1000:8.2f} ms uncached -> {after * 1000:8.2f} ms cached "
+                  f"({(before - after) * 1000:.2f} ms saved per rerun)")
+
+if __name__ == "__main__":
+    main()
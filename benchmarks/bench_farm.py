@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from farm_simulator import FarmJob, Printer, simulate
+from tariff import TariffSchedule
+
+# --- Farm simulator: scheduling + pricing throughput ---
+# Usage: python benchmarks/bench_farm.py --jobs 100000 --printers 100
+
+MATERIALS = ["PLA", "PETG", "ABS", "ASA", "TPU (Flexible)"]
+TOU_TARIFF = TariffSchedule([0, 6, 18, 22], [5.0, 7.5, 10.0, 7.5])  # night / day / evening peak / late
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a print farm simulation.")
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--printers", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    materials = rng.integers(0, len(MATERIALS), args.jobs)
+    jobs = [FarmJob(n, MATERIALS[m], g, h, p, priority=int(pr))
+            for n, (m, g, h, p, pr) in enumerate(zip(materials, rng.uniform(5, 500, args.jobs),
+                                                     rng.uniform(0.2, 24, args.jobs), rng.uniform(100, 3000, args.jobs),
+                                                     rng.integers(0, 5, args.jobs)))]
+    printers = [Printer(f"P{i}", rng.uniform(150, 260), material=MATERIALS[i % len(MATERIALS)])
+                for i in range(args.printers)]
+
+    start = time.perf_counter()
+    report = simulate(jobs, printers, TOU_TARIFF, start_time=datetime(2026, 1, 5, 8))
+    elapsed = time.perf_counter() - start
+
+    print(f"jobs x printers: {args.jobs:,} x {args.printers}")
+    print(f"simulated in:    {elapsed:.2f}s  ({args.jobs / elapsed:,.0f} jobs/s)")
+    print(f"makespan:        {report['makespan_hours']:,.1f} h, utilization {report['mean_utilization']:.1%}, "
+          f"{report['material_swaps']:,} swaps")
+    print(f"profit:          ₹{report['total_profit']:,.0f} (energy ₹{report['energy_cost']:,.0f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import price_batch
+from quote_history import QuoteHistory
+
+# --- Quote history: batched write throughput and indexed query latency ---
+# Usage: python benchmarks/bench_history.py --rows 1000000
+
+MATERIALS = np.array(["PLA", "PETG", "ABS", "ASA", "TPU (Flexible)"])
+
+def synthetic_rows(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    now = datetime.now().timestamp()
+    created_at = now - rng.uniform(0, 365 * 86400, rows)
+    inputs = [rng.uniform(100, 2000, rows), rng.uniform(800, 4000, rows), rng.uniform(1, 1000, rows),
+              rng.uniform(0.1, 48, rows), rng.uniform(100, 350, rows), rng.uniform(3, 12, rows),
+              np.zeros(rows), np.zeros(rows), rng.uniform(0, 100, rows)]
+    results = price_batch(*inputs)
+    columns = [created_at.tolist(), MATERIALS[rng.integers(0, len(MATERIALS), rows)].tolist()]
+    columns += [col.tolist() for col in inputs[:6]] + [["No"] * rows] + [col.tolist() for col in inputs[6:]]
+    columns += [results[k].tolist() for k in ("material_cost", "electricity_cost", "labor_cost",
+                                               "total_cost", "profit", "profit_margin")]
+    return zip(*columns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure quote history write and query performance.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = QuoteHistory(os.path.join(tmp, "history.db"), batch_size=10_000)
+        start = time.perf_counter()
+        history.record_many(synthetic_rows(args.rows))
+        enqueued = time.perf_counter() - start
+        history.flush()
+        written = time.perf_counter() - start
+        print(f"rows:      {history.count():,}")
+        print(f"enqueue:   {enqueued:.2f}s  (caller-side cost)")
+        print(f"persisted: {written:.2f}s  ({args.rows / written:,.0f} rows/s)")
+
+        now = datetime.now()
+        queries = {
+            "ABS under 20% margin, last 30 days": dict(material="ABS", since=now - timedelta(days=30), max_margin=20, limit=None),
+            "latest 100 PLA quotes": dict(material="PLA", limit=100),
+            "loss-making quotes, last 7 days": dict(since=now - timedelta(days=7), max_margin=0, limit=None),
+        }
+        for label, filters in queries.items():
+            history.query(**filters)  # warm the page cache
+            start = time.perf_counter()
+            found = history.query(**filters)
+            print(f"query:     {(time.perf_counter() - start) * 1000:7.1f} ms  {len(found):>7,} rows  {label}")
+        history.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Cold-start import cost, measured with `python -X importtime` ---
+# Each module is imported in a fresh interpreter; the reported time is its cumulative import time
+# (everything it pulls in, excluding interpreter startup). Exits non-zero when a module exceeds its budget or pulls in Streamlit, so it can
+# be used as a regression gate.
+# Usage: python benchmarks/bench_import.py [--budget-scale 1.5]
+
+# module -> budget in ms (generous: CI machines are slower than dev boxes)
+MODULE_BUDGETS_MS = {
+    "cost_engine": 200,
+    "bulk_pricing": 250,
+    "pricing_service": 300,
+    "Final": 250,
+}
+NON_UI_MODULES = set(MODULE_BUDGETS_MS)  # none of these may import streamlit at import time
+
+def measure(module, runs):
+    best = None
+    imported = set()
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=ROOT, capture_output=True, text=True, check=True)
+        total_us = 0
+        imported = set()
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                imported.add(name.strip())
+                if name.strip() == module:
+                    total_us = int(cumulative)
+        best = total_us if best is None else min(best, total_us)
+    return best / 1000, imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and gate module import time.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module; the best run counts.")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget by this factor.")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<18} {'import ms':>10} {'budget ms':>10}")
+    for module, budget in MODULE_BUDGETS_MS.items():
+        elapsed_ms, imported = measure(module, args.runs)
+        budget *= args.budget_scale
+        flag = ""
+        if elapsed_ms > budget:
+            flag = "  OVER BUDGET"
+            failures.append(f"{module} took {elapsed_ms:.0f} ms (budget {budget:.0f} ms)")
+        if module in NON_UI_MODULES and "streamlit" in imported:
+            flag += "  IMPORTS STREAMLIT"
+            failures.append(f"{module} imports streamlit at import time")
+        print(f"{module:<18} {elapsed_ms:>10.1f} {budget:>10.0f}{flag}")
+
+    if failures:
+        print("\n".join(["", "FAILED:"] + failures))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
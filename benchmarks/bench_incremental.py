@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import price_columns
+from cost_graph import IncrementalCostModel
+
+# --- Incremental recomputation: full reprice vs. tariff-only update over large columns ---
+# Usage: python benchmarks/bench_incremental.py --rows 10000000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full batch reprice with an incremental tariff update.")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = {
+        "selling_price_inr": rng.uniform(100, 2000, args.rows),
+        "material_spool_cost_inr": rng.uniform(800, 4000, args.rows),
+        "material_used_grams": rng.uniform(1, 1000, args.rows),
+        "print_duration_hours": rng.uniform(0.1, 48, args.rows),
+        "printer_wattage_p1s": rng.uniform(100, 350, args.rows),
+        "electricity_cost_per_kwh_inr": rng.uniform(3, 12, args.rows),
+        "include_labor": np.where(rng.random(args.rows) < 0.5, "Yes", "No").astype(object),
+        "labor_hours": rng.uniform(0, 2, args.rows),
+    }
+    model = IncrementalCostModel(columns)
+    new_tariff = columns["electricity_cost_per_kwh_inr"] * 1.1
+
+    start = time.perf_counter()
+    full = price_columns(dict(columns, electricity_cost_per_kwh_inr=new_tariff))
+    full_s = time.perf_counter() - start
+
+    material_before = model.results["material_cost"]
+    start = time.perf_counter()
+    recomputed = model.update({"electricity_cost_per_kwh_inr": new_tariff})
+    incremental_s = time.perf_counter() - start
+
+    assert model.results["material_cost"] is material_before
+    assert np.allclose(model.results["profit"], full["profit"])
+    print(f"rows:         {args.rows:,}")
+    print(f"full reprice: {full_s * 1000:8.1f} ms")
+    print(f"tariff only:  {incremental_s * 1000:8.1f} ms  (recomputed: {', '.join(recomputed)})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import DEFAULT_VALUES
+from job_batch import JobBatch, PrintJob
+
+# --- Columnar JobBatch vs. a list of dicts: memory, slicing, save/load ---
+# Usage: python benchmarks/bench_job_batch.py --rows 10000000
+
+MATERIALS = np.array(["PLA", "PETG", "ABS", "ASA", "TPU (Flexible)"], dtype=object)
+
+def make_batch(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return JobBatch.from_columns({
+        "selling_price_inr": rng.uniform(100, 2000, rows), "selected_material": MATERIALS[rng.integers(0, 5, rows)],
+        "material_spool_cost_inr": rng.uniform(800, 4000, rows), "material_used_grams": rng.uniform(1, 1000, rows),
+        "print_duration_hours": rng.uniform(0.1, 48, rows), "printer_wattage_p1s": rng.integers(100, 350, rows),
+        "electricity_cost_per_kwh_inr": rng.uniform(3, 12, rows),
+        "include_labor": np.where(rng.random(rows) < 0.3, "Yes", "No"),
+    }, rows)
+
+# Bytes per job for the list-of-dicts layout the session state mirrors, measured on a sample
+def dict_bytes_per_job(sample):
+    tracemalloc.start()
+    jobs = [dict(DEFAULT_VALUES, selling_price_inr=float(i), material_used_grams=float(i) / 3) for i in range(sample)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del jobs
+    return size / sample
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure JobBatch memory use and file round trips.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--sample", type=int, default=200_000, help="Dicts actually built to size the dict layout.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    batch = make_batch(args.rows)
+    build = time.perf_counter() - start
+    per_dict = dict_bytes_per_job(args.sample)
+
+    # Records, slices and the scalar/batch formulas must agree
+    window = batch[1000:2000] if args.rows >= 2000 else batch[:]
+    assert np.shares_memory(window.floats["material_used_grams"], batch.floats["material_used_grams"])
+    job = window[5]
+    assert isinstance(job, PrintJob)
+    assert np.isclose(job.price().profit, window.price()["profit"][5])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.pcjobs")
+        start = time.perf_counter()
+        batch.save(path)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        mapped = JobBatch.load(path)
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        profit = mapped.price()["profit"]
+        price = time.perf_counter() - start
+        assert np.array_equal(profit, batch.price()["profit"])
+        assert mapped.materials == batch.materials
+        file_size = os.path.getsize(path)
+        del mapped, profit
+
+    print(f"rows:                 {args.rows:,} (built in {build:.2f}s)")
+    print(f"list of dicts:        {per_dict:8.1f} B/job -> {per_dict * args.rows / 2**20:10,.1f} MiB (estimated)")
+    print(f"JobBatch:             {batch.nbytes / args.rows:8.1f} B/job -> {batch.nbytes / 2**20:10,.1f} MiB "
+          f"({batch.nbytes / (per_dict * args.rows):.1%} of dicts)")
+    print(f"save:                 {save:8.2f} s ({file_size / 2**20:,.1f} MiB)")
+    print(f"load (mmap):          {load * 1000:8.2f} ms")
+    print(f"price mmapped batch:  {price:8.2f} s ({args.rows / price:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
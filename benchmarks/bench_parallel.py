@@ -0,0 +1,64 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bulk_pricing import price_stream
+
+# --- Process-pool scaling: throughput vs. worker count ---
+# Usage: python benchmarks/bench_parallel.py --rows 1000000 --workers 1 2 4 8 16 32
+
+FIELDS = ["selling_price_inr", "selected_material", "material_spool_cost_inr", "material_used_grams",
+          "print_duration_hours", "printer_wattage_p1s", "include_labor", "labor_hours"]
+
+def write_jobs_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    materials = np.array(["PLA", "PETG", "ABS", "ASA"])
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for start in range(0, rows, 100_000):
+            n = min(100_000, rows - start)
+            writer.writerows(zip(
+                rng.uniform(100, 2000, n).round(2), materials[rng.integers(0, len(materials), n)],
+                rng.uniform(800, 4000, n).round(2), rng.uniform(1, 1000, n).round(2),
+                rng.uniform(0.1, 48, n).round(2), rng.integers(100, 350, n),
+                np.where(rng.random(n) < 0.5, "Yes", "No"), rng.uniform(0, 2, n).round(2),
+            ))
+
+def run(path, workers, chunk_size):
+    with open(path, newline="", encoding="utf-8") as f:
+        start = time.perf_counter()
+        price_stream(f, _NullWriter(), "csv", "csv", chunk_size, workers)
+        return time.perf_counter() - start
+
+class _NullWriter(io.TextIOBase):
+    def write(self, s):
+        return len(s)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bulk pricing speedup against worker count.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.csv")
+        write_jobs_csv(path, args.rows)
+        print(f"rows: {args.rows:,}  chunk size: {args.chunk_size:,}  cores: {os.cpu_count()}")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            elapsed = run(path, workers, args.chunk_size)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f} {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
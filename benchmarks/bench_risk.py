@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import DEFAULT_VALUES
+from risk_analysis import CHUNK_SIZE, RiskSpec, simulate_job, simulate_jobs
+
+# --- Monte Carlo risk: samples/s, peak memory, multi-job scaling across processes ---
+# Usage: python benchmarks/bench_risk.py --samples 1000000 --jobs 8 --workers 4
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Monte Carlo risk throughput and memory.")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=8, help="Jobs for the multi-job run.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    spec = RiskSpec(failure_rate=0.1)
+
+    simulate_job(DEFAULT_VALUES, spec, CHUNK_SIZE)  # warm-up
+    start = time.perf_counter()
+    single = simulate_job(DEFAULT_VALUES, spec, args.samples)
+    elapsed = time.perf_counter() - start
+
+    # NumPy reports its buffers to tracemalloc, so this is the peak of the chunk temporaries + kept profits
+    tracemalloc.start()
+    simulate_job(DEFAULT_VALUES, spec, args.samples)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    jobs = [dict(DEFAULT_VALUES, selling_price_inr=100.0 + 50 * i) for i in range(args.jobs)]
+    start = time.perf_counter()
+    serial = simulate_jobs(jobs, spec, args.samples, workers=1)
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    parallel = simulate_jobs(jobs, spec, args.samples, workers=args.workers)
+    parallel_time = time.perf_counter() - start
+    assert serial == parallel, "results depend on the worker count"
+    assert simulate_job(DEFAULT_VALUES, spec, args.samples) == single, "same seed gave different results"
+
+    print(f"single job:        {args.samples:,} samples in {elapsed * 1000:8.1f} ms ({args.samples / elapsed:,.0f} samples/s)")
+    print(f"peak memory:       {peak / 2**20:8.1f} MiB ({peak / args.samples:.1f} B/sample, chunk {CHUNK_SIZE:,})")
+    print(f"{args.jobs} jobs, 1 worker:  {serial_time:8.2f} s")
+    print(f"{args.jobs} jobs, {args.workers} workers: {parallel_time:8.2f} s ({serial_time / parallel_time:.2f}x)")
+    print(f"E[profit] {single['expected_profit']:,.2f}  P5 {single['profit_p5']:,.2f}  P95 {single['profit_p95']:,.2f}  "
+          f"P(loss) {single['prob_loss']:.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from slicer_import import SlicerCache, import_paths, scan_file
+
+# --- Slicer ingestion: large-file parse time and cold vs cached directory scans ---
+# Usage: python benchmarks/bench_slicer.py --files 2000 --big-mb 500
+
+FOOTER = (
+    "; filament used [mm] = 12345.67\n; filament used [g] = 36.80\n"
+    "; estimated printing time (normal mode) = 5h 12m 9s\n\n; prusaslicer_config = begin\n"
+    "; filament_type = PETG\n" + "; some_setting = 0\n" * 400 + "; prusaslicer_config = end\n"
+)
+
+def write_gcode(path, body_mb):
+    line = "G1 X120.512 Y87.301 E0.04213\n"
+    block = line * (1024 * 1024 // len(line))
+    with open(path, "w") as f:
+        f.write("; generated by PrusaSlicer 2.7.1\n")
+        for _ in range(body_mb):
+            f.write(block)
+        f.write(FOOTER)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure slicer file ingestion.")
+    parser.add_argument("--files", type=int, default=1000, help="Small G-code files in the scanned directory.")
+    parser.add_argument("--big-mb", type=int, default=500, help="Size of the single large G-code file.")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        big_path = os.path.join(tmp, "big.gcode")
+        write_gcode(big_path, args.big_mb)
+        start = time.perf_counter()
+        scan_file(big_path)
+        big = time.perf_counter() - start
+
+        folder = os.path.join(tmp, "jobs")
+        os.mkdir(folder)
+        for i in range(args.files):
+            write_gcode(os.path.join(folder, f"part_{i:05d}.gcode"), 1)
+        cache = SlicerCache(os.path.join(tmp, "cache.json"))
+        start = time.perf_counter()
+        estimates, errors, parsed = import_paths([folder], args.workers, cache)
+        cold = time.perf_counter() - start
+        assert not errors and parsed == args.files
+        start = time.perf_counter()
+        _, _, reparsed = import_paths([folder], args.workers, SlicerCache(cache.path))
+        warm = time.perf_counter() - start
+        assert reparsed == 0
+
+    print(f"{args.big_mb:,} MB G-code:  {big * 1000:8.1f} ms")
+    print(f"cold scan:      {cold:8.2f} s for {args.files:,} files ({args.files / cold:,.0f} files/s, {args.workers} workers)")
+    print(f"cached rescan:  {warm:8.2f} s ({args.files / warm:,.0f} files/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import calculate_costs
+from solver import solve_batch, solve_quote
+
+# --- Break-even / target-margin solver microbenchmarks ---
+# Usage: python benchmarks/bench_solver.py
+
+JOB = (500.0, 1200.0, 50.0, 3.0, 180.0, 7.0, 0.5, 150.0, 20.0)
+
+def bench_single(calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        solve_quote(*JOB, target_margin=30.0)
+    return (time.perf_counter() - start) / calls
+
+def bench_batch(rows, repeat):
+    rng = np.random.default_rng(0)
+    columns = (
+        rng.uniform(100, 2000, rows), rng.uniform(800, 4000, rows), rng.uniform(1, 1000, rows),
+        rng.uniform(0.1, 48, rows), rng.uniform(100, 350, rows), rng.uniform(3, 12, rows),
+        rng.uniform(0, 2, rows), rng.uniform(0, 300, rows), rng.uniform(0, 100, rows),
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solve_batch(*columns, target_margin=30.0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def check_round_trip():
+    # Pricing a job at the solved prices / limits must land exactly on the targets
+    solved = solve_quote(*JOB, target_margin=30.0)
+    at_margin = calculate_costs(solved["min_price_for_margin"], *JOB[1:])
+    at_grams = calculate_costs(JOB[0], JOB[1], solved["max_grams"], *JOB[3:])
+    at_hours = calculate_costs(JOB[0], JOB[1], JOB[2], solved["max_hours"], *JOB[4:])
+    assert abs(at_margin["profit_margin"] - 30.0) < 1e-9
+    assert abs(at_grams["profit"]) < 1e-9 and abs(at_hours["profit"]) < 1e-9
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure single-job and batched solver throughput.")
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    check_round_trip()
+    single = bench_single(args.calls)
+    batch = bench_batch(args.rows, args.repeat)
+    print(f"single job: {single * 1e6:8.2f} us/call   ({1 / single:,.0f} solves/s)")
+    print(f"batched:    {batch * 1000:8.2f} ms/{args.rows:,} ({args.rows / batch:,.0f} solves/s)")
+
+if __name__ == "__main__":
+    main()
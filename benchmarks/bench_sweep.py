@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_engine import DEFAULT_VALUES
+from sweep import break_even_contour, sweep_grid
+
+# --- What-if sweep: time to price an N x N grid and trace its break-even contour ---
+# Usage: python benchmarks/bench_sweep.py --size 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a two-input what-if sweep.")
+    parser.add_argument("--size", type=int, default=1000, help="Points per axis.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    prices = np.linspace(50, 1500, args.size)
+    grams = np.linspace(1, 1000, args.size)
+    best_grid = best_contour = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        grid = sweep_grid(DEFAULT_VALUES, "selling_price_inr", prices, "material_used_grams", grams)
+        mid = time.perf_counter()
+        break_even_contour(grid)
+        end = time.perf_counter()
+        best_grid = min(best_grid, mid - start)
+        best_contour = min(best_contour, end - mid)
+
+    cells = args.size * args.size
+    print(f"grid:      {args.size} x {args.size} ({cells:,} scenarios)")
+    print(f"pricing:   {best_grid * 1000:8.1f} ms  ({cells / best_grid:,.0f} scenarios/s)")
+    print(f"contour:   {best_contour * 1000:8.1f} ms")
+    print(f"total:     {(best_grid + best_contour) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tariff import TariffSchedule, get_tariff
+
+# --- Time-of-use tariff microbenchmarks ---
+# Compares the cumulative-table lookup against stepping through the job hour by hour.
+# Usage: python benchmarks/bench_tariff.py
+
+TARIFF_NAME = "Weekday peak / weekend off-peak"
+
+# Reference implementation: walk slab boundaries one at a time
+def stepped_cost_per_kw(tariff, start, duration_hours):
+    cost, t, end = 0.0, start, start + timedelta(hours=duration_hours)
+    while t < end:
+        rate = tariff.rate_at(t)
+        step = min(timedelta(hours=1) - timedelta(minutes=t.minute, seconds=t.second), end - t)
+        cost += rate * step.total_seconds() / 3600
+        t += step
+    return cost
+
+def check_against_stepping(tariff, rng):
+    for _ in range(200):
+        start = datetime(2026, 1, 5) + timedelta(hours=int(rng.integers(0, 24 * 28)))
+        duration = float(rng.uniform(0, 72))
+        assert abs(tariff.cost_per_kw(start, duration) - stepped_cost_per_kw(tariff, start, duration)) < 1e-6
+
+def bench_scalar(tariff, calls, duration_hours):
+    start_time = datetime(2026, 1, 5, 17, 30)
+    start = time.perf_counter()
+    for _ in range(calls):
+        tariff.effective_rate(start_time, duration_hours)
+    return (time.perf_counter() - start) / calls
+
+def bench_stepped(tariff, calls, duration_hours):
+    start_time = datetime(2026, 1, 5, 17, 0)
+    start = time.perf_counter()
+    for _ in range(calls):
+        stepped_cost_per_kw(tariff, start_time, duration_hours)
+    return (time.perf_counter() - start) / calls
+
+def bench_batch(tariff, rows, repeat, rng):
+    starts = np.datetime64("2026-01-05T00:00") + rng.integers(0, 28 * 24 * 60, rows).astype("timedelta64[m]")
+    durations = rng.uniform(0.1, 72, rows)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tariff.effective_rate_batch(starts, durations)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-of-use tariff lookups, single and batched.")
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--hours", type=float, default=48.0, help="Job length for the single-job comparison.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    tariff = get_tariff(TARIFF_NAME)
+    check_against_stepping(tariff, rng)
+    check_against_stepping(TariffSchedule.hourly(rng.uniform(4, 10, 24)), rng)
+
+    table = bench_scalar(tariff, args.calls, args.hours)
+    stepped = bench_stepped(tariff, max(args.calls // 50, 1), args.hours)
+    batch = bench_batch(tariff, args.rows, args.repeat, rng)
+    print(f"table lookup:  {table * 1e6:8.2f} us/job")
+    print(f"hour stepping: {stepped * 1e6:8.2f} us/job  ({stepped / table:,.0f}x slower for {args.hours:g} h jobs)")
+    print(f"batched:       {batch * 1000:8.2f} ms/{args.rows:,} ({args.rows / batch:,.0f} jobs/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# --- Multi-session load test for the Streamlit app ---
+# Simulates N sessions in one server process (as Streamlit does: one session state per browser tab, shared
+# modules and caches) and drives each through a few rounds of typical clicks: plain rerun, Calculate with a
+# new price, theme toggle, what-if sweep. Sessions are interleaved round by round, so all N are alive and
+# holding state at once. Reports rerun latency per action, memory retained per session and the size of each
+# session's state. AppTest swaps a process-global runtime on every run, so sessions are driven one at a time;
+# a real server's script threads mostly serialize on the GIL too.
+#
+#   python benchmarks/load_test.py --sessions 200
+#   python benchmarks/load_test.py --sessions 100 --compare      # scaling mode off vs on, each in a fresh process
+#
+# AppTest reruns the whole script even for clicks inside a fragment, so latencies here are full reruns. The
+# section timers (app.theme, app.sweep, app.history) show what the same clicks cost as fragment reruns
+# in scaling mode.
+
+ACTIONS = ("rerun", "calculate", "theme", "sweep")
+SECTION_TIMERS = ("app.rerun", "app.css", "app.form", "app.calculate", "app.results", "app.theme", "app.sweep",
+                  "app.history")
+
+def click(app, label=None, key=None):
+    for button in app.button:
+        if (key is not None and button.key == key) or (label is not None and button.label == label):
+            return button.click()
+    raise LookupError(f"no button {label or key!r}")
+
+def run_action(app, action, round_index):
+    if action == "calculate":
+        app.number_input(key="sp_stable").set_value(400.0 + 10 * round_index)
+        click(app, label="Placeholder_Calculate")
+    elif action == "theme":
+        click(app, key="theme_switcher_stable")
+    elif action == "sweep":
+        click(app, label="Run Sweep")
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"{action} failed: {app.exception[0].value}")
+    return elapsed
+
+# Bytes held by a session's state: NumPy buffers by nbytes, containers and slotted records walked
+def deep_sizeof(value, seen=None):
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (value.nbytes if value.base is None else 0)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_sizeof(vars(value), seen)
+    for name in getattr(type(value), "__slots__", ()):
+        if hasattr(value, name):
+            size += deep_sizeof(getattr(value, name), seen)
+    return size
+
+def percentile_ms(values, q):
+    return float(np.percentile(values, q) * 1000) if values else 0.0
+
+def run_load(sessions, rounds):
+    from streamlit.testing.v1 import AppTest
+    from instrumentation import registry
+
+    script = os.path.join(ROOT, "Final.py")
+
+    def new_session():
+        return AppTest.from_file(script, default_timeout=120).run()
+
+    # Warm-up session: imports, process-wide caches and the first sweep don't count against per-session memory
+    warm = new_session()
+    for action in ACTIONS:
+        run_action(warm, action, 0)
+    del warm
+    registry.reset()
+
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    apps = [new_session() for _ in range(sessions)]
+    timings = {action: [] for action in ACTIONS}
+    for round_index in range(rounds):
+        for app in apps:
+            for action in ACTIONS:
+                timings[action].append(run_action(app, action, round_index))
+    wall = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    state_sizes = [deep_sizeof(app.session_state.to_dict()) for app in apps]
+    sections = registry.snapshot()["timers"]
+    return {
+        "sessions": sessions, "rounds": rounds,
+        "scaling_mode": os.environ.get("PRINTCALC_SCALING", "") not in ("", "0"),
+        "wall_s": wall, "reruns_per_s": sum(len(t) for t in timings.values()) / wall,
+        "retained_per_session_kib": (retained - baseline) / sessions / 1024,
+        "peak_mib": (peak - baseline) / 2**20,
+        "session_state_kib": {"avg": float(np.mean(state_sizes)) / 1024, "max": max(state_sizes) / 1024},
+        "latency_ms": {action: {"p50": percentile_ms(t, 50), "p95": percentile_ms(t, 95), "max": percentile_ms(t, 100)}
+                       for action, t in timings.items()},
+        "sections_avg_ms": {name: sections[name]["avg_ms"] for name in SECTION_TIMERS if name in sections},
+    }
+
+def print_report(report):
+    mode = "on" if report["scaling_mode"] else "off"
+    print(f"scaling mode {mode}: {report['sessions']} sessions x {report['rounds']} rounds, "
+          f"{report['wall_s']:.1f}s ({report['reruns_per_s']:.1f} reruns/s)")
+    print(f"  memory retained per session: {report['retained_per_session_kib']:10,.1f} KiB "
+          f"(includes the test client's copy of the page)")
+    print(f"  session_state size:          {report['session_state_kib']['avg']:10,.1f} KiB avg, "
+          f"{report['session_state_kib']['max']:,.1f} KiB max")
+    print(f"  peak traced memory:          {report['peak_mib']:10,.1f} MiB")
+    for action, stats in report["latency_ms"].items():
+        print(f"  {action:<10} rerun p50 {stats['p50']:8.1f} ms  p95 {stats['p95']:8.1f} ms  max {stats['max']:8.1f} ms")
+    sections = ", ".join(f"{name} {ms:.1f}" for name, ms in report["sections_avg_ms"].items())
+    print(f"  section avg ms: {sections}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many app sessions; report memory and rerun latency.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds of (rerun, calculate, theme, sweep) per session.")
+    parser.add_argument("--scaling", choices=("off", "on"), help="Force PRINTCALC_SCALING for this run.")
+    parser.add_argument("--compare", action="store_true", help="Run scaling mode off and on in separate processes.")
+    parser.add_argument("--json", help="Write the report(s) to this file.")
+    args = parser.parse_args()
+
+    if args.compare:
+        reports = []
+        for mode in ("off", "on"):
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+                out_path = tmp.name
+            try:
+                subprocess.run([sys.executable, os.path.abspath(__file__), "--sessions", str(args.sessions), "--rounds",
+                                str(args.rounds), "--scaling", mode, "--json", out_path], check=True, stdout=subprocess.DEVNULL)
+                with open(out_path, encoding="utf-8") as f:
+                    reports.append(json.load(f))
+            finally:
+                os.unlink(out_path)
+    else:
+        if args.scaling:
+            os.environ["PRINTCALC_SCALING"] = "1" if args.scaling == "on" else "0"
+        os.environ["PRINTCALC_INSTRUMENT"] = "1"  # Section timers; read when instrumentation is first imported
+        with tempfile.TemporaryDirectory() as tmp:
+            # Keep the simulated quotes out of the real history database
+            os.environ["PRINTCALC_HISTORY_DB"] = os.path.join(tmp, "load_test_history.db")
+            reports = [run_load(args.sessions, args.rounds)]
+
+    for report in reports:
+        print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports[0] if len(reports) == 1 else reports, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Load test for pricing_service.py ---
+# Starts a local service (or targets --url) and hammers it from N keep-alive connections.
+# Usage: python benchmarks/load_test_service.py --connections 16 --requests 20000 [--batch 100]
+
+JOB = {"selling_price_inr": 500, "selected_material": "PLA", "material_used_grams": 50, "print_duration_hours": 3}
+
+def worker(host, port, path, body, count, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    local = []
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(repr(exc))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        local.append(time.perf_counter() - start)
+    conn.close()
+    latencies.extend(local)
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def start_local_service(port):
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "pricing_service.py"), "--port", str(port)],
+                            stderr=subprocess.PIPE, text=True)
+    proc.stderr.readline()  # "listening on ..." once the socket is bound
+    return proc, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pricing service latency and throughput.")
+    parser.add_argument("--url", help="Existing service to target (default: start one locally).")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=10_000, help="Total requests across all connections.")
+    parser.add_argument("--batch", type=int, default=0, help="Jobs per request; 0 uses the single-job endpoint.")
+    args = parser.parse_args()
+
+    proc = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        proc, startup = start_local_service(port)
+        print(f"service startup: {startup * 1000:.0f} ms")
+
+    if args.batch:
+        path, body = "/v1/price/batch", json.dumps({"jobs": [JOB] * args.batch})
+    else:
+        path, body = "/v1/price", json.dumps(JOB)
+    body = body.encode("utf-8")  # bytes bodies go out in the same packet as the headers
+
+    try:
+        latencies, errors = [], []
+        per_connection = max(1, args.requests // args.connections)
+        threads = [threading.Thread(target=worker, args=(host, port, path, body, per_connection, latencies, errors))
+                   for _ in range(args.connections)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    latencies.sort()
+    total = len(latencies)
+    jobs = total * (args.batch or 1)
+    print(f"endpoint:    {path}  ({args.connections} keep-alive connections)")
+    print(f"requests:    {total:,} in {elapsed:.2f}s  ({total / elapsed:,.0f} req/s, {jobs / elapsed:,.0f} jobs/s)")
+    print(f"latency:     p50 {percentile(latencies, 50) * 1000:.2f} ms   p99 {percentile(latencies, 99) * 1000:.2f} ms"
+          f"   max {latencies[-1] * 1000:.2f} ms")
+    print(f"errors:      {len(errors)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bulk_pricing import price_stream
+from cost_engine import DEFAULT_VALUES, calculate_costs, price_batch
+from risk_analysis import RiskSpec, simulate_job
+from theme_css import get_base_css, get_theme_css
+
+# --- Benchmark suite with a regression gate ---
+# Runs the core benchmarks, compares throughput with a stored JSON baseline and exits non-zero when any
+# case falls more than --threshold below it. Baselines are per machine, so benchmarks/baseline.json is not
+# checked in: the first run on a box records it (or --update re-records it), later runs compare against it.
+# Record it on the machine that runs the nightly job, with nothing else busy, then run the suite after
+# every change. On shared or virtualised hosts run-to-run noise can reach 30%; raise --threshold there
+# rather than trusting a single failure.
+#
+#   python benchmarks/suite.py --update            # (re-)record benchmarks/baseline.json
+#   python benchmarks/suite.py                     # compare; exit 1 on a regression
+#   python benchmarks/suite.py --only batch_1k,get_css --output results.json
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+def make_columns(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        rng.uniform(0, 2000, rows), rng.uniform(0, 4000, rows), rng.uniform(1, 1000, rows),
+        rng.uniform(0.1, 48, rows), rng.integers(100, 350, rows).astype(np.float64), rng.uniform(3, 12, rows),
+        rng.uniform(0, 2, rows), rng.uniform(0, 300, rows), rng.uniform(0, 100, rows),
+    ]
+
+# --- Cases ---
+# Each setup returns (run, units per run, unit). Setup time is not measured.
+def setup_scalar_formula():
+    job = (500.0, 1200.0, 50.0, 3.0, 180.0, 7.0, 0.5, 150.0, 20.0)
+    calls = 50_000
+    def run():
+        for _ in range(calls):
+            calculate_costs(*job)
+    return run, calls, "quotes/s"
+
+def setup_batch(rows):
+    def setup():
+        columns = make_columns(rows)
+        sample = [column[:200].tolist() for column in columns]
+        expected = np.array([calculate_costs(*row)["profit"] for row in zip(*sample)])
+        if not np.allclose(price_batch(*(column[:200] for column in columns))["profit"], expected):
+            raise SystemExit("price_batch disagrees with calculate_costs")
+        return lambda: price_batch(*columns), rows, "rows/s"
+    return setup
+
+def setup_bulk_csv():
+    rows = 100_000
+    columns = make_columns(rows)
+    buffer = io.StringIO()
+    buffer.write("selling_price_inr,material_used_grams,print_duration_hours,selected_material\n")
+    for price, grams, hours in zip(columns[0].round(2), columns[2].round(2), columns[3].round(2)):
+        buffer.write(f"{price},{grams},{hours},PLA\n")
+    text = buffer.getvalue()
+    def run():
+        price_stream(io.StringIO(text), io.StringIO(), "csv", "csv")
+    return run, rows, "rows/s"
+
+# Both halves uncached (as in bench_css.py); get_css.__wrapped__ would still hit the inner caches
+def setup_get_css():
+    calls = 20_000
+    build_theme, build_base = get_theme_css.__wrapped__, get_base_css.__wrapped__
+    def run():
+        for i in range(calls):
+            build_theme("light" if i % 2 else "dark") + build_base()
+    return run, calls, "builds/s"
+
+def setup_risk():
+    samples = 1_000_000
+    spec = RiskSpec(failure_rate=0.1)
+    return lambda: simulate_job(DEFAULT_VALUES, spec, samples), samples, "samples/s"
+
+def setup_app_rerun():
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "Final.py"), default_timeout=30).run()
+    reruns = 10
+    def run():
+        for _ in range(reruns):
+            app.run()
+    return run, reruns, "reruns/s"
+
+CASES = {
+    "scalar_formula": setup_scalar_formula,
+    "batch_1k": setup_batch(1_000),
+    "batch_100k": setup_batch(100_000),
+    "batch_10m": setup_batch(10_000_000),
+    "bulk_csv_100k": setup_bulk_csv,
+    "get_css": setup_get_css,
+    "risk_1m": setup_risk,
+    "app_rerun": setup_app_rerun,
+}
+
+# Fewer repeats for the slow cases; the best run is kept
+REPEATS = {"batch_10m": 3, "bulk_csv_100k": 3, "app_rerun": 3}
+
+def run_case(name, repeat):
+    run, units, unit = CASES[name]()
+    run()  # warm-up
+    best = float("inf")
+    for _ in range(REPEATS.get(name, repeat)):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return {"throughput": units / best, "unit": unit, "seconds": best}
+
+def machine_info():
+    return {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+
+# Returns (lines, regressed case names)
+def compare(results, baseline, threshold):
+    lines, regressed = [], []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            lines.append(f"{name:<16} {result['throughput']:>16,.0f} {result['unit']:<10} (no baseline)")
+            continue
+        ratio = result["throughput"] / base["throughput"]
+        status = "ok"
+        if ratio < 1 - threshold:
+            status = "REGRESSION"
+            regressed.append(name)
+        lines.append(f"{name:<16} {result['throughput']:>16,.0f} {result['unit']:<10} {ratio:6.2f}x baseline  {status}")
+    return lines, regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and gate on throughput regressions.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with / write.")
+    parser.add_argument("--update", action="store_true", help="Record the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed throughput drop before failing (0.25 = 25%%).")
+    parser.add_argument("--only", help="Comma-separated cases to run (default: all).")
+    parser.add_argument("--skip", default="", help="Comma-separated cases to leave out.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Also write this run's results to a JSON file.")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(CASES)
+    skipped = set(filter(None, args.skip.split(",")))
+    unknown = [name for name in names + list(skipped) if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}; available: {', '.join(CASES)}")
+
+    results = {}
+    for name in names:
+        if name in skipped:
+            continue
+        try:
+            results[name] = run_case(name, args.repeat)
+        except ImportError as exc:
+            print(f"{name:<16} skipped ({exc})", file=sys.stderr)
+    report = {"created_at": datetime.now().isoformat(timespec="seconds"), "machine": machine_info(), "results": results}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.update or not os.path.exists(args.baseline):
+        if os.path.exists(args.baseline):
+            # Cases left out of this run (--only/--skip) keep their recorded baseline
+            with open(args.baseline, encoding="utf-8") as f:
+                report["results"] = dict(json.load(f).get("results", {}), **results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        for name, result in results.items():
+            print(f"{name:<16} {result['throughput']:>16,.0f} {result['unit']}")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != report["machine"]:
+        print("warning: baseline was recorded on a different machine/environment; ratios may be meaningless",
+              file=sys.stderr)
+    lines, regressed = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+    if regressed:
+        print(f"FAILED: {', '.join(regressed)} slower than baseline by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
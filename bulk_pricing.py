@@ -0,0 +1,339 @@
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from cost_engine import DEFAULT_VALUES, price_columns
+from instrumentation import PROFILE_MODES, count, registry, run_profiled, timer, write_json_snapshot
+from material_catalog import load_material_catalog
+from tariff import get_tariff
+
+# --- Headless bulk pricing ---
+# Streams slicer job exports (CSV or JSONL, columns named like DEFAULT_VALUES) through the batch engine
+# one chunk at a time, so memory stays flat regardless of input size. Rows that leave the spool cost or
+# printer wattage blank get the material catalog's defaults for their selected_material.
+# With --tariff, rows that carry a `print_start` timestamp (ISO, e.g. 2026-10-19T17:00) are billed at the
+# named time-of-use tariff's average rate over the print; rows without one keep their flat per-kWh rate.
+#
+#   python Final.py price jobs.csv -o priced.csv
+#   python bulk_pricing.py jobs.jsonl --chunk-size 50000 > priced.jsonl
+#   python bulk_pricing.py jobs.csv -o priced.csv --workers 32
+#   python bulk_pricing.py jobs.csv --tariff "Time-of-day (peak 18-22)"
+
+DEFAULT_CHUNK_SIZE = 10_000
+PRINT_START_FIELD = "print_start"
+
+NUMERIC_FIELDS = [name for name, value in DEFAULT_VALUES.items() if not isinstance(value, str)]
+TEXT_FIELDS = [name for name, value in DEFAULT_VALUES.items() if isinstance(value, str)]
+# Header names (CSV) and keys (JSONL) accepted in input; source_file comes from slicer_import.py job CSVs
+# and isn't priced
+KNOWN_FIELDS = set(DEFAULT_VALUES) | {PRINT_START_FIELD, "source_file"}
+
+# Output columns use the same names as the calculator's calc_* session keys
+RESULT_FIELDS = {
+    "calc_material_cost": "material_cost",
+    "calc_electricity_cost": "electricity_cost",
+    "calc_labor_cost": "labor_cost",
+    "calc_other_costs": "other_costs",
+    "calc_total_cost": "total_cost",
+    "calc_profit": "profit",
+    "calc_profit_margin": "profit_margin",
+}
+
+# --- Reading ---
+# Input is cut into chunks of raw lines; parsing happens per chunk so it can run inside worker processes.
+# (CSV fields with embedded newlines are therefore not supported.)
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+# CSV header names and JSONL keys must be known fields; a misspelled (or BOM-prefixed) one would otherwise be
+# ignored and every row silently priced with that field's default. strict=False only warns, once per name
+# per process.
+_warned_fields = set()
+
+def check_fields(names, strict=True, line_no=None):
+    unknown = [name for name in names if name not in KNOWN_FIELDS]
+    if not unknown:
+        return
+    listed = ", ".join(map(repr, unknown))
+    message = f"Unknown column(s) in header: {listed}" if line_no is None else f"Line {line_no}: unknown field(s) {listed}"
+    if strict:
+        raise ValueError(f"{message} (use --ignore-unknown-columns to price anyway)")
+    if not _warned_fields.issuperset(unknown):
+        _warned_fields.update(unknown)
+        print(f"warning: {message}; ignoring them", file=sys.stderr)
+
+def read_header(stream, fmt, strict=True):
+    if fmt != "csv":
+        return None
+    header = stream.readline().lstrip("\ufeff")  # stdin isn't opened as utf-8-sig
+    fieldnames = next(csv.reader([header]), [])
+    check_fields(fieldnames, strict)
+    return fieldnames
+
+def iter_line_chunks(stream, chunk_size):
+    while True:
+        lines = list(islice(stream, chunk_size))
+        if not lines:
+            return
+        yield lines
+
+# Returns (rows, source line number of each row); blank lines are skipped but still counted
+def parse_lines(lines, fmt, fieldnames, first_line_number=1, strict=True):
+    rows, line_numbers = [], []
+    if fmt == "csv":
+        # One record per line (embedded newlines aren't supported), so reader rows line up with input lines
+        for line_no, values in enumerate(csv.reader(lines), first_line_number):
+            if any(values):
+                rows.append(dict(zip(fieldnames, values)))
+                line_numbers.append(line_no)
+        return rows, line_numbers
+    for line_no, line in enumerate(lines, first_line_number):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Line {line_no}: invalid JSON ({exc.msg} at column {exc.colno})") from None
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {line_no}: expected a JSON object")
+        if not KNOWN_FIELDS.issuperset(row):
+            check_fields(row, strict, line_no)
+        rows.append(row)
+        line_numbers.append(line_no)
+    return rows, line_numbers
+
+# --- Pricing ---
+# Fields that, when left blank, are resolved from the material catalog by the row's selected_material
+CATALOG_FIELDS = {
+    "material_spool_cost_inr": "spool_cost_inr",
+    "printer_wattage_p1s": "printer_wattage",
+}
+
+# line_numbers (one per row) overrides first_line_number + index in error messages
+def chunk_to_columns(chunk, first_line_number=1, row_label="Line", line_numbers=None):
+    line_of = _line_numbers(chunk, first_line_number, line_numbers)
+    columns = {}
+    for name in TEXT_FIELDS:
+        default = DEFAULT_VALUES[name]
+        values = [row.get(name) or default for row in chunk]
+        for i, value in enumerate(values):
+            if not isinstance(value, str):  # JSON lists/objects/numbers; CSV cells are always strings
+                raise ValueError(f"{row_label} {line_of[i]}: invalid value {value!r} for {name}")
+        columns[name] = np.array(values, dtype=object)
+    for name in NUMERIC_FIELDS:
+        default = np.nan if name in CATALOG_FIELDS else DEFAULT_VALUES[name]
+        values = np.empty(len(chunk), dtype=np.float64)
+        for i, row in enumerate(chunk):
+            raw = row.get(name)
+            if raw is None or raw == "":
+                values[i] = default
+                continue
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                value = math.nan
+            # NaN/inf would come out as NaN costs (and NaN is the "use the catalog" marker above)
+            if not math.isfinite(value) or isinstance(raw, bool):
+                raise ValueError(f"{row_label} {line_of[i]}: invalid value {raw!r} for {name}")
+            values[i] = value
+        columns[name] = values
+
+    catalog = load_material_catalog()
+    for name, attribute in CATALOG_FIELDS.items():
+        missing = np.isnan(columns[name])
+        if missing.any():
+            resolved = catalog.lookup_column(columns["selected_material"][missing], attribute, DEFAULT_VALUES[name])
+            columns[name][missing] = resolved
+    return columns
+
+# Replaces the flat electricity rate with the tariff's time-weighted average for rows that have a print start
+def apply_tariff(columns, chunk, tariff, first_line_number=1, row_label="Line", line_numbers=None):
+    starts = np.array([row.get(PRINT_START_FIELD) or "NaT" for row in chunk], dtype=object)
+    try:
+        start_times = starts.astype("datetime64[s]")
+    except ValueError:
+        for i, raw in enumerate(starts):
+            try:
+                np.datetime64(raw, "s")
+            except ValueError:
+                line_no = _line_numbers(chunk, first_line_number, line_numbers)[i]
+                raise ValueError(f"{row_label} {line_no}: invalid value {raw!r} for {PRINT_START_FIELD}") from None
+        raise
+    timed = ~np.isnat(start_times)
+    if timed.any():
+        rates = columns["electricity_cost_per_kwh_inr"]
+        rates[timed] = tariff.effective_rate_batch(start_times[timed], columns["print_duration_hours"][timed])
+    return columns
+
+def _line_numbers(chunk, first_line_number, line_numbers):
+    return line_numbers if line_numbers is not None else range(first_line_number, first_line_number + len(chunk))
+
+OUTPUT_FIELDS = list(DEFAULT_VALUES) + list(RESULT_FIELDS)
+
+# Returns one tuple per job, in OUTPUT_FIELDS order
+def price_chunk(chunk, first_line_number=1, tariff_name=None, line_numbers=None):
+    with timer("bulk.columns"):
+        columns = chunk_to_columns(chunk, first_line_number, line_numbers=line_numbers)
+        if tariff_name:
+            apply_tariff(columns, chunk, get_tariff(tariff_name), first_line_number, line_numbers=line_numbers)
+    with timer("bulk.price"):
+        results = price_columns(columns)
+    output_columns = [columns[name].tolist() for name in DEFAULT_VALUES]
+    output_columns += [np.round(results[name], 4).tolist() for name in RESULT_FIELDS.values()]
+    return list(zip(*output_columns))
+
+# --- Writing ---
+def format_rows(rows, fmt):
+    buffer = io.StringIO()
+    if fmt == "csv":
+        csv.writer(buffer).writerows(rows)
+    else:
+        buffer.writelines(json.dumps(dict(zip(OUTPUT_FIELDS, row))) + "\n" for row in rows)
+    return buffer.getvalue()
+
+def format_header(fmt):
+    if fmt != "csv":
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(OUTPUT_FIELDS)
+    return buffer.getvalue()
+
+# One unit of work: raw input lines in, formatted output text out. Top-level so worker processes can pickle it
+# (the tariff travels by name and each worker loads its own copy).
+# With --workers the per-stage timers stay in the worker processes; the parent records rows and chunks.
+def price_lines(lines, in_fmt, out_fmt, fieldnames, first_line_number, tariff_name=None, strict=True):
+    with timer("bulk.parse"):
+        rows, line_numbers = parse_lines(lines, in_fmt, fieldnames, first_line_number, strict)
+    if not rows:
+        return 0, ""
+    priced = price_chunk(rows, first_line_number, tariff_name, line_numbers)
+    with timer("bulk.format"):
+        return len(rows), format_rows(priced, out_fmt)
+
+# --- Driver ---
+def price_stream(in_stream, out_stream, in_fmt, out_fmt, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, tariff_name=None,
+                 ignore_unknown_columns=False):
+    strict = not ignore_unknown_columns
+    fieldnames = read_header(in_stream, in_fmt, strict)
+    first_line = 2 if in_fmt == "csv" else 1
+    tasks = _number_chunks(iter_line_chunks(in_stream, chunk_size), first_line)
+
+    out_stream.write(format_header(out_fmt))
+    total = 0
+    if workers <= 1:
+        results = (price_lines(lines, in_fmt, out_fmt, fieldnames, line_no, tariff_name, strict)
+                   for lines, line_no in tasks)
+    else:
+        results = _price_in_pool(tasks, in_fmt, out_fmt, fieldnames, workers, tariff_name, strict)
+    for rows, text in results:
+        out_stream.write(text)
+        total += rows
+        count("bulk.chunks")
+        count("bulk.rows", rows)
+    out_stream.flush()
+    return total
+
+def _number_chunks(chunks, first_line):
+    line_no = first_line
+    for lines in chunks:
+        yield lines, line_no
+        line_no += len(lines)
+
+# Shards chunks across worker processes and yields results in input order. Only a bounded window of
+# chunks is in flight at once, so memory stays flat just like the single-process path.
+def _price_in_pool(tasks, in_fmt, out_fmt, fieldnames, workers, tariff_name=None, strict=True):
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for lines, line_no in tasks:
+            pending.append(pool.submit(price_lines, lines, in_fmt, out_fmt, fieldnames, line_no, tariff_name, strict))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Price 3D print jobs in bulk from a CSV or JSONL export.")
+    parser.add_argument("input", help="Job export to price ('-' for stdin).")
+    parser.add_argument("-o", "--output", default="-", help="Where to write priced jobs (default: stdout).")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="Override format detection for the input.")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="Defaults to the input format.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Jobs priced per vectorized pass.")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes to shard chunks across (0 = one per CPU core).")
+    parser.add_argument("--tariff", help=f"Named time-of-use tariff for rows with a {PRINT_START_FIELD} column.")
+    parser.add_argument("--ignore-unknown-columns", action="store_true",
+                        help="Warn about CSV columns / JSONL keys that aren't job fields instead of failing.")
+    parser.add_argument("--metrics-json", help="Record stage timers and write them to this JSON file when done.")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="Profile the run (profiles/ or --profile-output).")
+    parser.add_argument("--profile-output", help="Where to save the profile.")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.chunk_size <= 0:
+        print("error: --chunk-size must be positive", file=sys.stderr)
+        return 2
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if args.tariff:
+        try:
+            get_tariff(args.tariff)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = args.output_format or (detect_format(args.output) if args.output != "-" else in_fmt)
+
+    # utf-8-sig: Excel writes a BOM, which would otherwise end up in the first header name
+    in_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    if args.metrics_json:
+        registry.enabled = True
+    def run():
+        with timer("bulk.run"):
+            return price_stream(in_stream, out_stream, in_fmt, out_fmt, args.chunk_size, workers, args.tariff,
+                                args.ignore_unknown_columns)
+    start = time.perf_counter()
+    try:
+        if args.profile:
+            total, profile_path = run_profiled(run, args.profile, label="bulk", output=args.profile_output)
+            if profile_path:
+                print(f"Profile saved to {profile_path}", file=sys.stderr)
+        else:
+            total = run()
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Downstream consumer (e.g. `head`) closed early; point stdout at devnull so the exit flush is quiet
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    elapsed = time.perf_counter() - start
+    if args.metrics_json:
+        write_json_snapshot(args.metrics_json)
+
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Priced {total:,} jobs in {elapsed:.2f}s ({rate:,.0f} rows/sec)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
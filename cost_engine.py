@@ -0,0 +1,110 @@
+import numpy as np
+
+# --- Default Values for Inputs (for Reset functionality) ---
+DEFAULT_VALUES = {
+    "selling_price_inr": 500.0,
+    "selected_material": "PLA",
+    "material_spool_cost_inr": 1200.0,
+    "material_used_grams": 50.0,
+    "print_duration_hours": 3.0,
+    "printer_wattage_p1s": 180,
+    "electricity_cost_per_kwh_inr": 7.0,
+    "include_labor": "No",
+    "labor_hours": 0.5,
+    "labor_hourly_rate_inr": 150.0,
+    "other_costs_per_print_inr": 20.0,
+}
+
+# --- Cost components ---
+# Each term of the formula is defined once here and works on plain floats (no NumPy overhead) or
+# NumPy columns. price_batch, the solver and the incremental cost graph are built from them.
+# For columns, the first argument must already be an array (price_batch converts its inputs up front).
+_ndarray = np.ndarray
+
+# Negative spool costs are treated as free material
+def cost_per_gram(material_spool_cost):
+    if isinstance(material_spool_cost, _ndarray):
+        return np.where(material_spool_cost > 0, material_spool_cost, 0.0) / 1000
+    return (material_spool_cost / 1000) if material_spool_cost > 0 else 0
+
+def electricity_cost_per_hour(printer_wattage, electricity_cost_per_kwh):
+    return (printer_wattage / 1000) * electricity_cost_per_kwh
+
+def sum_costs(material_cost, electricity_cost, labor_cost, other_costs):
+    return material_cost + electricity_cost + labor_cost + other_costs
+
+def margin_percent(selling_price, profit):
+    if isinstance(selling_price, _ndarray):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(selling_price > 0, profit / selling_price * 100, 0.0)
+    return (profit / selling_price * 100) if selling_price > 0 else 0
+
+# --- Pure cost model (no Streamlit) ---
+# Same formula the calculator form uses, so the UI, scripts and batch jobs all price identically. This is the
+# reference: it's the hot scalar path, so it's written out inline rather than through the component helpers
+# above (~50% faster per quote). The helpers multiply wattage by tariff before hours, so the other paths can
+# differ from it in the last bit or so; tests/test_cost_formulas.py checks them against it to a tight tolerance.
+
+def calculate_costs(selling_price, material_spool_cost, material_used_grams, print_duration_hours,
+                    printer_wattage, electricity_cost_per_kwh, labor_hours=0.0, labor_hourly_rate=0.0,
+                    other_costs=0.0):
+    cost_per_gram_material = (material_spool_cost / 1000) if material_spool_cost > 0 else 0
+    mat_cost = cost_per_gram_material * material_used_grams
+    kwh_used = (printer_wattage / 1000) * print_duration_hours
+    electricity_cost = kwh_used * electricity_cost_per_kwh
+    labor_cost = labor_hours * labor_hourly_rate
+    total_cost = mat_cost + electricity_cost + labor_cost + other_costs
+    profit = selling_price - total_cost
+    profit_margin = (profit / selling_price * 100) if selling_price > 0 else 0
+    return {
+        "material_cost": mat_cost, "electricity_cost": electricity_cost,
+        "labor_cost": labor_cost, "other_costs": other_costs,
+        "total_cost": total_cost, "profit": profit, "profit_margin": profit_margin,
+    }
+
+# --- Vectorized batch pricing ---
+# Every argument may be a scalar or a 1-D column (NumPy array, array.array, list); scalars broadcast.
+def price_batch(selling_price, material_spool_cost, material_used_grams, print_duration_hours,
+                printer_wattage, electricity_cost_per_kwh, labor_hours=0.0, labor_hourly_rate=0.0,
+                other_costs=0.0):
+    selling_price = np.asarray(selling_price, dtype=np.float64)
+    spool_cost = np.asarray(material_spool_cost, dtype=np.float64)
+    grams = np.asarray(material_used_grams, dtype=np.float64)
+    hours = np.asarray(print_duration_hours, dtype=np.float64)
+    wattage = np.asarray(printer_wattage, dtype=np.float64)
+    tariff = np.asarray(electricity_cost_per_kwh, dtype=np.float64)
+    other = np.asarray(other_costs, dtype=np.float64)
+
+    mat_cost = cost_per_gram(spool_cost) * grams
+    electricity_cost = electricity_cost_per_hour(wattage, tariff) * hours
+    labor_cost = np.asarray(labor_hours, dtype=np.float64) * np.asarray(labor_hourly_rate, dtype=np.float64)
+    total_cost = sum_costs(mat_cost, electricity_cost, labor_cost, other)
+    profit = selling_price - total_cost
+    profit_margin = margin_percent(selling_price, profit)
+
+    shape = np.broadcast_shapes(total_cost.shape, profit.shape)
+    return {
+        "material_cost": np.broadcast_to(mat_cost, shape),
+        "electricity_cost": np.broadcast_to(electricity_cost, shape),
+        "labor_cost": np.broadcast_to(labor_cost, shape),
+        "other_costs": np.broadcast_to(other, shape),
+        "total_cost": np.broadcast_to(total_cost, shape),
+        "profit": np.broadcast_to(profit, shape),
+        "profit_margin": np.broadcast_to(profit_margin, shape),
+    }
+
+# --- Pricing jobs keyed like DEFAULT_VALUES ---
+# Takes a mapping of DEFAULT_VALUES field -> column (missing fields use the defaults) and applies the
+# same "Account for Labor?" switch as the form before handing everything to price_batch.
+def price_columns(columns):
+    def col(name):
+        return columns[name] if name in columns else DEFAULT_VALUES[name]
+
+    include_labor = np.asarray(col("include_labor")) == "Yes"
+    return price_batch(
+        col("selling_price_inr"), col("material_spool_cost_inr"), col("material_used_grams"),
+        col("print_duration_hours"), col("printer_wattage_p1s"), col("electricity_cost_per_kwh_inr"),
+        np.where(include_labor, np.asarray(col("labor_hours"), dtype=np.float64), 0.0),
+        np.where(include_labor, np.asarray(col("labor_hourly_rate_inr"), dtype=np.float64), 0.0),
+        col("other_costs_per_print_inr"),
+    )
@@ -0,0 +1,94 @@
+import numpy as np
+
+from cost_engine import DEFAULT_VALUES, cost_per_gram, electricity_cost_per_hour, margin_percent, sum_costs
+
+# --- Incremental cost model ---
+# The cost formula as a small dependency graph. Each component lists the inputs/components it reads, so when
+# some inputs change only the components downstream of them are recomputed. Works on scalars (the form) and
+# on NumPy columns (batch and sweep): updating just the tariff column recomputes electricity, total, profit
+# and margin, and leaves the material and labor columns untouched. The components are cost_engine's shared
+# cost terms, so the graph prices exactly like price_batch.
+
+def _material_cost(material_spool_cost_inr, material_used_grams):
+    return cost_per_gram(material_spool_cost_inr) * material_used_grams
+
+def _electricity_cost(printer_wattage_p1s, print_duration_hours, electricity_cost_per_kwh_inr):
+    return electricity_cost_per_hour(printer_wattage_p1s, electricity_cost_per_kwh_inr) * print_duration_hours
+
+def _labor_cost(include_labor, labor_hours, labor_hourly_rate_inr):
+    return np.where(np.asarray(include_labor) == "Yes", labor_hours * labor_hourly_rate_inr, 0.0)
+
+def _other_costs(other_costs_per_print_inr):
+    return other_costs_per_print_inr * 1.0
+
+def _profit(selling_price_inr, total_cost):
+    return selling_price_inr - total_cost
+
+# component -> (function, dependencies); listed in evaluation order
+COST_GRAPH = {
+    "material_cost": (_material_cost, ("material_spool_cost_inr", "material_used_grams")),
+    "electricity_cost": (_electricity_cost, ("printer_wattage_p1s", "print_duration_hours", "electricity_cost_per_kwh_inr")),
+    "labor_cost": (_labor_cost, ("include_labor", "labor_hours", "labor_hourly_rate_inr")),
+    "other_costs": (_other_costs, ("other_costs_per_print_inr",)),
+    "total_cost": (sum_costs, ("material_cost", "electricity_cost", "labor_cost", "other_costs")),
+    "profit": (_profit, ("selling_price_inr", "total_cost")),
+    "profit_margin": (margin_percent, ("selling_price_inr", "profit")),
+}
+
+# Leaf inputs of the graph (DEFAULT_VALUES fields the formula actually reads)
+COST_INPUTS = list(dict.fromkeys(dep for _, deps in COST_GRAPH.values() for dep in deps if dep not in COST_GRAPH))
+
+def affected_components(changed_inputs):
+    dirty = set(changed_inputs)
+    affected = []
+    for name, (_, deps) in COST_GRAPH.items():
+        if dirty.intersection(deps):
+            dirty.add(name)
+            affected.append(name)
+    return affected
+
+class IncrementalCostModel:
+    def __init__(self, inputs=None):
+        self.inputs = {name: _coerce(name, DEFAULT_VALUES[name]) for name in COST_INPUTS}
+        for name, value in (inputs or {}).items():
+            if name in self.inputs:
+                self.inputs[name] = _coerce(name, value)
+        self.results = {}
+        self._recompute(COST_INPUTS)
+
+    # Applies changed inputs (fields outside the formula, e.g. selected_material, are ignored) and returns
+    # the components that had to be recomputed
+    def update(self, changes):
+        changed = []
+        for name, value in changes.items():
+            if name not in self.inputs:
+                continue
+            value = _coerce(name, value)
+            if not _same(self.inputs[name], value):
+                self.inputs[name] = value
+                changed.append(name)
+        return self._recompute(changed)
+
+    def _recompute(self, changed_inputs):
+        recomputed = affected_components(changed_inputs)
+        values = dict(self.inputs, **self.results)
+        for name in recomputed:
+            func, deps = COST_GRAPH[name]
+            values[name] = self.results[name] = func(*(values[dep] for dep in deps))
+        return recomputed
+
+    # Plain floats for scalar inputs (the form), arrays otherwise
+    def as_dict(self):
+        return {name: (value.item() if np.ndim(value) == 0 else value) for name, value in self.results.items()}
+
+def _coerce(name, value):
+    if name == "include_labor":
+        return value if isinstance(value, str) else np.asarray(value, dtype=object)
+    return np.asarray(value, dtype=np.float64)
+
+def _same(old, new):
+    if old is new:
+        return True
+    if isinstance(old, str) or isinstance(new, str):
+        return isinstance(old, str) and isinstance(new, str) and old == new
+    return old.shape == new.shape and bool(np.array_equal(old, new))
@@ -0,0 +1,259 @@
+import argparse
+import csv
+import heapq
+import math
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from cost_engine import DEFAULT_VALUES, price_batch
+from material_catalog import load_material_catalog
+from tariff import TariffSchedule, get_tariff, hours_since_epoch
+
+# --- Print farm capacity / scheduling simulator ---
+# Schedules a job queue onto a printer roster with heaps: jobs come off a priority queue (priority, release
+# time, submission order) and go to whichever printer can start them first. A printer that already has the
+# job's material loaded is preferred; otherwise the job pays a material swap. Energy is billed under a
+# time-of-use tariff (see tariff.py), and every job is priced with the regular cost formula.
+# Times are hours since `start_time`, the wall-clock moment the simulation begins.
+
+DEFAULT_SWAP_HOURS = 0.25
+
+class Printer:
+    __slots__ = ("name", "wattage", "available_from", "material")
+
+    def __init__(self, name, wattage=DEFAULT_VALUES["printer_wattage_p1s"], available_from=0.0, material=None):
+        self.name = name
+        self.wattage = float(wattage)
+        self.available_from = float(available_from)
+        self.material = material
+
+class FarmJob:
+    __slots__ = ("job_id", "material", "grams", "hours", "selling_price", "priority", "release",
+                 "spool_cost", "labor_hours", "labor_rate", "other_costs")
+
+    def __init__(self, job_id, material, grams, hours, selling_price, priority=0, release=0.0, spool_cost=None,
+                 labor_hours=0.0, labor_rate=0.0, other_costs=DEFAULT_VALUES["other_costs_per_print_inr"]):
+        self.job_id = job_id
+        self.material = material
+        self.grams = float(grams)
+        self.hours = float(hours)
+        self.selling_price = float(selling_price)
+        self.priority = priority
+        self.release = float(release)
+        self.spool_cost = spool_cost
+        self.labor_hours = float(labor_hours)
+        self.labor_rate = float(labor_rate)
+        self.other_costs = float(other_costs)
+
+# --- Scheduling ---
+def schedule(jobs, printers, swap_hours=DEFAULT_SWAP_HOURS):
+    if not printers:
+        raise ValueError("At least one printer is required")
+    count = len(jobs)
+    assigned = np.empty(count, dtype=np.int64)
+    starts = np.empty(count, dtype=np.float64)
+    ends = np.empty(count, dtype=np.float64)
+    swaps = np.zeros(count, dtype=bool)
+
+    free_at = [p.available_from for p in printers]
+    loaded = [p.material for p in printers]
+    version = [0] * len(printers)
+    # Global heap of every printer plus one heap per loaded material; entries are invalidated lazily
+    # by bumping the printer's version whenever its free time or material changes.
+    any_heap = [(free_at[i], i, 0) for i in range(len(printers))]
+    heapq.heapify(any_heap)
+    by_material = {}
+    for i, material in enumerate(loaded):
+        by_material.setdefault(material, []).append((free_at[i], i, 0))
+    for heap in by_material.values():
+        heapq.heapify(heap)
+
+    queue = [(job.priority, job.release, n) for n, job in enumerate(jobs)]
+    heapq.heapify(queue)
+    while queue:
+        _, release, n = heapq.heappop(queue)
+        job = jobs[n]
+
+        best = _peek_valid(any_heap, version)
+        best_start = max(free_at[best], release) + (swap_hours if loaded[best] != job.material else 0.0)
+        match_heap = by_material.get(job.material)
+        if match_heap:
+            match = _peek_valid(match_heap, version)
+            if match is not None and max(free_at[match], release) <= best_start:
+                best, best_start = match, max(free_at[match], release)
+
+        swapped = loaded[best] != job.material
+        end = best_start + job.hours
+        assigned[n], starts[n], ends[n], swaps[n] = best, best_start, end, swapped
+
+        free_at[best] = end
+        loaded[best] = job.material
+        version[best] += 1
+        entry = (end, best, version[best])
+        heapq.heappush(any_heap, entry)
+        heapq.heappush(by_material.setdefault(job.material, []), entry)
+
+    return assigned, starts, ends, swaps
+
+def _peek_valid(heap, version):
+    while heap:
+        _, i, v = heap[0]
+        if v == version[i]:
+            return i
+        heapq.heappop(heap)
+    return None
+
+# --- Simulation ---
+# `tariff` is a TariffSchedule or a flat INR/kWh rate
+def simulate(jobs, printers, tariff=DEFAULT_VALUES["electricity_cost_per_kwh_inr"], start_time=None,
+             swap_hours=DEFAULT_SWAP_HOURS):
+    assigned, starts, ends, swaps = schedule(jobs, printers, swap_hours)
+    if not len(jobs):
+        return {"jobs": 0, "makespan_hours": 0.0, "printers": len(printers)}
+
+    if not isinstance(tariff, TariffSchedule):
+        tariff = TariffSchedule.flat(tariff)
+    t0 = hours_since_epoch(start_time or datetime.now().replace(minute=0, second=0, microsecond=0))
+    catalog = load_material_catalog()
+    wattage = np.array([p.wattage for p in printers])[assigned]
+    hours = ends - starts
+    energy_kwh = wattage / 1000 * hours
+    energy_cost = wattage / 1000 * tariff.cost_per_kw_hours(t0 + starts, t0 + ends)
+    # The cost formula takes a flat tariff, so each job gets its effective (time-weighted) rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        effective_rate = np.where(energy_kwh > 0, energy_cost / energy_kwh, 0.0)
+
+    spool_cost = np.array([
+        job.spool_cost if job.spool_cost is not None
+        else (catalog.get(job.material).spool_cost_inr if job.material in catalog else DEFAULT_VALUES["material_spool_cost_inr"])
+        for job in jobs
+    ], dtype=np.float64)
+    costs = price_batch(
+        np.array([job.selling_price for job in jobs]), spool_cost, np.array([job.grams for job in jobs]),
+        hours, wattage, effective_rate, np.array([job.labor_hours for job in jobs]),
+        np.array([job.labor_rate for job in jobs]), np.array([job.other_costs for job in jobs]),
+    )
+
+    origin = min(min(p.available_from for p in printers), 0.0)
+    makespan = float(ends.max() - origin)
+    busy = np.bincount(assigned, weights=hours, minlength=len(printers))
+    windows = np.array([max(makespan - (p.available_from - origin), 0.0) for p in printers])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilization = np.where(windows > 0, busy / windows, 0.0)
+
+    return {
+        "jobs": len(jobs),
+        "printers": len(printers),
+        "makespan_hours": makespan,
+        "mean_utilization": float(utilization.mean()),
+        "utilization": utilization,
+        "material_swaps": int(swaps.sum()),
+        "energy_kwh": float(energy_kwh.sum()),
+        "energy_cost": float(energy_cost.sum()),
+        "revenue": float(sum(job.selling_price for job in jobs)),
+        "total_cost": float(costs["total_cost"].sum()),
+        "total_profit": float(costs["profit"].sum()),
+        "schedule": {"printer": assigned, "start": starts, "end": ends, "swapped": swaps,
+                     "profit": costs["profit"]},
+    }
+
+# --- CLI ---
+# Numeric CSV cells; errors name the file line and column like bulk_pricing does
+def _number(raw, name, line_no):
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value):
+        raise ValueError(f"Line {line_no}: invalid value {raw!r} for {name}")
+    return value
+
+def load_jobs_csv(path):
+    jobs = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for n, row in enumerate(reader, start=1):
+            def value(name, default):
+                raw = row.get(name)
+                return default if raw in (None, "") else _number(raw, name, reader.line_num)
+            def text(name, default):
+                return row.get(name) or default
+            labor = text("include_labor", DEFAULT_VALUES["include_labor"]) == "Yes"
+            jobs.append(FarmJob(
+                row.get("job_id") or n, text("selected_material", DEFAULT_VALUES["selected_material"]),
+                value("material_used_grams", DEFAULT_VALUES["material_used_grams"]),
+                value("print_duration_hours", DEFAULT_VALUES["print_duration_hours"]),
+                value("selling_price_inr", DEFAULT_VALUES["selling_price_inr"]),
+                priority=value("priority", 0.0), release=value("release_hours", 0.0),
+                spool_cost=value("material_spool_cost_inr", None),
+                labor_hours=value("labor_hours", DEFAULT_VALUES["labor_hours"]) if labor else 0.0,
+                labor_rate=value("labor_hourly_rate_inr", DEFAULT_VALUES["labor_hourly_rate_inr"]) if labor else 0.0,
+                other_costs=value("other_costs_per_print_inr", DEFAULT_VALUES["other_costs_per_print_inr"]),
+            ))
+    return jobs
+
+def load_printers_csv(path):
+    printers = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for n, row in enumerate(reader, start=1):
+            def value(name, default):
+                raw = row.get(name)
+                return default if raw in (None, "") else _number(raw, name, reader.line_num)
+            printers.append(Printer(row.get("name") or f"P{n}", value("wattage", DEFAULT_VALUES["printer_wattage_p1s"]),
+                                    value("available_from", 0.0), row.get("material") or None))
+    return printers
+
+def _load(loader, path):
+    try:
+        return loader(path)
+    except OSError as exc:
+        raise ValueError(f"cannot read {path}: {exc.strerror or exc}") from None
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a print farm working through a job queue.")
+    parser.add_argument("jobs", help="Job CSV (DEFAULT_VALUES columns, plus optional priority/release_hours/job_id).")
+    parser.add_argument("--printers", help="Printer roster CSV (name, wattage, available_from, material).")
+    parser.add_argument("--farm-size", type=int, default=40, help="Identical printers to use when no roster is given.")
+    tariff_group = parser.add_mutually_exclusive_group()
+    tariff_group.add_argument("--tariff", help="Named time-of-use tariff from tariffs.json.")
+    tariff_group.add_argument("--rates", type=float, nargs="+", default=[DEFAULT_VALUES["electricity_cost_per_kwh_inr"]],
+                              help="Flat INR/kWh, or 24 hourly time-of-use rates.")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Simulation start, e.g. 2026-10-19T08:00 (default: this hour).")
+    parser.add_argument("--swap-hours", type=float, default=DEFAULT_SWAP_HOURS)
+    args = parser.parse_args(argv)
+    if args.tariff:
+        try:
+            tariff = get_tariff(args.tariff)
+        except ValueError as exc:
+            parser.error(str(exc))
+    elif len(args.rates) == 24:
+        tariff = TariffSchedule.hourly(args.rates)
+    elif len(args.rates) == 1:
+        tariff = TariffSchedule.flat(args.rates[0])
+    else:
+        parser.error("--rates takes either 1 or 24 values")
+
+    try:
+        jobs = _load(load_jobs_csv, args.jobs)
+        printers = _load(load_printers_csv, args.printers) if args.printers else [Printer(f"P{i + 1}") for i in range(args.farm_size)]
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    report = simulate(jobs, printers, tariff, args.start, args.swap_hours)
+    if not report["jobs"]:
+        print("No jobs to schedule.")
+        return 0
+    print(f"Jobs: {report['jobs']:,} on {report['printers']} printers")
+    print(f"Makespan: {report['makespan_hours']:,.1f} h   Mean utilization: {report['mean_utilization']:.1%}"
+          f"   Material swaps: {report['material_swaps']:,}")
+    print(f"Energy: {report['energy_kwh']:,.1f} kWh costing ₹{report['energy_cost']:,.2f}")
+    print(f"Revenue: ₹{report['revenue']:,.2f}   Cost: ₹{report['total_cost']:,.2f}   Profit: ₹{report['total_profit']:,.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
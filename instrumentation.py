@@ -0,0 +1,283 @@
+import itertools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Opt-in instrumentation ---
+# Timers and counters around the hot paths (app reruns, form handling, calculation, CSS, result rendering,
+# bulk pricing chunks, service batches). Off unless PRINTCALC_INSTRUMENT=1; when off, timer() hands back a
+# shared no-op context manager so the hot paths pay one function call.
+#
+# Exports (all process-wide, shared by every Streamlit session):
+#   PRINTCALC_METRICS_PORT=9108     serve Prometheus text at http://localhost:9108/metrics
+#   PRINTCALC_METRICS_JSON=path     rewrite a JSON snapshot every PRINTCALC_METRICS_INTERVAL seconds (10)
+# The pricing service also exposes GET /metrics.
+#
+# Profiling: PRINTCALC_PROFILE=cprofile|tracemalloc profiles every app rerun (or a CLI run with --profile)
+# and writes one file per run to PRINTCALC_PROFILE_DIR (./profiles). Only one cProfile can run per process
+# (on Python 3.12+ it sits on sys.monitoring and a second one fails to start), so a rerun that overlaps
+# another profiled one runs unprofiled. tracemalloc is process-wide too; overlapping runs share one tracing
+# session, so its snapshots include whatever else was allocating.
+
+METRIC_PREFIX = "printcalc"
+# Latency histogram buckets (seconds) for the Prometheus export
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_MODES = ("cprofile", "tracemalloc")
+DEFAULT_PROFILE_DIR = "profiles"
+
+_NOOP = nullcontext()
+_profile_ids = itertools.count(1)
+
+class _Timer:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._timers = {}    # name -> [count, sum, max, bucket counts...]
+        self._counters = {}
+        self._gauges = {}    # name -> zero-argument callable, read at export time
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else _NOOP
+
+    def observe(self, name, seconds):
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                stats = self._timers[name] = [0, 0.0, 0.0] + [0] * (len(BUCKETS) + 1)
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+            stats[3 + bisect_left(BUCKETS, seconds)] += 1
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name, read):
+        with self._lock:
+            self._gauges[name] = read
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            timers = {
+                name: {"count": stats[0], "total_ms": stats[1] * 1000, "avg_ms": stats[1] / stats[0] * 1000,
+                       "max_ms": stats[2] * 1000}
+                for name, stats in self._timers.items()
+            }
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        return {"uptime_s": time.time() - self.started, "timers": timers, "counters": counters,
+                "gauges": {name: read() for name, read in gauges.items()}}
+
+    def prometheus_text(self):
+        with self._lock:
+            timers = {name: list(stats) for name, stats in self._timers.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        lines = []
+        for name, stats in sorted(timers.items()):
+            metric = _metric_name(name) + "_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS + (float("inf"),), stats[3:]):
+                cumulative += bucket
+                lines.append(f'{metric}_bucket{{le="{"+Inf" if bound == float("inf") else bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {stats[1]:.9f}")
+            lines.append(f"{metric}_count {stats[0]}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            lines.append(f"{metric}_max {stats[2]:.9f}")
+        for name, value in sorted(counters.items()):
+            metric = _metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, read in sorted(gauges.items()):
+            for suffix, value in _flatten(read()):
+                metric = _metric_name(name + suffix)
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+def _metric_name(name):
+    return METRIC_PREFIX + "_" + "".join(c if c.isalnum() else "_" for c in name.lower())
+
+# Gauges may return a number or a flat dict of numbers (e.g. quote_cache.stats())
+def _flatten(value):
+    if isinstance(value, dict):
+        return [(f".{key}", v) for key, v in value.items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    return [("", value)]
+
+registry = MetricsRegistry(enabled=os.environ.get("PRINTCALC_INSTRUMENT", "") not in ("", "0"))
+
+def timer(name):
+    return registry.timer(name)
+
+def count(name, value=1):
+    registry.count(name, value)
+
+# --- Exporters (started once per process) ---
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+def start_exporters():
+    global _exporters_started
+    if not registry.enabled:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    port = os.environ.get("PRINTCALC_METRICS_PORT")
+    if port:
+        serve_prometheus(int(port))
+    json_path = os.environ.get("PRINTCALC_METRICS_JSON")
+    if json_path:
+        start_json_dump(json_path, float(os.environ.get("PRINTCALC_METRICS_INTERVAL", 10)))
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        data = registry.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_prometheus(port, host="0.0.0.0"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="printcalc-metrics", daemon=True).start()
+    return server
+
+def write_json_snapshot(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f, indent=2)
+    os.replace(tmp_path, path)
+
+def start_json_dump(path, interval=10.0):
+    def dump_forever():
+        while True:
+            time.sleep(interval)
+            try:
+                write_json_snapshot(path)
+            except OSError:
+                pass  # Keep trying; a full disk shouldn't take the app down
+    thread = threading.Thread(target=dump_forever, name="printcalc-metrics-json", daemon=True)
+    thread.start()
+    return thread
+
+# --- Profiling ---
+def profile_mode():
+    mode = os.environ.get("PRINTCALC_PROFILE", "").lower()
+    return mode if mode in PROFILE_MODES else None
+
+# tracemalloc is process-wide, so overlapping profiled reruns share one tracing session: the first to start
+# turns it on and the last to finish turns it off (tracing started by someone else is left alone)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+def _start_tracing():
+    global _tracing_users, _tracing_owned
+    import tracemalloc
+
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _stop_tracing():
+    global _tracing_users, _tracing_owned
+    import tracemalloc
+
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+_cprofile_lock = threading.Lock()
+
+# Runs fn() under cProfile or tracemalloc and saves the result; returns (fn's result, saved path). The path
+# is None when cProfile was skipped because another profiler was already running.
+def run_profiled(fn, mode, label="run", output=None):
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}; expected one of {', '.join(PROFILE_MODES)}")
+    if output is None:
+        directory = os.environ.get("PRINTCALC_PROFILE_DIR") or DEFAULT_PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        extension = "prof" if mode == "cprofile" else "tracemalloc"
+        output = os.path.join(directory, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_profile_ids)}.{extension}")
+
+    if mode == "cprofile":
+        import cProfile
+
+        if not _cprofile_lock.acquire(blocking=False):
+            return fn(), None
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # some other tool holds the profiler slot (3.12+)
+                return fn(), None
+            try:
+                result = fn()
+            finally:
+                profiler.disable()
+                profiler.dump_stats(output)
+            return result, output
+        finally:
+            _cprofile_lock.release()
+
+    import tracemalloc
+
+    _start_tracing()
+    try:
+        result = fn()
+    finally:
+        try:
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            _stop_tracing()
+        snapshot.dump(output)
+        # Human-readable summary next to the snapshot
+        with open(output + ".txt", "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:50]:
+                f.write(f"{stat}\n")
+    return result, output
@@ -0,0 +1,220 @@
+import json
+import os
+
+import numpy as np
+
+from cost_engine import DEFAULT_VALUES, calculate_costs, price_batch
+
+# --- Job records and columnar job storage ---
+# PrintJob / QuoteResult are compact fixed-field records (__slots__, no per-instance dict) for single jobs.
+# JobBatch keeps many jobs as one contiguous float64 buffer per numeric field, a uint16 code per job into
+# an interned material table, and a bool labor flag: ~75 bytes a job versus ~500 B for a dict of the same
+# fields. Slicing returns views (no copy), and save()/load() use a flat binary file that loads through
+# np.memmap, so a 10M-job file opens instantly and only the pages that are touched are read.
+
+JOB_FIELDS = list(DEFAULT_VALUES)
+FLOAT_FIELDS = [name for name, value in DEFAULT_VALUES.items() if not isinstance(value, str)]
+RESULT_FIELDS = ["material_cost", "electricity_cost", "labor_cost", "other_costs", "total_cost", "profit",
+                 "profit_margin"]
+
+FILE_MAGIC = b"PCJOBS01"
+ALIGNMENT = 64
+MATERIAL_CODE_DTYPE = np.uint16
+
+class PrintJob:
+    __slots__ = tuple(JOB_FIELDS)
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+        for name, default in DEFAULT_VALUES.items():
+            setattr(self, name, fields.get(name, default))
+
+    # From anything keyed like DEFAULT_VALUES (e.g. st.session_state); other keys are ignored
+    @classmethod
+    def from_mapping(cls, mapping):
+        return cls(**{name: mapping[name] for name in JOB_FIELDS if name in mapping})
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in JOB_FIELDS}
+
+    def __repr__(self):
+        return "PrintJob(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in JOB_FIELDS) + ")"
+
+    def price(self):
+        labor = self.include_labor == "Yes"
+        return QuoteResult.from_dict(calculate_costs(
+            self.selling_price_inr, self.material_spool_cost_inr, self.material_used_grams,
+            self.print_duration_hours, self.printer_wattage_p1s, self.electricity_cost_per_kwh_inr,
+            self.labor_hours if labor else 0.0, self.labor_hourly_rate_inr if labor else 0.0,
+            self.other_costs_per_print_inr,
+        ))
+
+class QuoteResult:
+    __slots__ = tuple(RESULT_FIELDS)
+
+    def __init__(self, material_cost, electricity_cost, labor_cost, other_costs, total_cost, profit, profit_margin):
+        self.material_cost = float(material_cost)
+        self.electricity_cost = float(electricity_cost)
+        self.labor_cost = float(labor_cost)
+        self.other_costs = float(other_costs)
+        self.total_cost = float(total_cost)
+        self.profit = float(profit)
+        self.profit_margin = float(profit_margin)
+
+    @classmethod
+    def from_dict(cls, costs):
+        return cls(*(costs[name] for name in RESULT_FIELDS))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in RESULT_FIELDS}
+
+    def __repr__(self):
+        return "QuoteResult(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in RESULT_FIELDS) + ")"
+
+class JobBatch:
+    def __init__(self, floats, material_codes, include_labor, materials):
+        self.floats = floats                  # field -> float64 column
+        self.material_codes = material_codes  # uint16 index into self.materials
+        self.include_labor = include_labor    # bool column
+        self.materials = materials            # interned material names (tuple, shared by slices)
+        lengths = {len(column) for column in floats.values()} | {len(material_codes), len(include_labor)}
+        if len(lengths) > 1:
+            raise ValueError("All JobBatch columns must have the same length")
+
+    # --- Building ---
+    @classmethod
+    def empty(cls, length=0):
+        return cls({name: np.full(length, float(DEFAULT_VALUES[name])) for name in FLOAT_FIELDS},
+                   np.zeros(length, dtype=MATERIAL_CODE_DTYPE), np.zeros(length, dtype=bool),
+                   (DEFAULT_VALUES["selected_material"],))
+
+    # Columns keyed like DEFAULT_VALUES (bulk_pricing.chunk_to_columns output, lists, arrays or scalars)
+    @classmethod
+    def from_columns(cls, columns, length=None):
+        if length is None:
+            length = max((np.size(value) for value in columns.values()), default=0)
+        floats = {}
+        for name in FLOAT_FIELDS:
+            value = columns.get(name, DEFAULT_VALUES[name])
+            floats[name] = np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=np.float64), (length,)))
+        names = np.broadcast_to(np.asarray(columns.get("selected_material", DEFAULT_VALUES["selected_material"]),
+                                           dtype=object), (length,))
+        materials, codes = _intern(names)
+        labor = np.broadcast_to(np.asarray(columns.get("include_labor", DEFAULT_VALUES["include_labor"])), (length,))
+        return cls(floats, codes, labor == "Yes", materials)
+
+    @classmethod
+    def from_jobs(cls, jobs):
+        jobs = list(jobs)
+        records = [job.as_dict() if isinstance(job, PrintJob) else job for job in jobs]
+        columns = {name: [record.get(name, DEFAULT_VALUES[name]) for record in records] for name in JOB_FIELDS}
+        return cls.from_columns(columns, len(records))
+
+    @classmethod
+    def concat(cls, batches):
+        batches = list(batches)
+        materials = tuple(sorted({name for batch in batches for name in batch.materials}))
+        index = {name: code for code, name in enumerate(materials)}
+        codes = [np.array([index[name] for name in batch.materials], dtype=MATERIAL_CODE_DTYPE)[batch.material_codes]
+                 if len(batch) else np.zeros(0, dtype=MATERIAL_CODE_DTYPE) for batch in batches]
+        return cls({name: np.concatenate([batch.floats[name] for batch in batches]) for name in FLOAT_FIELDS},
+                   np.concatenate(codes), np.concatenate([batch.include_labor for batch in batches]), materials)
+
+    # --- Access ---
+    def __len__(self):
+        return len(self.material_codes)
+
+    # Integer -> PrintJob; slice -> JobBatch view over the same buffers (no copy); other indexers
+    # (boolean masks, index arrays) follow NumPy and copy
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            fields = {name: column[key].item() for name, column in self.floats.items()}
+            fields["printer_wattage_p1s"] = int(fields["printer_wattage_p1s"])
+            fields["selected_material"] = self.materials[self.material_codes[key]]
+            fields["include_labor"] = "Yes" if self.include_labor[key] else "No"
+            return PrintJob(**fields)
+        return JobBatch({name: column[key] for name, column in self.floats.items()}, self.material_codes[key],
+                        self.include_labor[key], self.materials)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def material_column(self):
+        return np.asarray(self.materials, dtype=object)[self.material_codes]
+
+    # Mapping accepted by price_columns() / sweep code; materials and labor decoded to strings
+    def as_columns(self):
+        columns = dict(self.floats)
+        columns["selected_material"] = self.material_column()
+        columns["include_labor"] = np.where(self.include_labor, "Yes", "No")
+        return columns
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.floats.values()) + self.material_codes.nbytes + self.include_labor.nbytes
+
+    def price(self):
+        labor = self.include_labor
+        f = self.floats
+        return price_batch(
+            f["selling_price_inr"], f["material_spool_cost_inr"], f["material_used_grams"],
+            f["print_duration_hours"], f["printer_wattage_p1s"], f["electricity_cost_per_kwh_inr"],
+            np.where(labor, f["labor_hours"], 0.0), np.where(labor, f["labor_hourly_rate_inr"], 0.0),
+            f["other_costs_per_print_inr"],
+        )
+
+    # --- Binary file (header JSON + 64-byte aligned raw columns) ---
+    def save(self, path):
+        columns = [(name, self.floats[name]) for name in FLOAT_FIELDS]
+        columns += [("selected_material", self.material_codes), ("include_labor", self.include_labor)]
+        layout, offset = [], 0
+        for name, column in columns:
+            layout.append({"name": name, "dtype": column.dtype.str, "offset": offset})
+            offset = _align(offset + column.nbytes)
+        header = json.dumps({"length": len(self), "materials": list(self.materials), "columns": layout}).encode("utf-8")
+        data_start = _align(len(FILE_MAGIC) + 8 + len(header))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(FILE_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for entry, (_, column) in zip(layout, columns):
+                f.seek(data_start + entry["offset"])
+                np.ascontiguousarray(column).tofile(f)
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+
+    # mmap=True maps the columns read-only straight from the file; mmap=False reads them into memory
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(path, "rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"{path} is not a JobBatch file")
+            header_size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_size))
+        data_start = _align(len(FILE_MAGIC) + 8 + header_size)
+        length = header["length"]
+        columns = {}
+        for entry in header["columns"]:
+            dtype = np.dtype(entry["dtype"])
+            if mmap and length:
+                columns[entry["name"]] = np.memmap(path, dtype=dtype, mode="r", offset=data_start + entry["offset"],
+                                                   shape=(length,))
+            else:
+                columns[entry["name"]] = np.fromfile(path, dtype=dtype, count=length, offset=data_start + entry["offset"])
+        return cls({name: columns[name] for name in FLOAT_FIELDS}, columns["selected_material"],
+                   columns["include_labor"], tuple(header["materials"]))
+
+# Material names -> (table in first-seen order, uint16 codes); a dict lookup per row beats sorting strings
+def _intern(names):
+    index = {}
+    codes = np.fromiter((index.setdefault(str(name), len(index)) for name in names), dtype=np.int64, count=len(names))
+    if len(index) > np.iinfo(MATERIAL_CODE_DTYPE).max + 1:
+        raise ValueError("Too many distinct materials for one JobBatch")
+    return tuple(index), codes.astype(MATERIAL_CODE_DTYPE)
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,72 @@
+import csv
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# --- Material catalog ---
+# Per-material defaults (spool cost, density, printer power) loaded once from materials.json (or a CSV
+# with the same columns). PRINTCALC_MATERIALS_FILE points at a different file.
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials.json")
+
+class MaterialRecord:
+    __slots__ = ("name", "spool_cost_inr", "density_g_cm3", "printer_wattage")
+
+    def __init__(self, name, spool_cost_inr, density_g_cm3, printer_wattage):
+        self.name = name
+        self.spool_cost_inr = float(spool_cost_inr)
+        self.density_g_cm3 = float(density_g_cm3)
+        self.printer_wattage = int(float(printer_wattage))
+
+    def __repr__(self):
+        return (f"MaterialRecord(name={self.name!r}, spool_cost_inr={self.spool_cost_inr}, "
+                f"density_g_cm3={self.density_g_cm3}, printer_wattage={self.printer_wattage})")
+
+class MaterialCatalog:
+    def __init__(self, records):
+        self.records = {}
+        for record in records:
+            if record.name in self.records:
+                raise ValueError(f"Duplicate material in catalog: {record.name}")
+            self.records[record.name] = record
+        if not self.records:
+            raise ValueError("Material catalog is empty")
+        self.names = list(self.records)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def __contains__(self, name):
+        return name in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, name):
+        return self.records.get(name)
+
+    def index_of(self, name, default=0):
+        return self._index.get(name, default)
+
+    # Vectorized lookup for batch pricing: one attribute per material name, `default` for unknown names
+    def lookup_column(self, names, attribute, default=np.nan):
+        values = {name: getattr(record, attribute) for name, record in self.records.items()}
+        return np.fromiter((values.get(name, default) for name in names), dtype=np.float64, count=len(names))
+
+def load_material_catalog(path=None):
+    path = path or os.environ.get("PRINTCALC_MATERIALS_FILE") or DEFAULT_CATALOG_PATH
+    return _load_catalog_file(os.path.abspath(path))
+
+@lru_cache(maxsize=None)
+def _load_catalog_file(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = json.load(f)
+    try:
+        records = [MaterialRecord(row["name"], row["spool_cost_inr"], row["density_g_cm3"], row["printer_wattage"])
+                   for row in rows]
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid material catalog {path}: {exc}") from None
+    return MaterialCatalog(records)
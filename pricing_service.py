@@ -0,0 +1,273 @@
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from bulk_pricing import RESULT_FIELDS, chunk_to_columns
+from cost_engine import DEFAULT_VALUES, price_columns
+from instrumentation import registry, timer
+from material_catalog import load_material_catalog
+from quote_cache import quote_cache
+from solver import solve_quote
+
+# --- Standalone JSON pricing service (no Streamlit) ---
+#   python pricing_service.py --port 8765
+#
+#   POST /v1/price          one job, fields named like DEFAULT_VALUES (+ optional "target_margin")
+#   POST /v1/price/batch    {"jobs": [...]}, priced in one vectorized pass
+#   GET  /v1/metrics        request counters and latency (JSON)
+#   GET  /metrics           the same plus instrumentation timers, as Prometheus text
+#   GET  /healthz
+# Connections are HTTP/1.1 keep-alive, so clients can reuse a socket across requests.
+# Routes match the path without its query string. Metrics are kept per route; requests to any unknown path
+# are counted under one "other" endpoint, so clients can't grow the metrics (or Prometheus labels) at will.
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_BATCH_JOBS = 1_000_000
+OTHER_ENDPOINT = "other"
+
+class ServiceMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}
+
+    def record(self, endpoint, status, seconds, jobs=1):
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                "requests": 0, "errors": 0, "jobs": 0, "latency_sum_ms": 0.0, "latency_max_ms": 0.0,
+            })
+            stats["requests"] += 1
+            stats["errors"] += status >= 400
+            stats["jobs"] += jobs if status < 400 else 0
+            ms = seconds * 1000
+            stats["latency_sum_ms"] += ms
+            stats["latency_max_ms"] = max(stats["latency_max_ms"], ms)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {}
+            for name, stats in self.endpoints.items():
+                endpoints[name] = dict(stats, latency_avg_ms=stats["latency_sum_ms"] / stats["requests"])
+            return {"uptime_s": time.time() - self.started, "endpoints": endpoints, "quote_cache": quote_cache.stats()}
+
+    # Prometheus text: per-endpoint series, then the shared instrumentation registry (quote cache included)
+    def prometheus_text(self):
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self.endpoints.items()}
+        lines = []
+        for key, metric, kind in (("requests", "requests_total", "counter"), ("errors", "errors_total", "counter"),
+                                  ("jobs", "jobs_total", "counter"), ("latency_sum_ms", "latency_ms_sum", "counter"),
+                                  ("latency_max_ms", "latency_ms_max", "gauge")):
+            lines.append(f"# TYPE printcalc_service_{metric} {kind}")
+            for name, stats in sorted(endpoints.items()):
+                lines.append(f'printcalc_service_{metric}{{endpoint="{_label(name)}"}} {stats[key]}')
+        return "\n".join(lines) + "\n" + registry.prometheus_text()
+
+# Label values in the exposition format escape backslash, double quote and newline
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# --- Request handling ---
+class BadRequest(ValueError):
+    pass
+
+def normalize_job(payload):
+    if not isinstance(payload, dict):
+        raise BadRequest("Each job must be a JSON object")
+    job = {}
+    for name, default in DEFAULT_VALUES.items():
+        raw = payload.get(name)
+        if isinstance(default, str):
+            if raw is not None and not isinstance(raw, str):
+                raise BadRequest(f"Invalid value {raw!r} for {name}: expected a string")
+            job[name] = raw or default
+            continue
+        if raw is None or raw == "":
+            job[name] = None
+            continue
+        job[name] = _finite_float(raw, name)
+
+    record = load_material_catalog().get(job["selected_material"])
+    if job["material_spool_cost_inr"] is None:
+        job["material_spool_cost_inr"] = record.spool_cost_inr if record else DEFAULT_VALUES["material_spool_cost_inr"]
+    if job["printer_wattage_p1s"] is None:
+        job["printer_wattage_p1s"] = record.printer_wattage if record else DEFAULT_VALUES["printer_wattage_p1s"]
+    for name, value in job.items():
+        if value is None:
+            job[name] = DEFAULT_VALUES[name]
+    return job
+
+# bools are ints in Python, but true/false in a numeric field is a client bug rather than 1/0
+def _finite_float(raw, name):
+    if isinstance(raw, bool):
+        raise BadRequest(f"Invalid value {raw!r} for {name}")
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        raise BadRequest(f"Invalid value {raw!r} for {name}") from None
+    if not math.isfinite(value):
+        raise BadRequest(f"Invalid value {raw!r} for {name}: must be a finite number")
+    return value
+
+def price_single(payload):
+    job = normalize_job(payload)
+    labor = job["include_labor"] == "Yes"
+    labor_hours = job["labor_hours"] if labor else 0.0
+    labor_rate = job["labor_hourly_rate_inr"] if labor else 0.0
+    costs = quote_cache.get_or_compute(
+        job["selected_material"], job["selling_price_inr"], job["material_spool_cost_inr"],
+        job["material_used_grams"], job["print_duration_hours"], job["printer_wattage_p1s"],
+        job["electricity_cost_per_kwh_inr"], job["include_labor"], labor_hours, labor_rate,
+        job["other_costs_per_print_inr"],
+    )
+    result = {out_name: costs[name] for out_name, name in RESULT_FIELDS.items()}
+
+    target_margin = payload.get("target_margin")
+    if target_margin is not None:
+        target_margin = _finite_float(target_margin, "target_margin")
+        result.update(_finite_or_none(solve_quote(
+            job["selling_price_inr"], job["material_spool_cost_inr"], job["material_used_grams"],
+            job["print_duration_hours"], job["printer_wattage_p1s"], job["electricity_cost_per_kwh_inr"],
+            labor_hours, labor_rate, job["other_costs_per_print_inr"], target_margin,
+        )))
+    return result
+
+def price_many(payload):
+    jobs = payload.get("jobs") if isinstance(payload, dict) else None
+    if not isinstance(jobs, list):
+        raise BadRequest('Batch body must be {"jobs": [...]}')
+    if len(jobs) > MAX_BATCH_JOBS:
+        raise BadRequest(f"At most {MAX_BATCH_JOBS:,} jobs per batch")
+    if not all(isinstance(job, dict) for job in jobs):
+        raise BadRequest("Each job must be a JSON object")
+    if not jobs:
+        return {"results": []}
+    try:
+        with timer("service.batch_columns"):
+            columns = chunk_to_columns(jobs, row_label="Job")
+    except ValueError as exc:
+        raise BadRequest(str(exc)) from None
+    with timer("service.batch_price"):
+        results = price_columns(columns)
+    columns = {out_name: results[name].tolist() for out_name, name in RESULT_FIELDS.items()}
+    return {"results": [dict(zip(columns, row)) for row in zip(*columns.values())]}
+
+def _finite_or_none(values):
+    # JSON has no inf/NaN; unbounded or unreachable limits are reported as null
+    return {key: (value if value == value and abs(value) != float("inf") else None) for key, value in values.items()}
+
+# NaN/Infinity aren't JSON; fail loudly here rather than send a body clients can't parse
+def _dumps(body):
+    return json.dumps(body, allow_nan=False).encode("utf-8")
+
+class PricingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Responses are written as headers + body; without TCP_NODELAY keep-alive clients hit ~40 ms delayed-ACK stalls
+    disable_nagle_algorithm = True
+    server_version = "PrintPricing/1.0"
+    metrics = None
+    verbose = False
+
+    def do_GET(self):
+        route = urlsplit(self.path).path
+        if route == "/healthz":
+            self._send(200, {"status": "ok"})
+        elif route == "/v1/metrics":
+            self._send(200, self.metrics.snapshot())
+        elif route == "/metrics":
+            self._send_text(200, self.metrics.prometheus_text())
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        handlers = {"/v1/price": price_single, "/v1/price/batch": price_many}
+        route = urlsplit(self.path).path
+        handler = handlers.get(route)
+        start = time.perf_counter()
+        jobs = 1
+        status = 500
+        try:
+            if handler is None:
+                status, data = 404, _dumps({"error": "Not found"})
+            else:
+                try:
+                    payload = self._read_json()
+                    if handler is price_many:
+                        jobs = len(payload.get("jobs") or []) if isinstance(payload, dict) else 0
+                    status, data = 200, _dumps(handler(payload))
+                except BadRequest as exc:
+                    status, data = 400, _dumps({"error": str(exc)})
+                except Exception:
+                    # Answer and count the request instead of dropping the connection
+                    traceback.print_exc(file=sys.stderr)
+                    status, data = 500, _dumps({"error": "Internal server error"})
+            self._send_bytes(status, data, "application/json")
+        finally:
+            self.metrics.record(route if handler else OTHER_ENDPOINT, status, time.perf_counter() - start, jobs)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise BadRequest("Content-Length header is required") from None
+        if length < 0 or length > MAX_BODY_BYTES:
+            # The body (if any) is left unread, so this connection can't carry another request
+            self.close_connection = True
+            raise BadRequest("Invalid Content-Length" if length < 0 else "Request body too large")
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise BadRequest("Body is not valid JSON") from None
+
+    def _send(self, status, body):
+        self._send_bytes(status, _dumps(body), "application/json")
+
+    def _send_text(self, status, text):
+        self._send_bytes(status, text.encode("utf-8"), "text/plain; version=0.0.4")
+
+    def _send_bytes(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+def create_server(host="127.0.0.1", port=8765, verbose=False):
+    handler = type("BoundPricingRequestHandler", (PricingRequestHandler,), {
+        "metrics": ServiceMetrics(), "verbose": verbose,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    registry.gauge("quote_cache", quote_cache.stats)
+    load_material_catalog()  # warm the catalog before the first request
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the 3D print cost model over JSON/HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.verbose)
+    print(f"Pricing service listening on http://{args.host}:{server.server_address[1]}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import threading
+from collections import OrderedDict
+
+from cost_engine import calculate_costs
+
+# --- Shared quote result cache ---
+# Operators re-quote the same parts with the same parameters all the time. This bounded LRU sits in front
+# of calculate_costs() and, being a module-level object, is shared by every Streamlit session in the process.
+# Size is configurable with PRINTCALC_QUOTE_CACHE_SIZE (0 disables caching).
+
+DEFAULT_MAX_SIZE = 4096
+
+class QuoteCache:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        if max_size < 0:
+            raise ValueError("max_size must be >= 0")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Same inputs as the form; labor is folded in so "No" quotes hit regardless of the hidden labor fields
+    @staticmethod
+    def make_key(material, selling_price, material_spool_cost, material_used_grams, print_duration_hours,
+                 printer_wattage, electricity_cost_per_kwh, include_labor, labor_hours, labor_hourly_rate,
+                 other_costs):
+        if include_labor != "Yes":
+            labor_hours = labor_hourly_rate = 0.0
+        return (
+            material, float(selling_price), float(material_spool_cost), float(material_used_grams),
+            float(print_duration_hours), float(printer_wattage), float(electricity_cost_per_kwh),
+            float(labor_hours), float(labor_hourly_rate), float(other_costs),
+        )
+
+    def get_or_compute(self, material, selling_price, material_spool_cost, material_used_grams,
+                       print_duration_hours, printer_wattage, electricity_cost_per_kwh, include_labor,
+                       labor_hours, labor_hourly_rate, other_costs, compute=None):
+        key = self.make_key(material, selling_price, material_spool_cost, material_used_grams,
+                            print_duration_hours, printer_wattage, electricity_cost_per_kwh, include_labor,
+                            labor_hours, labor_hourly_rate, other_costs)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(result)
+            self.misses += 1
+
+        # `compute` lets callers supply their own (e.g. incremental) calculation for a miss
+        result = compute() if compute is not None else calculate_costs(*key[1:])
+        if self.max_size:
+            with self._lock:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return dict(result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries), "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+quote_cache = QuoteCache(int(os.environ.get("PRINTCALC_QUOTE_CACHE_SIZE", DEFAULT_MAX_SIZE)))
@@ -0,0 +1,194 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+# --- Persistent quote history ---
+# Every calculation is appended to a local SQLite log. record() only enqueues; a background thread writes
+# in batches (one transaction per batch) so the UI thread never waits on disk. Indexed by material, time
+# and margin so queries like "ABS quotes under 20% margin last month" stay fast at millions of rows.
+# PRINTCALC_HISTORY_DB sets the database path.
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quote_history.db")
+
+COLUMNS = [
+    "created_at", "material", "selling_price", "material_spool_cost", "material_used_grams",
+    "print_duration_hours", "printer_wattage", "electricity_cost_per_kwh", "include_labor", "labor_hours",
+    "labor_hourly_rate", "other_costs", "material_cost", "electricity_cost", "labor_cost", "total_cost",
+    "profit", "profit_margin",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    material TEXT NOT NULL,
+    selling_price REAL, material_spool_cost REAL, material_used_grams REAL, print_duration_hours REAL,
+    printer_wattage REAL, electricity_cost_per_kwh REAL, include_labor TEXT, labor_hours REAL,
+    labor_hourly_rate REAL, other_costs REAL,
+    material_cost REAL, electricity_cost REAL, labor_cost REAL, total_cost REAL, profit REAL, profit_margin REAL
+);
+CREATE INDEX IF NOT EXISTS idx_quotes_material_time ON quotes (material, created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_time ON quotes (created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_margin ON quotes (profit_margin);
+"""
+
+_STOP = object()
+
+class QuoteHistory:
+    def __init__(self, path=DEFAULT_HISTORY_PATH, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0  # rows the writer couldn't insert (logged to stderr)
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._reader = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, name="quote-history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Writing ---
+    def record(self, inputs, results, created_at=None):
+        if self._closed:
+            raise RuntimeError("Quote history is closed")
+        created_at = created_at or datetime.now()
+        self._queue.put((
+            created_at.timestamp(), inputs["material"], inputs["selling_price"], inputs["material_spool_cost"],
+            inputs["material_used_grams"], inputs["print_duration_hours"], inputs["printer_wattage"],
+            inputs["electricity_cost_per_kwh"], inputs["include_labor"], inputs["labor_hours"],
+            inputs["labor_hourly_rate"], inputs["other_costs"], results["material_cost"],
+            results["electricity_cost"], results["labor_cost"], results["total_cost"], results["profit"],
+            results["profit_margin"],
+        ))
+
+    def record_many(self, rows):
+        # Pre-built rows in COLUMNS order (created_at as a Unix timestamp), e.g. from batch pricing.
+        # All rows are checked before any is queued.
+        if self._closed:
+            raise RuntimeError("Quote history is closed")
+        rows = [tuple(row) for row in rows]
+        for i, row in enumerate(rows):
+            if len(row) != len(COLUMNS):
+                raise ValueError(f"Row {i}: expected {len(COLUMNS)} values in COLUMNS order, got {len(row)}")
+        for row in rows:
+            self._queue.put(row)
+
+    def _write_loop(self):
+        conn = self._connect()
+        insert = f"INSERT INTO quotes ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            rows = [item for item in batch if item is not _STOP]
+            stopping = len(rows) != len(batch)
+            try:
+                if rows:
+                    self._insert(conn, insert, rows)
+            finally:
+                # Always, or flush() would wait forever on a batch that failed
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    # One transaction per batch; if it fails (rolled back by `with conn`), retry row by row so one bad row
+    # doesn't cost the rest of the batch. The writer thread never dies on a bad row.
+    def _insert(self, conn, insert, rows):
+        try:
+            with conn:
+                conn.executemany(insert, rows)
+            return
+        except Exception:
+            pass
+        failed, last_error = 0, None
+        for row in rows:
+            try:
+                with conn:
+                    conn.execute(insert, row)
+            except Exception as exc:
+                failed, last_error = failed + 1, exc
+        if failed:
+            self.dropped += failed
+            print(f"quote history: dropped {failed} of {len(rows)} rows ({type(last_error).__name__}: {last_error})",
+                  file=sys.stderr)
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    # --- Querying ---
+    def query(self, material=None, since=None, until=None, min_margin=None, max_margin=None, limit=1000):
+        clauses, params = [], []
+        if material is not None:
+            clauses.append("material = ?")
+            params.append(material)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until.timestamp())
+        if min_margin is not None:
+            clauses.append("profit_margin >= ?")
+            params.append(min_margin)
+        if max_margin is not None:
+            clauses.append("profit_margin < ?")
+            params.append(max_margin)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM quotes"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._read_lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        quotes = []
+        for row in rows:
+            quote = dict(zip(COLUMNS, row))
+            quote["created_at"] = datetime.fromtimestamp(quote["created_at"])
+            quotes.append(quote)
+        return quotes
+
+    def count(self):
+        with self._read_lock:
+            return self._reader.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+# --- Process-wide instance shared by all sessions ---
+_history = None
+_history_lock = threading.Lock()
+
+def get_quote_history():
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = QuoteHistory(os.environ.get("PRINTCALC_HISTORY_DB") or DEFAULT_HISTORY_PATH)
+        return _history
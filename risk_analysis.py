@@ -0,0 +1,217 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cost_engine import DEFAULT_VALUES, price_batch
+
+# --- Monte Carlo risk analysis ---
+# Slicer estimates drift and prints fail. For one job, draws grams, hours, printer power and tariff from
+# distributions around the entered values, adds failed attempts, and runs every sample through the regular
+# cost formula (price_batch). Reports the expected profit, P5/P95 and the probability of a loss.
+#
+# Samples are drawn in fixed blocks of SEED_BLOCK, each with its own generator spawned from a SeedSequence,
+# so a given seed gives the same answer for any CHUNK_SIZE or worker count. Blocks are priced CHUNK_SIZE
+# samples (rounded to whole blocks) at a time, which keeps the temporaries the size of one chunk. Only the
+# per-sample profit is kept (float32, 4 MB per million samples) for exact percentiles.
+# Jobs in a file run in parallel across processes.
+#
+#   python risk_analysis.py jobs.csv --samples 1000000 --failure-rate 0.05 -j 0 -o risk.csv
+
+DEFAULT_SAMPLES = 1_000_000
+CHUNK_SIZE = 1 << 17
+SEED_BLOCK = 1 << 14
+DISTRIBUTIONS = ("normal", "uniform", "triangular")
+
+# Tolerances are ± fractions of the entered value. For "normal" the tolerance is two standard deviations
+# (~95% of samples inside it); "uniform" and "triangular" never go past it. Samples are clipped at zero.
+# A failed attempt wastes a uniformly random fraction of the job's material and machine time before the
+# reprint; attempts repeat until one succeeds.
+class RiskSpec:
+    __slots__ = ("grams_tolerance", "hours_tolerance", "wattage_tolerance", "tariff_tolerance", "failure_rate",
+                 "distribution")
+
+    def __init__(self, grams_tolerance=0.1, hours_tolerance=0.1, wattage_tolerance=0.1, tariff_tolerance=0.0,
+                 failure_rate=0.05, distribution="normal"):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {distribution!r}; expected one of {', '.join(DISTRIBUTIONS)}")
+        if not 0 <= failure_rate < 1:
+            raise ValueError("failure_rate must be in [0, 1)")
+        tolerances = (grams_tolerance, hours_tolerance, wattage_tolerance, tariff_tolerance)
+        if any(t < 0 for t in tolerances):
+            raise ValueError("Tolerances cannot be negative")
+        self.grams_tolerance, self.hours_tolerance, self.wattage_tolerance, self.tariff_tolerance = map(float, tolerances)
+        self.failure_rate = float(failure_rate)
+        self.distribution = distribution
+
+    def __repr__(self):
+        return "RiskSpec(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__) + ")"
+
+def _factors(rng, tolerance, size, distribution):
+    if tolerance == 0:
+        return 1.0
+    if distribution == "uniform":
+        factors = rng.uniform(1 - tolerance, 1 + tolerance, size)
+    elif distribution == "triangular":
+        factors = rng.triangular(1 - tolerance, 1, 1 + tolerance, size)
+    else:
+        factors = rng.normal(1, tolerance / 2, size)
+    return np.maximum(factors, 0.0)
+
+# Material/time multiplier from failed attempts: 1 + the wasted fraction of every failed try
+def _failure_factor(rng, failure_rate, size):
+    if failure_rate == 0:
+        return 1.0
+    failures = rng.geometric(1 - failure_rate, size) - 1
+    waste = np.zeros(size)
+    for attempt in range(int(failures.max())):
+        failed = failures > attempt
+        waste[failed] += rng.random(int(failed.sum()))
+    return 1 + waste
+
+# Multipliers on grams, hours, wattage and tariff for one block, always drawn in this order and written into
+# `out` (four arrays of the block's size)
+def _draw_block(spec, seed_sequence, out):
+    rng = np.random.default_rng(seed_sequence)
+    size, dist = len(out[0]), spec.distribution
+    rework = _failure_factor(rng, spec.failure_rate, size)
+    out[0][:] = _factors(rng, spec.grams_tolerance, size, dist) * rework
+    out[1][:] = _factors(rng, spec.hours_tolerance, size, dist) * rework
+    out[2][:] = _factors(rng, spec.wattage_tolerance, size, dist)
+    out[3][:] = _factors(rng, spec.tariff_tolerance, size, dist)
+
+def _sample_chunk(job, spec, seed_sequences, sizes):
+    grams, hours, wattage, tariff = factors = np.empty((4, sum(sizes)))
+    offset = 0
+    for seed_sequence, size in zip(seed_sequences, sizes):
+        _draw_block(spec, seed_sequence, factors[:, offset:offset + size])
+        offset += size
+    # Scale in place so the chunk doesn't hold a second set of columns
+    grams *= job["material_used_grams"]
+    hours *= job["print_duration_hours"]
+    wattage *= job["printer_wattage_p1s"]
+    tariff *= job["electricity_cost_per_kwh_inr"]
+    labor = job["include_labor"] == "Yes"
+    costs = price_batch(
+        job["selling_price_inr"], job["material_spool_cost_inr"], grams, hours, wattage, tariff,
+        job["labor_hours"] if labor else 0.0, job["labor_hourly_rate_inr"] if labor else 0.0,
+        job["other_costs_per_print_inr"],
+    )
+    return np.broadcast_to(costs["profit"], (sum(sizes),)).astype(np.float32)
+
+# `job` is keyed like DEFAULT_VALUES (missing fields use the defaults)
+def simulate_job(job, spec=None, samples=DEFAULT_SAMPLES, seed=0):
+    if samples <= 0:
+        raise ValueError("samples must be positive")
+    spec = spec or RiskSpec()
+    job = {name: job.get(name, default) for name, default in DEFAULT_VALUES.items()}
+    sizes = [SEED_BLOCK] * (samples // SEED_BLOCK) + ([samples % SEED_BLOCK] if samples % SEED_BLOCK else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    blocks_per_chunk = max(1, CHUNK_SIZE // SEED_BLOCK)
+    profit = np.empty(samples, dtype=np.float32)
+    offset = 0
+    for first in range(0, len(sizes), blocks_per_chunk):
+        chunk_sizes = sizes[first:first + blocks_per_chunk]
+        chunk = _sample_chunk(job, spec, seeds[first:first + blocks_per_chunk], chunk_sizes)
+        profit[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+
+    p5, p50, p95 = np.percentile(profit, [5, 50, 95])
+    selling_price = float(job["selling_price_inr"])
+    expected = float(profit.mean(dtype=np.float64))
+    return {
+        "samples": samples,
+        "expected_profit": expected,
+        "profit_std": float(profit.std(dtype=np.float64)),
+        "profit_p5": float(p5), "profit_p50": float(p50), "profit_p95": float(p95),
+        "prob_loss": float(np.count_nonzero(profit < 0) / samples),
+        "expected_margin": expected / selling_price * 100 if selling_price > 0 else 0.0,
+    }
+
+def _simulate_indexed(args):
+    index, job, spec, samples, seed = args
+    return index, simulate_job(job, spec, samples, seed)
+
+# One independent seed per job (spawned from `seed`), so results don't depend on the worker count
+def simulate_jobs(jobs, spec=None, samples=DEFAULT_SAMPLES, seed=0, workers=1):
+    jobs = list(jobs)
+    job_seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(jobs))]
+    tasks = [(i, job, spec, samples, job_seeds[i]) for i, job in enumerate(jobs)]
+    results = [None] * len(jobs)
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for index, result in pool.map(_simulate_indexed, tasks):
+                results[index] = result
+    else:
+        for task in tasks:
+            index, result = _simulate_indexed(task)
+            results[index] = result
+    return results
+
+# --- CLI ---
+RISK_FIELDS = ["expected_profit", "profit_std", "profit_p5", "profit_p50", "profit_p95", "prob_loss", "expected_margin"]
+
+def main(argv=None):
+    from bulk_pricing import check_fields, chunk_to_columns
+
+    parser = argparse.ArgumentParser(description="Monte Carlo profit risk for each job in a CSV export.")
+    parser.add_argument("input", help="Job CSV (DEFAULT_VALUES columns).")
+    parser.add_argument("-o", "--output", default="-", help="Where to write per-job risk (default: stdout).")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Samples per job.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--grams-tol", type=float, default=0.1, help="± fraction on material used.")
+    parser.add_argument("--hours-tol", type=float, default=0.1, help="± fraction on print duration.")
+    parser.add_argument("--wattage-tol", type=float, default=0.1, help="± fraction on printer power.")
+    parser.add_argument("--tariff-tol", type=float, default=0.0, help="± fraction on the electricity rate.")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="Chance any one attempt fails.")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="normal")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Worker processes (0 = one per CPU core).")
+    parser.add_argument("--ignore-unknown-columns", action="store_true",
+                        help="Warn about columns that aren't job fields instead of failing.")
+    args = parser.parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    try:
+        spec = RiskSpec(args.grams_tol, args.hours_tol, args.wattage_tol, args.tariff_tol, args.failure_rate,
+                        args.distribution)
+        # utf-8-sig and reader.line_num as in bulk_pricing: DictReader skips blank lines, so counting rows
+        # would misreport the line of a bad value
+        with open(args.input, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            check_fields(reader.fieldnames or [], strict=not args.ignore_unknown_columns)
+            rows, line_numbers = [], []
+            for row in reader:
+                rows.append(row)
+                line_numbers.append(reader.line_num)
+        columns = chunk_to_columns(rows, line_numbers=line_numbers)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    jobs = [{name: column[i] for name, column in columns.items()} for i in range(len(rows))]
+
+    start = time.perf_counter()
+    results = simulate_jobs(jobs, spec, args.samples, args.seed, workers)
+    elapsed = time.perf_counter() - start
+
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.writer(out_stream)
+        writer.writerow(["line", "selected_material", "selling_price_inr"] + RISK_FIELDS)
+        for line, job, result in zip(line_numbers, jobs, results):
+            writer.writerow([line, job["selected_material"], job["selling_price_inr"]]
+                            + [round(result[name], 4) for name in RISK_FIELDS])
+    finally:
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    total = len(jobs) * args.samples
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Simulated {len(jobs):,} jobs x {args.samples:,} samples in {elapsed:.2f}s ({rate:,.0f} samples/s)",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
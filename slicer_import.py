@@ -0,0 +1,461 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from cost_engine import DEFAULT_VALUES
+from material_catalog import load_material_catalog
+
+# --- Slicer file ingestion ---
+# Pulls filament usage and estimated print time out of sliced files so nobody has to copy them by hand:
+#   * G-code: the slicer's summary comments (PrusaSlicer/Orca/Bambu Studio footers and headers, Cura and
+#     Simplify3D headers). Only the first HEAD_BYTES and last TAIL_BYTES are read, through mmap, so a
+#     500 MB file costs the same as a 1 MB one.
+#   * 3MF: Metadata/slice_info.config from a sliced project (Bambu Studio / Orca), falling back to the
+#     head and tail of an embedded plate G-code, streamed out of the zip.
+# Directories are scanned in worker processes. Results are cached by path + size + mtime, so unchanged files
+# are skipped without being opened, and stored under a fingerprint of the bytes the parser read (saved to
+# PRINTCALC_SLICER_CACHE). Each save drops entries for files that no longer exist and results no entry
+# refers to any more (edited or re-exported files), so the file only tracks what's on disk. Uploads hash
+# their full content, so they never share entries with path scans;
+# they get their own in-memory LRU of UPLOAD_CACHE_SIZE entries (PRINTCALC_SLICER_UPLOAD_CACHE_SIZE).
+#
+#   python slicer_import.py prints/ -o jobs.csv && python bulk_pricing.py jobs.csv -o priced.csv
+#   python slicer_import.py prints/ | python bulk_pricing.py - --workers 0
+
+GCODE_EXTENSIONS = (".gcode", ".gco", ".g")
+THREEMF_EXTENSIONS = (".3mf",)
+HEAD_BYTES = 256 * 1024
+TAIL_BYTES = 1024 * 1024
+DEFAULT_FILAMENT_DIAMETER_MM = 1.75
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slicer_cache.json")
+UPLOAD_CACHE_SIZE = int(os.environ.get("PRINTCALC_SLICER_UPLOAD_CACHE_SIZE", 256))
+
+# Everything that means "this file can't be read", as opposed to a bug
+SLICER_ERRORS = (OSError, ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError)
+
+# Slicer filament names that don't start with a catalog material's name
+MATERIAL_ALIASES = {"PA": "Nylon", "PA6": "Nylon", "PA12": "Nylon"}
+
+class SlicerEstimate:
+    __slots__ = ("source", "slicer", "material", "grams", "hours", "filament_mm")
+
+    def __init__(self, source, slicer, material, grams, hours, filament_mm=None):
+        self.source = source
+        self.slicer = slicer
+        self.material = material
+        self.grams = float(grams)
+        self.hours = float(hours)
+        self.filament_mm = None if filament_mm is None else float(filament_mm)
+
+    def __repr__(self):
+        return (f"SlicerEstimate(source={self.source!r}, slicer={self.slicer!r}, material={self.material!r}, "
+                f"grams={self.grams}, hours={self.hours})")
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+# --- G-code comments ---
+# (field, pattern) in priority order; the first pattern that matches a field wins
+GCODE_PATTERNS = [
+    ("grams", rb"^; total filament (?:used|weight) \[g\]\s*[=:]\s*([\d.][\d., ]*)"),
+    ("grams", rb"^; filament used \[g\]\s*=\s*([\d.][\d., ]*)"),
+    ("grams", rb"^;\s*Plastic weight:\s*([\d.]+)\s*g"),
+    ("filament_mm", rb"^; total filament length \[mm\]\s*[=:]\s*([\d.][\d., ]*)"),
+    ("filament_mm", rb"^; filament used \[mm\]\s*=\s*([\d.][\d., ]*)"),
+    ("filament_m", rb"^;Filament used:\s*([\d.][\d., m]*)"),
+    ("filament_mm", rb"^;\s*Filament length:\s*([\d.]+)\s*mm"),
+    ("time", rb"total estimated time:\s*([\dwdhms ]+)"),
+    ("time", rb"^; estimated printing time(?: \(normal mode\))?\s*=\s*([\dwdhms ]+)"),
+    ("seconds", rb"^;TIME:\s*([\d.]+)"),
+    ("time", rb"^;\s*Build time:\s*([\w ]+)"),
+    ("material", rb"^; filament_type\s*=\s*(\S[^\r\n]*)"),
+    ("material", rb"^;\s*Material:\s*(\S[^\r\n]*)"),
+    ("diameter", rb"^; filament_diameter\s*=\s*([\d.]+)"),
+]
+GCODE_PATTERNS = [(field, re.compile(pattern, re.MULTILINE | re.IGNORECASE)) for field, pattern in GCODE_PATTERNS]
+
+SLICER_SIGNATURES = [
+    (b"BambuStudio", "Bambu Studio"), (b"OrcaSlicer", "OrcaSlicer"), (b"PrusaSlicer", "PrusaSlicer"),
+    (b"SuperSlicer", "SuperSlicer"), (b"Cura_SteamEngine", "Cura"), (b"Simplify3D", "Simplify3D"),
+]
+
+_DURATION_UNITS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+
+def parse_duration(text):
+    text = text.strip().lower()
+    if re.fullmatch(r"[\d.]+", text):
+        return float(text) / 3600
+    parts = re.findall(r"([\d.]+)\s*([wdhms])", text)
+    if not parts:
+        raise ValueError(f"Unrecognised print time {text!r}")
+    return sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts) / 3600
+
+# Multi-extruder files list one value per extruder ("3.21, 1.02")
+def _sum_values(text):
+    return sum(float(value) for value in re.findall(r"[\d.]+", text))
+
+# Slicers write their summary as a run of comment lines at the top and/or bottom of the file, so only those
+# runs are searched; the full head/tail text is the fallback for files laid out differently.
+def parse_gcode_text(text, source=""):
+    try:
+        return _parse_comments(_comment_blocks(text), source)
+    except ValueError:
+        return _parse_comments(text, source)
+
+def _comment_blocks(text):
+    head_end = 0
+    while head_end < len(text):
+        newline = text.find(b"\n", head_end)
+        line_end = len(text) if newline == -1 else newline
+        line = text[head_end:line_end].strip()
+        if line and not line.startswith(b";"):
+            break
+        head_end = line_end + 1
+    tail_start = len(text)
+    while tail_start > head_end:
+        start = max(text.rfind(b"\n", head_end, tail_start - 1) + 1, head_end)
+        line = text[start:tail_start].strip()
+        if line and not line.startswith(b";"):
+            break
+        tail_start = start
+    return text[:head_end] + b"\n" + text[tail_start:]
+
+def _parse_comments(text, source):
+    found = {}
+    for field, pattern in GCODE_PATTERNS:
+        if field not in found:
+            match = pattern.search(text)
+            if match:
+                found[field] = match.group(1).decode("utf-8", "replace").strip()
+    slicer = next((name for signature, name in SLICER_SIGNATURES if signature in text), "unknown")
+
+    if "time" in found:
+        hours = parse_duration(found["time"])
+    elif "seconds" in found:
+        hours = float(found["seconds"]) / 3600
+    else:
+        raise ValueError(f"{source}: no estimated print time in the G-code comments")
+
+    material = found.get("material", "").split(";")[0].strip() or None
+    filament_mm = _sum_values(found["filament_mm"]) if "filament_mm" in found else None
+    if filament_mm is None and "filament_m" in found:
+        filament_mm = _sum_values(found["filament_m"]) * 1000
+    if "grams" in found:
+        grams = _sum_values(found["grams"])
+    elif filament_mm is not None:
+        diameter = float(found.get("diameter") or DEFAULT_FILAMENT_DIAMETER_MM)
+        grams = filament_grams(filament_mm, material, diameter)
+    else:
+        raise ValueError(f"{source}: no filament usage in the G-code comments")
+    return SlicerEstimate(source, slicer, material, grams, hours, filament_mm)
+
+# Cura and some exports only report length; convert with the catalog density for the material
+def filament_grams(length_mm, material=None, diameter_mm=DEFAULT_FILAMENT_DIAMETER_MM):
+    catalog = load_material_catalog()
+    name = match_material(material) or DEFAULT_VALUES["selected_material"]
+    density = catalog.get(name).density_g_cm3
+    radius_cm = diameter_mm / 20
+    return length_mm / 10 * 3.141592653589793 * radius_cm ** 2 * density
+
+# Both blocks come from the same buffer (mmap or bytes); small files are read whole
+def _gcode_blocks(buffer):
+    if len(buffer) <= HEAD_BYTES + TAIL_BYTES:
+        return buffer[:]
+    return buffer[:HEAD_BYTES] + b"\n" + buffer[-TAIL_BYTES:]
+
+# Head and tail of a zip member, streamed through a bounded window instead of decompressing into memory
+def _stream_blocks(stream, chunk_size=1024 * 1024):
+    head = stream.read(HEAD_BYTES)
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        tail = (tail + chunk)[-TAIL_BYTES:]
+    return head + b"\n" + tail if tail else head
+
+# --- 3MF ---
+def parse_3mf(archive, source=""):
+    names = archive.namelist()
+    if "Metadata/slice_info.config" in names:
+        estimate = _parse_slice_info(archive.read("Metadata/slice_info.config"), source)
+        if estimate is not None:
+            return estimate
+    gcode_members = sorted(name for name in names if name.lower().endswith(".gcode"))
+    if not gcode_members:
+        raise ValueError(f"{source}: no slicing results in this 3MF (slice the plate and export it again)")
+    # One print job per file: plates are summed
+    estimates = []
+    for name in gcode_members:
+        with archive.open(name) as member:
+            estimates.append(parse_gcode_text(_stream_blocks(member), source))
+    return _combine(estimates, source)
+
+def _parse_slice_info(data, source):
+    root = ElementTree.fromstring(data)
+    grams = hours = 0.0
+    usage = {}
+    plates = root.findall("plate")
+    for plate in plates:
+        meta = {item.get("key"): item.get("value") for item in plate.findall("metadata")}
+        hours += float(meta.get("prediction") or 0) / 3600
+        plate_grams = 0.0
+        for filament in plate.findall("filament"):
+            used = float(filament.get("used_g") or 0)
+            plate_grams += used
+            usage[filament.get("type")] = usage.get(filament.get("type"), 0.0) + used
+        grams += float(meta.get("weight") or plate_grams)
+    if not plates or (grams == 0 and hours == 0):
+        return None
+    material = max(usage, key=usage.get) if usage else None
+    return SlicerEstimate(source, "Bambu Studio", material, grams, hours)
+
+def _combine(estimates, source):
+    first = estimates[0]
+    lengths = [e.filament_mm for e in estimates if e.filament_mm is not None]
+    return SlicerEstimate(source, first.slicer, first.material, sum(e.grams for e in estimates),
+                          sum(e.hours for e in estimates), sum(lengths) if lengths else None)
+
+# --- Single files (paths and in-memory uploads) ---
+def is_slicer_file(name):
+    return name.lower().endswith(GCODE_EXTENSIONS + THREEMF_EXTENSIONS)
+
+def _fingerprint(*parts):
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+# Returns (fingerprint, estimate). For G-code the fingerprint covers exactly the bytes the parser reads;
+# for 3MF it covers the zip's member CRCs, which change whenever any member's content does.
+def scan_file(path):
+    if path.lower().endswith(THREEMF_EXTENSIONS):
+        with zipfile.ZipFile(path) as archive:
+            fingerprint = _fingerprint(*(f"{i.filename}:{i.CRC}:{i.file_size}".encode() for i in archive.infolist()))
+            return fingerprint, parse_3mf(archive, path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path}: file is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            text = _gcode_blocks(buffer)
+            size = len(buffer)
+    return _fingerprint(str(size).encode(), text), parse_gcode_text(text, path)
+
+def scan_bytes(data, name):
+    if data[:4] == b"PK\x03\x04":
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return _fingerprint(data), parse_3mf(archive, name)
+    if not data:
+        raise ValueError(f"{name}: file is empty")
+    return _fingerprint(data), parse_gcode_text(_gcode_blocks(data), name)
+
+# Worker entry point: errors come back as strings so one bad file doesn't stop a directory scan
+def _scan_file_safely(path):
+    try:
+        fingerprint, estimate = scan_file(path)
+        return fingerprint, estimate.as_dict(), None
+    except SLICER_ERRORS as exc:
+        return None, None, str(exc) if str(exc).startswith(path) else f"{path}: {exc}"
+
+# --- Result cache ---
+class SlicerCache:
+    def __init__(self, path=None, max_uploads=UPLOAD_CACHE_SIZE):
+        self.path = path
+        self.entries = {}  # absolute path -> {"size", "mtime_ns", "fingerprint"}
+        self.results = {}  # fingerprint -> estimate dict
+        self.uploads = OrderedDict()  # full-content fingerprint -> estimate dict, LRU, not saved
+        self.max_uploads = max_uploads
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self.entries, self.results = data["entries"], data["results"]
+            except (OSError, ValueError, KeyError):
+                pass  # A damaged cache only costs a rescan
+
+    def lookup_path(self, path, stat):
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                return self.results.get(entry["fingerprint"])
+        return None
+
+    def lookup_upload(self, fingerprint):
+        with self._lock:
+            result = self.uploads.get(fingerprint)
+            if result is not None:
+                self.uploads.move_to_end(fingerprint)
+            return result
+
+    def store_upload(self, fingerprint, result):
+        if not self.max_uploads:
+            return
+        with self._lock:
+            self.uploads[fingerprint] = result
+            self.uploads.move_to_end(fingerprint)
+            while len(self.uploads) > self.max_uploads:
+                self.uploads.popitem(last=False)
+
+    def store(self, fingerprint, result, path=None, stat=None):
+        with self._lock:
+            self.results[fingerprint] = result
+            if path is not None:
+                self.entries[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "fingerprint": fingerprint}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._prune()
+            data = {"entries": self.entries, "results": self.results}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    # Caller holds the lock
+    def _prune(self):
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.isfile(path)}
+        live = {entry["fingerprint"] for entry in self.entries.values()}
+        self.results = {fingerprint: result for fingerprint, result in self.results.items() if fingerprint in live}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_slicer_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SlicerCache(os.environ.get("PRINTCALC_SLICER_CACHE") or DEFAULT_CACHE_PATH)
+        return _cache
+
+# Uploads have no path or mtime, so they're cached by a hash of their full content
+def import_upload(data, name, cache=None):
+    cache = cache or get_slicer_cache()
+    fingerprint = _fingerprint(data)
+    cached = cache.lookup_upload(fingerprint)
+    if cached is not None:
+        return SlicerEstimate.from_dict(dict(cached, source=name))
+    _, estimate = scan_bytes(data, name)
+    cache.store_upload(fingerprint, estimate.as_dict())
+    return estimate
+
+# --- Directories ---
+def find_slicer_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if is_slicer_file(name):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+# Returns (estimates, errors, parsed_count) with estimates in input order; only files that changed (or are not
+# in the cache yet) go to the workers
+def import_paths(paths, workers=1, cache=None):
+    cache = cache or get_slicer_cache()
+    files = [os.path.abspath(path) for path in find_slicer_files(paths)]
+    results = [None] * len(files)
+    errors = []
+    to_scan = []
+    for i, path in enumerate(files):
+        try:
+            stat = os.stat(path)
+        except OSError as exc:
+            errors.append(f"{path}: {exc.strerror}")
+            continue
+        cached = cache.lookup_path(path, stat)
+        if cached is not None:
+            results[i] = SlicerEstimate.from_dict(dict(cached, source=path))
+        else:
+            to_scan.append((i, path, stat))
+
+    scan_paths = [path for _, path, _ in to_scan]
+    if workers > 1 and len(scan_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scanned = list(pool.map(_scan_file_safely, scan_paths, chunksize=max(1, len(scan_paths) // (workers * 4))))
+    else:
+        scanned = [_scan_file_safely(path) for path in scan_paths]
+
+    parsed = 0
+    for (i, path, stat), (fingerprint, result, error) in zip(to_scan, scanned):
+        if error:
+            errors.append(error)
+            continue
+        cache.store(fingerprint, result, path, stat)
+        results[i] = SlicerEstimate.from_dict(result)
+        parsed += 1
+    if parsed:
+        cache.save()
+    return [r for r in results if r is not None], errors, parsed
+
+# --- Feeding the calculator / batch engine ---
+def match_material(filament_type, catalog=None):
+    if not filament_type:
+        return None
+    catalog = catalog or load_material_catalog()
+    wanted = filament_type.strip().upper()
+    base = re.split(r"[-+ ]", wanted)[0]
+    for candidate in (wanted, base, MATERIAL_ALIASES.get(base, "").upper()):
+        for name in catalog.names:
+            if candidate and (name.upper() == candidate or name.upper().split(" ")[0] == candidate):
+                return name
+    return None
+
+JOB_FIELDS = ["source_file", "selected_material", "material_used_grams", "print_duration_hours"]
+
+# One bulk_pricing input row per estimate; unmatched materials fall back to the calculator default
+def estimate_to_row(estimate):
+    return {
+        "source_file": estimate.source,
+        "selected_material": match_material(estimate.material) or DEFAULT_VALUES["selected_material"],
+        "material_used_grams": round(estimate.grams, 2),
+        "print_duration_hours": round(estimate.hours, 4),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract filament usage and print time from G-code / 3MF files.")
+    parser.add_argument("paths", nargs="+", help="Sliced files or directories to scan.")
+    parser.add_argument("-o", "--output", default="-", help="Job CSV for bulk_pricing.py (default: stdout).")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Worker processes (0 = one per CPU core).")
+    args = parser.parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    estimates, errors, parsed = import_paths(args.paths, workers)
+    elapsed = time.perf_counter() - start
+    for error in errors:
+        print(f"warning: {error}", file=sys.stderr)
+
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.DictWriter(out_stream, fieldnames=JOB_FIELDS)
+        writer.writeheader()
+        writer.writerows(estimate_to_row(estimate) for estimate in estimates)
+    finally:
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    print(f"Imported {len(estimates):,} files ({parsed:,} parsed, {len(estimates) - parsed:,} cached) "
+          f"in {elapsed:.2f}s", file=sys.stderr)
+    return 1 if errors and not estimates else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+
+from cost_engine import cost_per_gram, electricity_cost_per_hour, sum_costs
+
+# --- Closed-form pricing solver ---
+# The cost model is linear: total_cost = material + electricity + labor + other, none of which depend on the
+# selling price. So for a job:
+#   break-even price             = total_cost
+#   min price for margin m (%)   = total_cost / (1 - m / 100)                       (m < 100)
+#   max grams at a given price   = (price - non-material costs) / cost per gram
+#   max hours at a given price   = (price - non-electricity costs) / electricity cost per hour
+# solve_quote() is the scalar path (plain Python, fast for one job); solve_batch() takes columns. Both are
+# built from cost_engine's cost components, so they can't drift from the form's formula.
+# Limits come back as inf when the input costs nothing, and NaN when the price is unprofitable even at zero.
+
+def solve_quote(selling_price, material_spool_cost, material_used_grams, print_duration_hours,
+                printer_wattage, electricity_cost_per_kwh, labor_hours=0.0, labor_hourly_rate=0.0,
+                other_costs=0.0, target_margin=None):
+    per_gram = cost_per_gram(material_spool_cost)
+    per_hour = electricity_cost_per_hour(printer_wattage, electricity_cost_per_kwh)
+    mat_cost = per_gram * material_used_grams
+    electricity_cost = per_hour * print_duration_hours
+    total_cost = sum_costs(mat_cost, electricity_cost, labor_hours * labor_hourly_rate, other_costs)
+
+    if target_margin is None:
+        min_price = math.nan
+    elif target_margin >= 100:
+        min_price = math.inf
+    else:
+        min_price = total_cost / (1 - target_margin / 100)
+
+    return {
+        "break_even_price": total_cost,
+        "min_price_for_margin": min_price,
+        "max_grams": _limit(selling_price - (total_cost - mat_cost), per_gram),
+        "max_hours": _limit(selling_price - (total_cost - electricity_cost), per_hour),
+    }
+
+def _limit(budget, unit_cost):
+    if budget < 0:
+        return math.nan
+    if unit_cost <= 0:
+        return math.inf
+    return budget / unit_cost
+
+def solve_batch(selling_price, material_spool_cost, material_used_grams, print_duration_hours,
+                printer_wattage, electricity_cost_per_kwh, labor_hours=0.0, labor_hourly_rate=0.0,
+                other_costs=0.0, target_margin=None):
+    per_gram = cost_per_gram(np.asarray(material_spool_cost, dtype=np.float64))
+    per_hour = electricity_cost_per_hour(np.asarray(printer_wattage, dtype=np.float64),
+                                         np.asarray(electricity_cost_per_kwh, dtype=np.float64))
+    mat_cost = per_gram * np.asarray(material_used_grams, dtype=np.float64)
+    electricity_cost = per_hour * np.asarray(print_duration_hours, dtype=np.float64)
+    labor_cost = np.asarray(labor_hours, dtype=np.float64) * np.asarray(labor_hourly_rate, dtype=np.float64)
+    total_cost = sum_costs(mat_cost, electricity_cost, labor_cost, np.asarray(other_costs, dtype=np.float64))
+    selling_price = np.asarray(selling_price, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if target_margin is None:
+            min_price = np.full_like(total_cost, np.nan)
+        else:
+            margin = np.asarray(target_margin, dtype=np.float64)
+            min_price = np.where(margin < 100, total_cost / (1 - margin / 100), np.inf)
+        max_grams = _limit_batch(selling_price - (total_cost - mat_cost), per_gram)
+        max_hours = _limit_batch(selling_price - (total_cost - electricity_cost), per_hour)
+
+    shape = np.broadcast_shapes(total_cost.shape, min_price.shape, max_grams.shape, max_hours.shape)
+    return {
+        "break_even_price": np.broadcast_to(total_cost, shape),
+        "min_price_for_margin": np.broadcast_to(min_price, shape),
+        "max_grams": np.broadcast_to(max_grams, shape),
+        "max_hours": np.broadcast_to(max_hours, shape),
+    }
+
+def _limit_batch(budget, unit_cost):
+    return np.where(budget < 0, np.nan, np.where(unit_cost > 0, budget / unit_cost, np.inf))
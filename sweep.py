@@ -0,0 +1,80 @@
+import numpy as np
+
+from cost_engine import DEFAULT_VALUES, price_columns
+
+# --- What-if sweeps ---
+# Varies one or two inputs over a range and prices the whole grid in a single vectorized call.
+# Grids are laid out as [y, x]: one row per y value, one column per x value.
+
+SWEEP_FIELDS = {
+    "selling_price_inr": "Selling Price (₹)",
+    "material_used_grams": "Material Used (g)",
+    "print_duration_hours": "Print Duration (h)",
+    "material_spool_cost_inr": "Spool Cost (₹/kg)",
+    "printer_wattage_p1s": "Printer Power (W)",
+    "electricity_cost_per_kwh_inr": "Electricity (₹/kWh)",
+    "labor_hours": "Labor (h)",
+    "labor_hourly_rate_inr": "Labor Rate (₹/h)",
+    "other_costs_per_print_inr": "Other Costs (₹)",
+}
+
+# Pass an IncrementalCostModel as `model` to reuse it across sweeps: axes and base inputs that did not
+# change since the previous sweep are not recomputed (e.g. a new tariff leaves the material grid alone).
+def sweep_grid(base_inputs, x_field, x_values, y_field=None, y_values=None, model=None):
+    for field in (x_field, y_field):
+        if field is not None and field not in SWEEP_FIELDS:
+            raise ValueError(f"Cannot sweep over {field!r}")
+    if y_field is not None and y_field == x_field:
+        raise ValueError("x and y must be different inputs")
+
+    x_values = np.asarray(x_values, dtype=np.float64)
+    columns = {name: base_inputs.get(name, default) for name, default in DEFAULT_VALUES.items()}
+    columns[x_field] = x_values[np.newaxis, :]
+    if y_field is None:
+        y_values = np.zeros(1)
+    else:
+        y_values = np.asarray(y_values, dtype=np.float64)
+        columns[y_field] = y_values[:, np.newaxis]
+
+    if model is None:
+        results = price_columns(columns)
+    else:
+        model.update(columns)
+        results = model.results
+    shape = (len(y_values), len(x_values))
+    return {
+        "x_field": x_field, "y_field": y_field, "x_values": x_values, "y_values": y_values,
+        "total_cost": np.broadcast_to(results["total_cost"], shape), "profit": np.broadcast_to(results["profit"], shape),
+        "profit_margin": np.broadcast_to(results["profit_margin"], shape),
+    }
+
+# Break-even contour of a 2-D sweep: for every x, the y where profit crosses zero (linear interpolation
+# between neighbouring grid rows), or NaN if profit keeps the same sign over the whole y range.
+def break_even_contour(sweep):
+    profit = sweep["profit"]
+    y_values = sweep["y_values"]
+    if profit.shape[0] < 2:
+        return sweep["x_values"], np.full(profit.shape[1], np.nan)
+
+    sign = np.signbit(profit)
+    crossings = sign[1:] != sign[:-1]
+    has_crossing = crossings.any(axis=0)
+    row = np.argmax(crossings, axis=0)
+    cols = np.arange(profit.shape[1])
+
+    p0, p1 = profit[row, cols], profit[row + 1, cols]
+    y0, y1 = y_values[row], y_values[row + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(p1 != p0, p0 / (p0 - p1), 0.0)
+    y_break_even = np.where(has_crossing, y0 + fraction * (y1 - y0), np.nan)
+    return sweep["x_values"], y_break_even
+
+# Evenly subsample a sweep for display; the full-resolution grid is still used for the contour.
+def downsample(sweep, max_points):
+    ny, nx = sweep["profit"].shape
+    y_idx = np.unique(np.linspace(0, ny - 1, min(ny, max_points)).round().astype(int))
+    x_idx = np.unique(np.linspace(0, nx - 1, min(nx, max_points)).round().astype(int))
+    reduced = dict(sweep, x_values=sweep["x_values"][x_idx], y_values=sweep["y_values"][y_idx])
+    for key in ("total_cost", "profit", "profit_margin"):
+        reduced[key] = sweep[key][np.ix_(y_idx, x_idx)]
+    return reduced
@@ -0,0 +1,158 @@
+import json
+import os
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# --- Time-of-use electricity tariffs ---
+# A tariff is a repeating daily or weekly schedule of rate slabs (INR/kWh). Each schedule precomputes the
+# cumulative cost of running 1 kW from the start of the cycle to every slab boundary, so the cost of a job
+# is two O(log n) lookups (start and end) rather than stepping through it hour by hour. Batches use the
+# same table through np.searchsorted.
+# Timestamps are naive local datetimes (or numpy datetime64 for batches).
+# Named tariffs load from tariffs.json; PRINTCALC_TARIFFS_FILE points at a different file.
+
+DEFAULT_TARIFFS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tariffs.json")
+FLAT_TARIFF = "Flat rate"
+
+PERIOD_HOURS = {"day": 24.0, "week": 168.0}
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_EPOCH = datetime(1970, 1, 1)
+_NP_EPOCH = np.datetime64("1970-01-01T00:00:00")
+# 1970-01-01 was a Thursday; weekly cycles are shifted so hour 0 is Monday 00:00
+_WEEK_SHIFT_HOURS = 3 * 24.0
+
+def hours_since_epoch(timestamp):
+    return (timestamp - _EPOCH).total_seconds() / 3600
+
+def hours_since_epoch_batch(timestamps):
+    timestamps = np.asarray(timestamps, dtype="datetime64[s]")
+    return (timestamps - _NP_EPOCH) / np.timedelta64(1, "h")
+
+class TariffSchedule:
+    def __init__(self, slab_starts, rates, period="day", name=""):
+        if period not in PERIOD_HOURS:
+            raise ValueError(f"Unknown tariff period {period!r}; expected 'day' or 'week'")
+        period_hours = PERIOD_HOURS[period]
+        slab_starts = [float(h) for h in slab_starts]
+        rates = [float(r) for r in rates]
+        if not slab_starts or len(slab_starts) != len(rates):
+            raise ValueError("A tariff needs one rate per slab")
+        if slab_starts[0] != 0 or any(b <= a for a, b in zip(slab_starts, slab_starts[1:])) or slab_starts[-1] >= period_hours:
+            raise ValueError("Slab start times must begin at 00:00 and increase within the period")
+        if any(r < 0 for r in rates):
+            raise ValueError("Tariff rates cannot be negative")
+
+        self.name = name
+        self.period = period
+        self.period_hours = period_hours
+        self.rates = rates
+        self.bounds = slab_starts + [period_hours]
+        self.cumulative = [0.0]
+        for start, end, rate in zip(self.bounds, self.bounds[1:], rates):
+            self.cumulative.append(self.cumulative[-1] + (end - start) * rate)
+        self._shift = _WEEK_SHIFT_HOURS if period == "week" else 0.0
+        self._np_bounds = np.array(self.bounds)
+        self._np_rates = np.array(rates)
+        self._np_cumulative = np.array(self.cumulative)
+
+    @classmethod
+    def flat(cls, rate, name=FLAT_TARIFF):
+        return cls([0.0], [rate], "day", name)
+
+    @classmethod
+    def hourly(cls, rates, name="Hourly"):
+        if len(rates) != 24:
+            raise ValueError("Hourly tariffs take exactly 24 rates")
+        return cls(range(24), rates, "day", name)
+
+    @classmethod
+    def from_spec(cls, name, spec):
+        period = spec.get("period", "day")
+        starts, rates = zip(*((_parse_slab_start(start, period), rate) for start, rate in spec["slabs"]))
+        return cls(starts, rates, period, name)
+
+    # --- Scalar path (one job) ---
+    def _integral(self, hours):
+        cycles, within = divmod(hours + self._shift, self.period_hours)
+        k = bisect_right(self.bounds, within) - 1
+        return cycles * self.cumulative[-1] + self.cumulative[k] + (within - self.bounds[k]) * self.rates[k]
+
+    def rate_at(self, start):
+        within = (hours_since_epoch(start) + self._shift) % self.period_hours
+        return self.rates[bisect_right(self.bounds, within) - 1]
+
+    def cost_per_kw(self, start, duration_hours):
+        # Measured from the start's own cycle so whole cycles since the epoch don't eat float precision
+        t0 = hours_since_epoch(start)
+        base = (t0 + self._shift) // self.period_hours * self.period_hours
+        return self._integral(t0 - base + duration_hours) - self._integral(t0 - base)
+
+    def energy_cost(self, start, duration_hours, wattage):
+        return wattage / 1000 * self.cost_per_kw(start, duration_hours)
+
+    # Average INR/kWh over the job, so time-of-use pricing drops into the flat-rate cost formula
+    def effective_rate(self, start, duration_hours):
+        if duration_hours <= 0:
+            return self.rate_at(start)
+        return self.cost_per_kw(start, duration_hours) / duration_hours
+
+    # --- Vectorized path (hours since epoch, or datetime64 via the *_batch helpers) ---
+    def integral_hours(self, hours):
+        cycles, within = np.divmod(np.asarray(hours, dtype=np.float64) + self._shift, self.period_hours)
+        k = np.searchsorted(self._np_bounds, within, side="right") - 1
+        return cycles * self._np_cumulative[-1] + self._np_cumulative[k] + (within - self._np_bounds[k]) * self._np_rates[k]
+
+    def rate_at_hours(self, hours):
+        within = np.mod(np.asarray(hours, dtype=np.float64) + self._shift, self.period_hours)
+        return self._np_rates[np.searchsorted(self._np_bounds, within, side="right") - 1]
+
+    def cost_per_kw_hours(self, start_hours, end_hours):
+        start_hours = np.asarray(start_hours, dtype=np.float64)
+        base = np.floor((start_hours + self._shift) / self.period_hours) * self.period_hours
+        return self.integral_hours(end_hours - base) - self.integral_hours(start_hours - base)
+
+    def energy_cost_batch(self, starts, durations, wattage):
+        t0 = hours_since_epoch_batch(starts)
+        return np.asarray(wattage, dtype=np.float64) / 1000 * self.cost_per_kw_hours(t0, t0 + np.asarray(durations, dtype=np.float64))
+
+    def effective_rate_batch(self, starts, durations):
+        t0 = hours_since_epoch_batch(starts)
+        durations = np.asarray(durations, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            averaged = self.cost_per_kw_hours(t0, t0 + durations) / durations
+        return np.where(durations > 0, averaged, self.rate_at_hours(t0))
+
+def _parse_slab_start(text, period):
+    original = text
+    text = str(text).strip().lower()
+    day = 0
+    if period == "week":
+        day_name, _, text = text.partition(" ")
+        if day_name[:3] not in WEEKDAYS:
+            raise ValueError(f"Weekly slab start {original!r} must look like 'Mon 06:00'")
+        day = WEEKDAYS.index(day_name[:3])
+    hours, _, minutes = text.partition(":")
+    return day * 24 + int(hours) + int(minutes or 0) / 60
+
+# --- Named tariffs (loaded once per process) ---
+def load_tariffs(path=None):
+    path = path or os.environ.get("PRINTCALC_TARIFFS_FILE") or DEFAULT_TARIFFS_PATH
+    return _load_tariffs_file(os.path.abspath(path))
+
+@lru_cache(maxsize=None)
+def _load_tariffs_file(path):
+    with open(path, encoding="utf-8") as f:
+        specs = json.load(f)
+    try:
+        return {name: TariffSchedule.from_spec(name, spec) for name, spec in specs.items()}
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid tariff file {path}: {exc}") from None
+
+def get_tariff(name):
+    tariffs = load_tariffs()
+    if name not in tariffs:
+        raise ValueError(f"Unknown tariff {name!r}; available: {', '.join(tariffs)}")
+    return tariffs[name]
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Final.py")
+
+def click(app, label):
+    next(button for button in app.button if button.label == label).click()
+    return app.run()
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRINTCALC_HISTORY_DB", str(tmp_path / "history.db"))
+    return AppTest.from_file(SCRIPT, default_timeout=60).run()
+
+def test_reset_restores_every_widget_to_the_defaults(app):
+    app.selectbox(key="mat_sel_stable").set_value("ABS").run()
+    app.number_input(key="sp_stable").set_value(777.0)
+    app.number_input(key="mat_gram_stable").set_value(88.0)
+    click(app, "Placeholder_Calculate")
+    assert app.session_state["selected_material"] == "ABS" and app.number_input(key="msc_stable").value != 1200.0
+
+    click(app, "Placeholder_Reset")
+    assert not app.exception
+    assert app.selectbox(key="mat_sel_stable").value == app.session_state["selected_material"] == "PLA"
+    assert app.number_input(key="msc_stable").value == 1200.0 and app.number_input(key="pwp_stable").value == 180
+    assert app.number_input(key="sp_stable").value == 500.0 and app.number_input(key="mat_gram_stable").value == 50.0
+
+    # The next calculation uses what the widgets show
+    app.number_input(key="sp_stable").set_value(600.0)
+    click(app, "Placeholder_Calculate")
+    assert app.session_state["selling_price_inr"] == 600.0 and app.session_state["selected_material"] == "PLA"
+
+def test_only_small_sweep_models_stay_in_the_session(app):
+    click(app, "Run Sweep")  # default 200 x 200 grid
+    assert not app.exception and "sweep_model" in app.session_state
+    app.number_input(key="sweep_steps_stable").set_value(1000)
+    click(app, "Run Sweep")
+    assert not app.exception and "sweep_model" not in app.session_state
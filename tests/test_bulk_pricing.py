@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+import pytest
+
+from bulk_pricing import OUTPUT_FIELDS, main, parse_lines, price_stream
+from cost_engine import DEFAULT_VALUES, calculate_costs
+
+def price_text(text, in_fmt="csv", out_fmt="csv", **kwargs):
+    out = io.StringIO()
+    total = price_stream(io.StringIO(text), out, in_fmt, out_fmt, **kwargs)
+    out.seek(0)
+    rows = list(csv.DictReader(out)) if out_fmt == "csv" else [json.loads(line) for line in out]
+    return total, rows
+
+def test_prices_match_calculate_costs():
+    total, rows = price_text("selling_price_inr,material_used_grams,material_spool_cost_inr,printer_wattage_p1s\n"
+                             "900,50,1200,180\n100,400,2000,250\n")
+    assert total == 2 and list(rows[0]) == OUTPUT_FIELDS
+    expected = calculate_costs(100, 2000, 400, DEFAULT_VALUES["print_duration_hours"], 250,
+                               DEFAULT_VALUES["electricity_cost_per_kwh_inr"], 0, 0,
+                               DEFAULT_VALUES["other_costs_per_print_inr"])
+    assert float(rows[1]["calc_profit"]) == pytest.approx(expected["profit"], abs=1e-4)
+
+def test_bom_prefixed_header_is_read():
+    _, rows = price_text("\ufeffselling_price_inr,material_used_grams\n900,50\n")
+    assert float(rows[0]["selling_price_inr"]) == 900.0
+
+def test_bom_file_via_cli(tmp_path):
+    source = tmp_path / "excel.csv"
+    source.write_bytes("selling_price_inr,material_used_grams\n900,50\n".encode("utf-8-sig"))
+    output = tmp_path / "priced.csv"
+    assert main([str(source), "-o", str(output)]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        assert float(next(csv.DictReader(f))["selling_price_inr"]) == 900.0
+
+def test_unknown_header_fails_unless_ignored(capsys):
+    with pytest.raises(ValueError, match="job_name"):
+        price_text("selling_price_inr,job_name\n900,a\n")
+    total, rows = price_text("selling_price_inr,job_name\n900,a\n", ignore_unknown_columns=True)
+    assert total == 1 and float(rows[0]["selling_price_inr"]) == 900.0
+    assert "job_name" in capsys.readouterr().err
+
+def test_unknown_jsonl_keys_fail_unless_ignored(capsys):
+    text = '{"selling_price_inr": 900}\n{"material_grams": 80}\n{"foo": 1}\n'
+    with pytest.raises(ValueError, match="^Line 2: unknown field\\(s\\) 'material_grams'"):
+        price_text(text, "jsonl", "jsonl")
+    total, rows = price_text(text, "jsonl", "jsonl", ignore_unknown_columns=True)
+    assert total == 3 and rows[1]["material_used_grams"] == DEFAULT_VALUES["material_used_grams"]
+    err = capsys.readouterr().err
+    assert "material_grams" in err and "foo" in err
+
+def test_jsonl_source_file_key_is_accepted():
+    total, _ = price_text('{"selling_price_inr": 900, "source_file": "a.gcode", "print_start": ""}\n', "jsonl", "jsonl")
+    assert total == 1
+
+def test_csv_blank_lines_keep_source_line_numbers():
+    with pytest.raises(ValueError, match="^Line 5: invalid value 'x' for material_used_grams"):
+        price_text("selling_price_inr,material_used_grams\n1,2\n\n\n3,x\n")
+
+def test_jsonl_blank_lines_keep_source_line_numbers():
+    with pytest.raises(ValueError, match="^Line 3: "):
+        price_text('{"selling_price_inr": 1}\n\n{"material_used_grams": "x"}\n', "jsonl", "jsonl")
+
+def test_invalid_json_reports_line():
+    with pytest.raises(ValueError, match="^Line 2: invalid JSON"):
+        price_text("{}\n{bad\n", "jsonl", "jsonl")
+
+@pytest.mark.parametrize("line", ['[1, 2]', '{"selected_material": ["PLA"]}', '{"selling_price_inr": NaN}',
+                                  '{"labor_hours": "inf"}', '{"material_used_grams": true}'])
+def test_bad_jsonl_values_are_rejected(line):
+    with pytest.raises(ValueError, match="^Line 1: "):
+        price_text(line + "\n", "jsonl", "jsonl")
+
+def test_line_numbers_continue_across_chunks():
+    text = "selling_price_inr\n" + "1\n" * 5 + "\n" + "oops\n"
+    with pytest.raises(ValueError, match="^Line 8: "):
+        price_text(text, chunk_size=2)
+
+def test_parse_lines_skips_blank_rows():
+    rows, line_numbers = parse_lines(["1,2\n", ",\n", "3,4\n"], "csv", ["a", "b"], first_line_number=10)
+    assert rows == [{"a": "1", "b": "2"}, {"a": "3", "b": "4"}] and line_numbers == [10, 12]
+
+def test_tariff_rows_with_print_start():
+    text = "print_start,print_duration_hours,electricity_cost_per_kwh_inr\n2026-10-19T17:00,2,7\n,2,7\n"
+    _, rows = price_text(text, tariff_name="Time-of-day (peak 18-22)")
+    assert float(rows[0]["electricity_cost_per_kwh_inr"]) != 7.0
+    assert float(rows[1]["electricity_cost_per_kwh_inr"]) == 7.0
+
+def test_bad_print_start_reports_line():
+    with pytest.raises(ValueError, match="^Line 3: invalid value 'soon' for print_start"):
+        price_text("print_start\n\nsoon\n", tariff_name="Time-of-day (peak 18-22)")
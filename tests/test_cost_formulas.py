@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from cost_engine import calculate_costs, price_batch
+from cost_graph import COST_INPUTS, IncrementalCostModel
+from solver import solve_batch, solve_quote
+
+# The cost formula is used by several entry points; every one of them must agree with calculate_costs,
+# the path the calculator form takes.
+JOBS = [
+    (500.0, 1200.0, 50.0, 3.0, 180.0, 7.0, 0.0, 0.0, 20.0),
+    (900.0, 2400.0, 220.5, 14.25, 350.0, 11.5, 1.5, 300.0, 45.0),
+    (0.0, 1200.0, 10.0, 1.0, 180.0, 7.0, 0.0, 0.0, 0.0),      # no selling price: margin is 0
+    (150.0, -50.0, 80.0, 2.0, 120.0, 8.0, 0.5, 150.0, 10.0),  # negative spool cost counts as free material
+    (40.0, 1500.0, 30.0, 0.0, 0.0, 7.0, 0.0, 0.0, 5.0),       # no electricity
+    (10.0, 3000.0, 100.0, 8.0, 250.0, 9.0, 2.0, 200.0, 50.0), # loss-making
+]
+COST_FIELDS = ["material_cost", "electricity_cost", "labor_cost", "other_costs", "total_cost", "profit", "profit_margin"]
+
+def expected(field):
+    return np.array([calculate_costs(*job)[field] for job in JOBS])
+
+def columns():
+    return [np.array(column) for column in zip(*JOBS)]
+
+@pytest.mark.parametrize("field", COST_FIELDS)
+def test_price_batch_matches_calculate_costs(field):
+    np.testing.assert_allclose(price_batch(*columns())[field], expected(field), rtol=1e-12, atol=1e-9)
+
+def test_solver_break_even_and_limits_match_calculate_costs():
+    total = expected("total_cost")
+    for job, break_even in zip(JOBS, total):
+        solved = solve_quote(*job, target_margin=25.0)
+        assert solved["break_even_price"] == pytest.approx(break_even)
+        assert solved["min_price_for_margin"] == pytest.approx(break_even / 0.75)
+        # Pricing the job at the solved limits breaks even exactly
+        for field, index in (("max_grams", 2), ("max_hours", 3)):
+            if np.isfinite(solved[field]):
+                at_limit = list(job)
+                at_limit[index] = solved[field]
+                assert calculate_costs(*at_limit)["profit"] == pytest.approx(0.0, abs=1e-9)
+
+def test_solve_batch_matches_solve_quote():
+    batch = solve_batch(*columns(), target_margin=25.0)
+    for i, job in enumerate(JOBS):
+        for field, value in solve_quote(*job, target_margin=25.0).items():
+            np.testing.assert_allclose(batch[field][i], value, rtol=1e-12, equal_nan=True)
+
+# JOBS columns in calculate_costs argument order, as IncrementalCostModel inputs
+GRAPH_FIELDS = ["selling_price_inr", "material_spool_cost_inr", "material_used_grams", "print_duration_hours",
+                "printer_wattage_p1s", "electricity_cost_per_kwh_inr", "labor_hours", "labor_hourly_rate_inr",
+                "other_costs_per_print_inr"]
+
+def graph_inputs(values):
+    return dict(zip(GRAPH_FIELDS, values), include_labor="Yes")
+
+def test_cost_graph_matches_calculate_costs_for_scalars_and_columns():
+    assert set(GRAPH_FIELDS) | {"include_labor"} == set(COST_INPUTS)
+    for job in JOBS:
+        results = IncrementalCostModel(graph_inputs(job)).as_dict()
+        for field in COST_FIELDS:
+            assert results[field] == pytest.approx(calculate_costs(*job)[field], abs=1e-9)
+    results = IncrementalCostModel(graph_inputs(columns())).as_dict()
+    for field in COST_FIELDS:
+        np.testing.assert_allclose(results[field], expected(field), rtol=1e-12, atol=1e-9)
+
+def test_cost_graph_updates_match_a_full_recompute():
+    model = IncrementalCostModel(graph_inputs(JOBS[0]))
+    for job in JOBS[1:]:
+        model.update(graph_inputs(job))
+        results = model.as_dict()
+        for field in COST_FIELDS:
+            assert results[field] == pytest.approx(calculate_costs(*job)[field], abs=1e-9)
@@ -0,0 +1,33 @@
+import pytest
+
+from farm_simulator import FarmJob, Printer, load_jobs_csv, load_printers_csv, main, simulate
+from tariff import TariffSchedule
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_load_jobs_csv_reads_defaults_and_numbers(tmp_path):
+    jobs = load_jobs_csv(write(tmp_path / "jobs.csv", "job_id,material_used_grams,priority\na,10,2\nb,,\n"))
+    assert [job.job_id for job in jobs] == ["a", "b"]
+    assert jobs[0].grams == 10.0 and jobs[0].priority == 2.0 and jobs[1].priority == 0.0
+
+def test_load_jobs_csv_reports_line_and_column(tmp_path):
+    path = write(tmp_path / "jobs.csv", "material_used_grams,print_duration_hours\n10,2\n\n12,abc\n")
+    with pytest.raises(ValueError, match="^Line 4: invalid value 'abc' for print_duration_hours$"):
+        load_jobs_csv(path)
+
+def test_load_printers_csv_reports_line_and_column(tmp_path):
+    with pytest.raises(ValueError, match="^Line 2: invalid value 'lots' for wattage$"):
+        load_printers_csv(write(tmp_path / "printers.csv", "name,wattage\nA,lots\n"))
+
+def test_main_exits_non_zero_on_bad_csv(tmp_path, capsys):
+    assert main([write(tmp_path / "jobs.csv", "selling_price_inr\nfree\n")]) == 1
+    assert "jobs.csv: Line 2: invalid value 'free' for selling_price_inr" in capsys.readouterr().err
+
+def test_simulate_prefers_loaded_material_and_bills_energy():
+    printers = [Printer("A", 200, material="PLA"), Printer("B", 200, material="PETG")]
+    jobs = [FarmJob(1, "PETG", 50, 2, 500), FarmJob(2, "PLA", 50, 2, 500)]
+    report = simulate(jobs, printers, TariffSchedule.flat(10.0), swap_hours=0.5)
+    assert report["material_swaps"] == 0 and report["makespan_hours"] == pytest.approx(2.0)
+    assert report["energy_kwh"] == pytest.approx(0.8) and report["energy_cost"] == pytest.approx(8.0)
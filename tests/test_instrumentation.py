@@ -0,0 +1,75 @@
+import threading
+import time
+import tracemalloc
+
+from instrumentation import MetricsRegistry, run_profiled
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    with registry.timer("x"):
+        pass
+    registry.count("y")
+    assert registry.snapshot()["timers"] == {} and registry.snapshot()["counters"] == {}
+
+def test_timer_and_prometheus_text():
+    registry = MetricsRegistry(enabled=True)
+    with registry.timer("app.rerun"):
+        pass
+    registry.count("app.reruns", 2)
+    text = registry.prometheus_text()
+    assert "printcalc_app_rerun_seconds_count 1" in text and "printcalc_app_reruns_total 2" in text
+
+def test_overlapping_tracemalloc_profiles(tmp_path):
+    # The first profile to start finishes while the second is still running; the second's snapshot must work
+    second_started, first_done = threading.Event(), threading.Event()
+    errors = []
+
+    def first():
+        second_started.wait(5)
+
+    def second():
+        second_started.set()
+        first_done.wait(5)
+
+    def run(fn, name, done=None):
+        try:
+            run_profiled(fn, "tracemalloc", output=str(tmp_path / name))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            if done:
+                done.set()
+
+    threads = [threading.Thread(target=run, args=(first, "first", first_done))]
+    threads[0].start()
+    deadline = time.monotonic() + 5
+    while not tracemalloc.is_tracing() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=run, args=(second, "second")))
+    threads[1].start()
+    for thread in threads:
+        thread.join(5)
+    assert not errors
+    assert (tmp_path / "first").exists() and (tmp_path / "second").exists()
+    assert not tracemalloc.is_tracing()
+
+def test_tracing_started_elsewhere_is_left_on(tmp_path):
+    tracemalloc.start()
+    try:
+        result, path = run_profiled(lambda: 42, "tracemalloc", output=str(tmp_path / "p"))
+        assert result == 42 and tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_overlapping_cprofile_runs_skip_the_second_profile(tmp_path):
+    inner = []
+
+    def outer():
+        inner.append(run_profiled(lambda: 7, "cprofile", output=str(tmp_path / "inner.prof")))
+        return 6
+
+    result, path = run_profiled(outer, "cprofile", output=str(tmp_path / "outer.prof"))
+    assert (result, inner) == (6, [(7, None)])
+    assert path and (tmp_path / "outer.prof").exists() and not (tmp_path / "inner.prof").exists()
+    # The lock is released again afterwards
+    assert run_profiled(lambda: 8, "cprofile", output=str(tmp_path / "again.prof"))[1]
@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+
+from cost_engine import DEFAULT_VALUES, calculate_costs
+from job_batch import ALIGNMENT, FILE_MAGIC, FLOAT_FIELDS, JobBatch, PrintJob, QuoteResult
+
+def make_batch(length=1000, materials=("PLA", "PETG", "ABS"), seed=0):
+    rng = np.random.default_rng(seed)
+    return JobBatch.from_columns({
+        "selling_price_inr": rng.uniform(0, 2000, length),
+        "material_used_grams": rng.uniform(1, 500, length),
+        "print_duration_hours": rng.uniform(0.1, 30, length),
+        "printer_wattage_p1s": rng.integers(100, 350, length),
+        "selected_material": rng.choice(materials, length),
+        "include_labor": rng.choice(["Yes", "No"], length),
+    })
+
+def assert_same_jobs(batch, expected):
+    assert len(batch) == len(expected) and batch.materials == expected.materials
+    for name in FLOAT_FIELDS:
+        assert batch.floats[name].dtype == np.float64
+        np.testing.assert_array_equal(batch.floats[name], expected.floats[name])
+    assert batch.material_codes.dtype == np.uint16 and batch.include_labor.dtype == bool
+    np.testing.assert_array_equal(batch.material_codes, expected.material_codes)
+    np.testing.assert_array_equal(batch.include_labor, expected.include_labor)
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    batch = make_batch()
+    path = tmp_path / "jobs.pcjobs"
+    batch.save(path)
+    loaded = JobBatch.load(path, mmap=mmap)
+    assert_same_jobs(loaded, batch)
+    assert all(isinstance(column, np.memmap) == mmap for column in loaded.floats.values())
+    for name in ("profit", "profit_margin"):
+        np.testing.assert_array_equal(loaded.price()[name], batch.price()[name])
+
+def test_columns_are_64_byte_aligned_in_the_file(tmp_path):
+    path = tmp_path / "jobs.pcjobs"
+    make_batch(length=37).save(path)  # odd length, so unpadded columns would end off-boundary
+    data = path.read_bytes()
+    assert data.startswith(FILE_MAGIC)
+    header_size = int.from_bytes(data[8:16], "little")
+    header = json.loads(data[16:16 + header_size])
+    data_start = -(-(16 + header_size) // ALIGNMENT) * ALIGNMENT
+    assert [entry["name"] for entry in header["columns"]] == FLOAT_FIELDS + ["selected_material", "include_labor"]
+    assert all((data_start + entry["offset"]) % ALIGNMENT == 0 for entry in header["columns"])
+    loaded = JobBatch.load(path)
+    assert all(column.offset % ALIGNMENT == 0 for column in loaded.floats.values())
+
+def test_memmap_columns_are_read_only(tmp_path):
+    path = tmp_path / "jobs.pcjobs"
+    make_batch(length=10).save(path)
+    with pytest.raises(ValueError):
+        JobBatch.load(path).floats["selling_price_inr"][0] = 1.0
+
+def test_empty_batch_round_trip(tmp_path):
+    path = tmp_path / "empty.pcjobs"
+    JobBatch.empty().save(path)
+    assert len(JobBatch.load(path)) == 0
+
+def test_not_a_batch_file(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text("selling_price_inr\n1\n")
+    with pytest.raises(ValueError, match="not a JobBatch file"):
+        JobBatch.load(path)
+
+def test_slices_are_views_and_save_correctly(tmp_path):
+    batch = make_batch()
+    part = batch[100:400:3]
+    for name in FLOAT_FIELDS:
+        assert np.shares_memory(part.floats[name], batch.floats[name])
+    assert np.shares_memory(part.material_codes, batch.material_codes) and part.materials is batch.materials
+    np.testing.assert_array_equal(part.material_column(), batch.material_column()[100:400:3])
+
+    path = tmp_path / "part.pcjobs"
+    part.save(path)  # strided views are written contiguously
+    assert_same_jobs(JobBatch.load(path), part)
+
+def test_integer_index_returns_a_print_job():
+    batch = make_batch(length=5)
+    job = batch[3]
+    assert isinstance(job, PrintJob)
+    assert job.selected_material == batch.material_column()[3]
+    assert job.selling_price_inr == batch.floats["selling_price_inr"][3]
+    assert isinstance(job.printer_wattage_p1s, int)
+    assert job.include_labor == ("Yes" if batch.include_labor[3] else "No")
+
+def test_concat_reinterns_materials():
+    first = make_batch(length=50, materials=("PLA", "TPU"), seed=1)
+    second = make_batch(length=60, materials=("ABS", "PLA"), seed=2)
+    joined = JobBatch.concat([first, second, JobBatch.empty()])
+    assert joined.materials == ("ABS", "PLA", "TPU") and len(joined) == 110
+    np.testing.assert_array_equal(joined.material_column(),
+                                  np.concatenate([first.material_column(), second.material_column()]))
+    for name in FLOAT_FIELDS:
+        np.testing.assert_array_equal(joined.floats[name],
+                                      np.concatenate([first.floats[name], second.floats[name]]))
+    np.testing.assert_array_equal(joined.include_labor, np.concatenate([first.include_labor, second.include_labor]))
+
+def test_records_price_like_calculate_costs():
+    job = PrintJob(selling_price_inr=900.0, include_labor="Yes")
+    expected = calculate_costs(900.0, DEFAULT_VALUES["material_spool_cost_inr"], DEFAULT_VALUES["material_used_grams"],
+                               DEFAULT_VALUES["print_duration_hours"], DEFAULT_VALUES["printer_wattage_p1s"],
+                               DEFAULT_VALUES["electricity_cost_per_kwh_inr"], DEFAULT_VALUES["labor_hours"],
+                               DEFAULT_VALUES["labor_hourly_rate_inr"], DEFAULT_VALUES["other_costs_per_print_inr"])
+    assert job.price().as_dict() == pytest.approx(expected)
+    assert JobBatch.from_jobs([job]).price()["profit"][0] == pytest.approx(expected["profit"])
+    assert not hasattr(job, "__dict__") and not hasattr(QuoteResult.from_dict(expected), "__dict__")
+    with pytest.raises(ValueError, match="Unknown job field"):
+        PrintJob(material_grams=80)
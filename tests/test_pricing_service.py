@@ -0,0 +1,122 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+import pricing_service
+from cost_engine import DEFAULT_VALUES, calculate_costs
+from pricing_service import BadRequest, create_server, normalize_job, price_many, price_single
+
+# --- normalize_job / price_* ---
+def test_normalize_job_fills_defaults_and_catalog_fields():
+    job = normalize_job({"selling_price_inr": "900", "selected_material": "PLA"})
+    assert job["selling_price_inr"] == 900.0
+    assert job["labor_hours"] == DEFAULT_VALUES["labor_hours"]
+    assert job["material_spool_cost_inr"] > 0 and job["printer_wattage_p1s"] > 0
+
+@pytest.mark.parametrize("payload", [
+    {"selected_material": ["PLA"]},
+    {"include_labor": {"yes": True}},
+    {"selected_material": 5},
+    {"selling_price_inr": "abc"},
+    {"selling_price_inr": float("nan")},
+    {"material_used_grams": float("inf")},
+    {"print_duration_hours": "-inf"},
+    {"labor_hours": True},
+    [],
+])
+def test_normalize_job_rejects_bad_values(payload):
+    with pytest.raises(BadRequest):
+        normalize_job(payload)
+
+def test_price_single_matches_calculate_costs():
+    result = price_single({"selling_price_inr": 700, "material_used_grams": 80, "material_spool_cost_inr": 1500,
+                           "printer_wattage_p1s": 200})
+    expected = calculate_costs(700, 1500, 80, DEFAULT_VALUES["print_duration_hours"], 200,
+                               DEFAULT_VALUES["electricity_cost_per_kwh_inr"], 0, 0,
+                               DEFAULT_VALUES["other_costs_per_print_inr"])
+    assert result["calc_profit"] == pytest.approx(expected["profit"])
+
+def test_price_single_rejects_non_finite_target_margin():
+    with pytest.raises(BadRequest):
+        price_single({"target_margin": "nan"})
+
+def test_price_many_rejects_non_string_material():
+    with pytest.raises(BadRequest, match="selected_material"):
+        price_many({"jobs": [{"selected_material": ["x"]}]})
+
+def test_price_many_reports_job_number():
+    with pytest.raises(BadRequest, match="Job 2"):
+        price_many({"jobs": [{}, {"material_used_grams": "NaN"}]})
+
+# --- HTTP handler ---
+@pytest.fixture
+def server():
+    server = create_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, json.loads(data) if data else None
+    finally:
+        conn.close()
+
+# The handler records metrics after the response is written, so give it a moment
+def endpoint_stats(server, path):
+    deadline = time.monotonic() + 2
+    while True:
+        endpoints = server.RequestHandlerClass.metrics.snapshot()["endpoints"]
+        if path in endpoints or time.monotonic() > deadline:
+            return endpoints[path]
+        time.sleep(0.01)
+
+def test_batch_with_unhashable_material_is_a_400(server):
+    status, body = request(server, "POST", "/v1/price/batch", json.dumps({"jobs": [{"selected_material": ["x"]}]}))
+    assert status == 400 and "selected_material" in body["error"]
+    assert endpoint_stats(server, "/v1/price/batch")["errors"] == 1
+
+def test_nan_literal_is_a_400(server):
+    status, body = request(server, "POST", "/v1/price", '{"selling_price_inr": NaN}')
+    assert status == 400
+
+def test_negative_content_length_is_rejected_without_blocking(server):
+    status, body = request(server, "POST", "/v1/price", headers={"Content-Length": "-1"})
+    assert status == 400 and body["error"] == "Invalid Content-Length"
+
+def test_unexpected_error_is_a_json_500_and_recorded(server, monkeypatch):
+    def explode(payload):
+        raise KeyError("boom")
+    monkeypatch.setattr(pricing_service, "price_single", explode)
+    status, body = request(server, "POST", "/v1/price", "{}")
+    assert status == 500 and body == {"error": "Internal server error"}
+    stats = endpoint_stats(server, "/v1/price")
+    assert stats["requests"] == 1 and stats["errors"] == 1
+
+def test_batch_round_trip(server):
+    status, body = request(server, "POST", "/v1/price/batch", json.dumps({"jobs": [{}, {"selling_price_inr": 50}]}))
+    assert status == 200 and len(body["results"]) == 2
+    assert body["results"][1]["calc_profit"] < body["results"][0]["calc_profit"]
+
+def test_unknown_paths_and_query_strings_do_not_add_endpoints(server):
+    for path in ("/nope", "/x?y=1", '/a"b\\c', "/v1/price/batch/extra"):
+        assert request(server, "POST", path, "{}")[0] == 404
+    status, _ = request(server, "POST", "/v1/price?trace=1", "{}")
+    assert status == 200
+    assert endpoint_stats(server, "other")["requests"] == 4
+    assert endpoint_stats(server, "/v1/price")["requests"] == 1
+    assert set(server.RequestHandlerClass.metrics.snapshot()["endpoints"]) == {"other", "/v1/price"}
+
+def test_prometheus_label_values_are_escaped():
+    metrics = pricing_service.ServiceMetrics()
+    metrics.record('/a"b\\c\nd', 200, 0.001)
+    assert 'endpoint="/a\\"b\\\\c\\nd"' in metrics.prometheus_text()
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from cost_engine import calculate_costs
+from quote_cache import QuoteCache
+
+JOB = ("PLA", 500.0, 1200.0, 50.0, 3.0, 180, 7.0, "No", 0.5, 150.0, 20.0)
+
+def job(**changes):
+    fields = dict(zip(["material", "selling_price", "material_spool_cost", "material_used_grams",
+                       "print_duration_hours", "printer_wattage", "electricity_cost_per_kwh", "include_labor",
+                       "labor_hours", "labor_hourly_rate", "other_costs"], JOB), **changes)
+    return list(fields.values())
+
+def test_miss_then_hit_returns_the_formula_result():
+    cache = QuoteCache(8)
+    first = cache.get_or_compute(*JOB)
+    assert first == calculate_costs(500.0, 1200.0, 50.0, 3.0, 180.0, 7.0, 0.0, 0.0, 20.0)
+    assert cache.get_or_compute(*JOB) == first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_results_are_copies():
+    cache = QuoteCache(8)
+    cache.get_or_compute(*JOB)["profit"] = -1
+    assert cache.get_or_compute(*JOB)["profit"] != -1
+
+def test_labor_fields_only_matter_when_labor_is_included():
+    cache = QuoteCache(8)
+    cache.get_or_compute(*JOB)
+    cache.get_or_compute(*job(labor_hours=9.0))
+    assert cache.stats()["misses"] == 1
+    with_labor = cache.get_or_compute(*job(include_labor="Yes"))
+    assert with_labor["labor_cost"] == pytest.approx(75.0) and cache.stats()["misses"] == 2
+
+def test_int_and_float_inputs_share_an_entry():
+    cache = QuoteCache(8)
+    cache.get_or_compute(*job(selling_price=500))
+    cache.get_or_compute(*job(selling_price=500.0))
+    assert cache.stats()["hits"] == 1
+
+def test_lru_eviction_keeps_recently_used_entries():
+    cache = QuoteCache(2)
+    for price in (100.0, 200.0):
+        cache.get_or_compute(*job(selling_price=price))
+    cache.get_or_compute(*job(selling_price=100.0))  # 100 is now most recent
+    cache.get_or_compute(*job(selling_price=300.0))  # evicts 200
+    cache.get_or_compute(*job(selling_price=100.0))
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1 and stats["hits"] == 2
+    cache.get_or_compute(*job(selling_price=200.0))
+    assert cache.stats()["misses"] == 4
+
+def test_custom_compute_is_used_on_a_miss_only():
+    cache = QuoteCache(8)
+    calls = []
+    def compute():
+        calls.append(1)
+        return {"profit": 42.0}
+    assert cache.get_or_compute(*JOB, compute=compute) == {"profit": 42.0}
+    assert cache.get_or_compute(*JOB, compute=compute) == {"profit": 42.0}
+    assert len(calls) == 1
+
+def test_size_zero_disables_caching():
+    cache = QuoteCache(0)
+    cache.get_or_compute(*JOB)
+    cache.get_or_compute(*JOB)
+    assert cache.stats()["size"] == 0 and cache.stats()["misses"] == 2
+    with pytest.raises(ValueError):
+        QuoteCache(-1)
+
+def test_concurrent_sessions_stay_consistent():
+    cache = QuoteCache(16)
+    wrong = []
+    def worker(offset):
+        for i in range(500):
+            price = float((i + offset) % 32)
+            profit = cache.get_or_compute(*job(selling_price=price))["profit"]
+            if profit != pytest.approx(price - 83.78):
+                wrong.append((price, profit))
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not wrong
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 2000 and stats["size"] <= 16
@@ -0,0 +1,63 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from quote_history import COLUMNS, QuoteHistory
+
+INPUTS = {
+    "material": "PLA", "selling_price": 500.0, "material_spool_cost": 1200.0, "material_used_grams": 50.0,
+    "print_duration_hours": 3.0, "printer_wattage": 180, "electricity_cost_per_kwh": 7.0, "include_labor": "No",
+    "labor_hours": 0.0, "labor_hourly_rate": 0.0, "other_costs": 20.0,
+}
+RESULTS = {"material_cost": 60.0, "electricity_cost": 3.78, "labor_cost": 0.0, "total_cost": 83.78, "profit": 416.22,
+           "profit_margin": 83.2}
+
+@pytest.fixture
+def history(tmp_path):
+    history = QuoteHistory(str(tmp_path / "history.db"), batch_size=10, flush_interval=0.01)
+    yield history
+    history.close()
+
+def flush(history, timeout=5):
+    # Fail the test instead of hanging it if the writer ever stops draining the queue
+    thread = threading.Thread(target=history.flush, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "flush() did not return"
+
+def test_record_flush_and_query(history):
+    now = datetime.now()
+    for i in range(25):
+        history.record(dict(INPUTS, material="ABS" if i % 5 == 0 else "PLA"), dict(RESULTS, profit_margin=float(i)),
+                       created_at=now - timedelta(minutes=i))
+    flush(history)
+    assert history.count() == 25
+    cheap_abs = history.query(material="ABS", max_margin=12)
+    assert [quote["profit_margin"] for quote in cheap_abs] == [0.0, 5.0, 10.0]
+    assert history.query(since=now - timedelta(minutes=2.5), limit=None)[0]["created_at"] == now
+
+def test_record_many_rejects_wrong_arity(history):
+    with pytest.raises(ValueError, match="Row 1"):
+        history.record_many([[0.0] * len(COLUMNS), (1, 2, 3)])
+    flush(history)
+    assert history.count() == 0  # nothing from the rejected call was queued
+
+def test_failed_insert_keeps_the_writer_alive(history, capsys):
+    good = [datetime.now().timestamp(), "PLA"] + [1.0] * (len(COLUMNS) - 2)
+    bad = [None, "PLA"] + [1.0] * (len(COLUMNS) - 2)  # created_at is NOT NULL
+    history.record_many([good, bad, good])
+    flush(history)
+    assert history.count() == 2 and history.dropped == 1
+    assert "dropped 1 of 3" in capsys.readouterr().err
+    history.record(INPUTS, RESULTS)
+    flush(history)
+    assert history.count() == 3
+
+def test_closed_history_rejects_records(tmp_path):
+    history = QuoteHistory(str(tmp_path / "closed.db"))
+    history.close()
+    with pytest.raises(RuntimeError):
+        history.record(INPUTS, RESULTS)
+    with pytest.raises(RuntimeError):
+        history.record_many([])
@@ -0,0 +1,50 @@
+import csv
+import io
+
+import pytest
+
+import risk_analysis
+from cost_engine import DEFAULT_VALUES
+from risk_analysis import RiskSpec, simulate_job
+
+def run_chunked(monkeypatch, chunk_size, spec, samples):
+    chunks = []
+    sample_chunk = risk_analysis._sample_chunk
+    def counting(job, spec, seeds, sizes):
+        chunks.append(sum(sizes))
+        return sample_chunk(job, spec, seeds, sizes)
+    monkeypatch.setattr(risk_analysis, "_sample_chunk", counting)
+    monkeypatch.setattr(risk_analysis, "CHUNK_SIZE", chunk_size)
+    return simulate_job(DEFAULT_VALUES, spec, samples=samples, seed=3), chunks
+
+def test_same_seed_gives_the_same_answer_for_any_chunk_size(monkeypatch):
+    spec = RiskSpec(failure_rate=0.1, tariff_tolerance=0.05, distribution="triangular")
+    samples = 200_000  # not a multiple of the block size, so the last block is short
+    expected, default_chunks = run_chunked(monkeypatch, risk_analysis.CHUNK_SIZE, spec, samples)
+    for chunk_size in (1, 50_000, 1 << 20):
+        result, chunks = run_chunked(monkeypatch, chunk_size, spec, samples)
+        assert sum(chunks) == samples and len(chunks) != len(default_chunks)
+        assert result == expected
+
+def test_cli_reports_source_lines_across_blank_lines(tmp_path, capsys):
+    path = tmp_path / "jobs.csv"
+    path.write_text("\ufeffselling_price_inr,material_used_grams\n500,50\n\n600,60\n", encoding="utf-8")
+    assert risk_analysis.main([str(path), "--samples", "1000"]) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert [row["line"] for row in rows] == ["2", "4"]
+
+    path.write_text("selling_price_inr,material_used_grams\n500,50\n\n600,abc\n", encoding="utf-8")
+    assert risk_analysis.main([str(path), "--samples", "1000"]) == 2
+    assert "Line 4: invalid value 'abc'" in capsys.readouterr().err
+
+def test_cli_rejects_unknown_columns_unless_ignored(tmp_path, capsys):
+    path = tmp_path / "jobs.csv"
+    path.write_text("selling_price_inr,material_grams\n500,80\n", encoding="utf-8")
+    assert risk_analysis.main([str(path), "--samples", "1000"]) == 2
+    assert "'material_grams'" in capsys.readouterr().err
+    assert risk_analysis.main([str(path), "--samples", "1000", "--ignore-unknown-columns"]) == 0
+
+@pytest.mark.parametrize("kwargs", [{"failure_rate": 1.0}, {"grams_tolerance": -0.1}, {"distribution": "lognormal"}])
+def test_invalid_specs_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        RiskSpec(**kwargs)
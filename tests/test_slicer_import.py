@@ -0,0 +1,127 @@
+import io
+import zipfile
+
+import pytest
+
+from slicer_import import (HEAD_BYTES, TAIL_BYTES, SlicerCache, filament_grams, import_paths, import_upload,
+                           match_material, parse_duration, parse_gcode_text, scan_bytes, scan_file)
+
+PRUSA_FOOTER = (b"; filament used [mm] = 16500.25\n; filament used [g] = 49.30\n"
+                b"; estimated printing time (normal mode) = 5h 12m 9s\n; filament_type = PETG\n")
+CURA_HEADER = b";FLAVOR:Marlin\n;TIME:7200\n;Filament used: 3.5m\n;Generated with Cura_SteamEngine 5.4.0\n"
+BAMBU_HEADER = (b"; HEADER_BLOCK_START\n; BambuStudio 01.08.00.62\n; total estimated time: 1h 2m 3s\n"
+                b"; total filament weight [g] : 12.5\n; filament_type = PLA\n; HEADER_BLOCK_END\n")
+
+def gcode(head=b"", body_lines=100, tail=b""):
+    return head + b"G1 X1 Y1 E0.1\n" * body_lines + tail
+
+@pytest.mark.parametrize("text", ["5h 12m 9s", "1d 2h", "90"])
+def test_parse_duration(text):
+    assert parse_duration(text) == pytest.approx({"5h 12m 9s": 5 + 12 / 60 + 9 / 3600, "1d 2h": 26, "90": 90 / 3600}[text])
+
+def test_prusa_footer():
+    estimate = parse_gcode_text(gcode(b"; generated by PrusaSlicer 2.7.1\n", tail=PRUSA_FOOTER))
+    assert estimate.slicer == "PrusaSlicer" and estimate.material == "PETG"
+    assert estimate.grams == pytest.approx(49.3) and estimate.hours == pytest.approx(5 + 12 / 60 + 9 / 3600)
+
+def test_bambu_header_with_crlf_line_endings():
+    estimate = parse_gcode_text(gcode(BAMBU_HEADER).replace(b"\n", b"\r\n"))
+    assert estimate.slicer == "Bambu Studio" and estimate.material == "PLA"
+    assert estimate.grams == pytest.approx(12.5) and estimate.hours == pytest.approx(1 + 2 / 60 + 3 / 3600)
+
+def test_cura_length_is_converted_with_catalog_density():
+    estimate = parse_gcode_text(gcode(CURA_HEADER))
+    assert estimate.slicer == "Cura" and estimate.hours == pytest.approx(2.0)
+    assert estimate.filament_mm == pytest.approx(3500)
+    assert estimate.grams == pytest.approx(filament_grams(3500))
+
+def test_multi_extruder_values_are_summed():
+    estimate = parse_gcode_text(b"; filament used [g] = 3.21, 1.02\n; estimated printing time = 1h\n")
+    assert estimate.grams == pytest.approx(4.23)
+
+def test_missing_summary_is_an_error():
+    with pytest.raises(ValueError, match="no estimated print time"):
+        parse_gcode_text(gcode(b"; just a comment\n"))
+
+def test_big_file_reads_only_head_and_tail(tmp_path):
+    path = tmp_path / "big.gcode"
+    body = b"G1 X1 Y1 E0.1\n" * ((HEAD_BYTES + TAIL_BYTES) // 10)
+    path.write_bytes(b"; generated by PrusaSlicer\n" + body + PRUSA_FOOTER)
+    _, estimate = scan_file(str(path))
+    assert estimate.grams == pytest.approx(49.3)
+
+def make_3mf(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+SLICE_INFO = b"""<?xml version="1.0" encoding="UTF-8"?>
+<config>
+  <plate>
+    <metadata key="index" value="1"/><metadata key="prediction" value="3600"/><metadata key="weight" value="20.5"/>
+    <filament id="1" type="PETG" used_g="20.5"/>
+  </plate>
+  <plate>
+    <metadata key="index" value="2"/><metadata key="prediction" value="1800"/><metadata key="weight" value="4.5"/>
+    <filament id="1" type="PLA" used_g="4.5"/>
+  </plate>
+</config>"""
+
+def test_3mf_slice_info_sums_plates():
+    _, estimate = scan_bytes(make_3mf({"Metadata/slice_info.config": SLICE_INFO}), "plate.3mf")
+    assert estimate.grams == pytest.approx(25.0) and estimate.hours == pytest.approx(1.5)
+    assert estimate.material == "PETG"
+
+def test_3mf_falls_back_to_embedded_gcode():
+    data = make_3mf({"Metadata/plate_1.gcode": gcode(BAMBU_HEADER), "Metadata/plate_2.gcode": gcode(BAMBU_HEADER)})
+    _, estimate = scan_bytes(data, "project.3mf")
+    assert estimate.grams == pytest.approx(25.0)
+
+def test_unsliced_3mf_is_an_error():
+    with pytest.raises(ValueError, match="no slicing results"):
+        scan_bytes(make_3mf({"3D/3dmodel.model": b"<model/>"}), "model.3mf")
+
+def test_match_material():
+    assert match_material("PETG-CF") == "PETG"
+    assert match_material("PA12") == "Nylon"
+    assert match_material("unobtainium") is None
+
+def test_upload_cache_is_a_bounded_lru():
+    cache = SlicerCache(max_uploads=2)
+    files = [gcode(BAMBU_HEADER, body_lines=n) for n in (1, 2, 3)]
+    for i, data in enumerate(files):
+        import_upload(data, f"{i}.gcode", cache)
+    assert len(cache.uploads) == 2
+    assert import_upload(files[2], "renamed.gcode", cache).source == "renamed.gcode"
+    assert cache.results == {}  # uploads don't go into the persisted path-scan results
+
+def test_import_paths_uses_the_cache_for_unchanged_files(tmp_path):
+    folder = tmp_path / "prints"
+    folder.mkdir()
+    (folder / "a.gcode").write_bytes(gcode(BAMBU_HEADER))
+    (folder / "b.gcode").write_bytes(b"not sliced\n")
+    cache = SlicerCache(str(tmp_path / "cache.json"))
+    estimates, errors, parsed = import_paths([str(folder)], cache=cache)
+    assert len(estimates) == 1 and len(errors) == 1 and parsed == 1
+    estimates, errors, parsed = import_paths([str(folder)], cache=SlicerCache(cache.path))
+    assert len(estimates) == 1 and parsed == 0
+
+def test_saved_cache_drops_deleted_files_and_stale_results(tmp_path):
+    folder = tmp_path / "prints"
+    folder.mkdir()
+    kept, edited, deleted = folder / "kept.gcode", folder / "edited.gcode", folder / "deleted.gcode"
+    for path in (kept, edited, deleted):
+        path.write_bytes(gcode(BAMBU_HEADER, body_lines=len(path.name)))
+    cache_path = str(tmp_path / "cache.json")
+    import_paths([str(folder)], cache=SlicerCache(cache_path))
+    assert len(SlicerCache(cache_path).results) == 3
+
+    deleted.unlink()
+    edited.write_bytes(gcode(BAMBU_HEADER, body_lines=500))
+    import_paths([str(folder)], cache=SlicerCache(cache_path))
+    reloaded = SlicerCache(cache_path)
+    assert sorted(reloaded.entries) == sorted([str(kept), str(edited)])
+    assert set(reloaded.results) == {entry["fingerprint"] for entry in reloaded.entries.values()}
+    assert len(reloaded.results) == 2
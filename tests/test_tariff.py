@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from tariff import TariffSchedule, _load_tariffs_file, get_tariff
+
+STEP = timedelta(minutes=15)  # every slab boundary below falls on a quarter hour
+
+def stepped_rate(schedule, start, duration_hours):
+    # Reference: walk the job in quarter-hour steps and average the rate in force at each step
+    steps = int(round(duration_hours * 4))
+    if steps == 0:
+        return schedule.rate_at(start)
+    return sum(schedule.rate_at(start + i * STEP) for i in range(steps)) / steps
+
+def schedules():
+    return [
+        get_tariff("Time-of-day (peak 18-22)"),
+        get_tariff("Weekday peak / weekend off-peak"),
+        TariffSchedule.hourly([4.0 + (h % 7) for h in range(24)]),
+        TariffSchedule([0.0, 0.5, 13.25], [3.0, 9.0, 6.0], "day", "Odd slabs"),
+        TariffSchedule.flat(7.0),
+    ]
+
+def jobs(seed=0, count=300):
+    rng = np.random.default_rng(seed)
+    base = datetime(2024, 1, 1)  # a Monday
+    starts = [base + STEP * int(q) for q in rng.integers(0, 4 * 24 * 7 * 6, count)]
+    durations = rng.integers(0, 4 * 24 * 9, count) / 4  # up to 9 days, so weekly cycles wrap
+    return starts, durations
+
+@pytest.mark.parametrize("schedule", schedules(), ids=lambda s: s.name)
+def test_effective_rate_batch_matches_hour_stepping(schedule):
+    starts, durations = jobs()
+    batch = schedule.effective_rate_batch(np.array(starts, dtype="datetime64[s]"), durations)
+    expected = [stepped_rate(schedule, start, float(hours)) for start, hours in zip(starts, durations)]
+    np.testing.assert_allclose(batch, expected, rtol=1e-9)
+    scalar = [schedule.effective_rate(start, float(hours)) for start, hours in zip(starts, durations)]
+    np.testing.assert_allclose(batch, scalar, rtol=1e-12)
+
+def test_weekly_schedule_starts_on_monday():
+    weekly = get_tariff("Weekday peak / weekend off-peak")
+    assert weekly.rate_at(datetime(2024, 1, 1, 10)) == 8.4   # Monday 10:00
+    assert weekly.rate_at(datetime(2024, 1, 6, 10)) == 5.6   # Saturday 10:00
+    assert weekly.effective_rate(datetime(2024, 1, 5, 20), 2) == pytest.approx((8.4 + 5.6) / 2)
+
+def test_far_future_start_keeps_precision():
+    daily = get_tariff("Time-of-day (peak 18-22)")
+    start = datetime(2200, 6, 1, 17, 45)
+    assert daily.effective_rate(start, 0.5) == pytest.approx((7.0 + 8.4) / 2, rel=1e-12)
+    assert daily.effective_rate_batch(np.array([start], dtype="datetime64[s]"), [0.5])[0] == pytest.approx(7.7, rel=1e-12)
+
+@pytest.mark.parametrize("slabs, rates, period", [
+    ([1.0, 2.0], [5.0, 6.0], "day"),     # must begin at 00:00
+    ([0.0, 3.0, 2.0], [1.0, 2.0, 3.0], "day"),
+    ([0.0, 24.0], [1.0, 2.0], "day"),
+    ([0.0], [-1.0], "day"),
+    ([0.0], [1.0], "month"),
+])
+def test_invalid_schedules_are_rejected(slabs, rates, period):
+    with pytest.raises(ValueError):
+        TariffSchedule(slabs, rates, period)
+
+def test_bad_tariff_file(tmp_path):
+    path = tmp_path / "tariffs.json"
+    path.write_text('{"Broken": {"period": "week", "slabs": [["Funday 00:00", 5]]}}', encoding="utf-8")
+    with pytest.raises(ValueError, match="Invalid tariff file"):
+        _load_tariffs_file(str(path))
@@ -0,0 +1,253 @@
+from functools import lru_cache
+
+# --- CSS Definitions ---
+# Kept out of Final.py because Streamlit re-executes the app script on every rerun; as an imported module
+# the caches below survive reruns, so each stylesheet is built once per process and shared by every session.
+# The theme-independent rules live in get_base_css(), and only the small :root variables block from
+# get_theme_css() differs between themes. On a normal rerun the page still sends both elements; only in
+# scaling mode, where the toggle reruns just the theme fragment, does a toggle resend the variables block
+# alone. Building either sheet takes under a microsecond, so the cache matters far less than the fragment
+# (see benchmarks/bench_css.py --reruns).
+COMMON_FONT_FAMILY = "'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif"
+
+@lru_cache(maxsize=None)
+def get_theme_css(theme_mode):
+    brand_color_light = "#D92E2E"  # Strong, clear Red for 3Idiots (Light theme)
+    brand_color_dark = "#FF6B6B"   # Brighter, vibrant Red for 3Idiots (Dark theme)
+
+    if theme_mode == 'light':
+        css_vars = f"""
+            --bg-color: #FFFFFF; /* Pure White for max brightness */
+            --card-bg-color: #F8F9FA; /* Very light grey for cards, distinct from pure white bg */
+            --text-primary: #181C20; /* Very dark, almost black for high contrast */
+            --text-secondary: #525860; /* Clear medium-dark grey */
+            --accent-primary: #007AFF; /* Classic, strong Blue */
+            --accent-secondary: {brand_color_light};
+            --border-color: #DDE2E7; /* Softer, but clear border */
+            --input-bg: #FFFFFF;
+            --input-text: #181C20; /* Ensure input text is dark */
+            --input-border: #BCCCDC; /* Clearer input border */
+            --success-text: #28A745;
+            --shadow-soft: 0 2px 8px rgba(0, 0, 0, 0.06); /* Softer, cleaner shadow */
+            --shadow-medium: 0 4px 12px rgba(0, 0, 0, 0.08);
+            --button-primary-bg: {brand_color_light};
+            --button-primary-text: #FFFFFF;
+            --button-primary-hover-bg: #B82222; /* Darken red */
+            --button-secondary-bg: #E9ECEF; /* Light grey button */
+            --button-secondary-text: #343A40; /* Dark text on light grey button */
+            --button-secondary-hover-bg: #DDE2E7;
+            --theme-button-bg: #F8F9FA;
+            --theme-button-text: var(--accent-primary);
+            --theme-button-border: var(--accent-primary);
+            --theme-button-hover-bg: #E2E6EA;
+            --selectbox-dropdown-bg: #FFFFFF;
+            --selectbox-dropdown-text: var(--text-primary);
+            --selectbox-dropdown-hover-bg: #F0F2F6;
+        """
+    else: # Dark Theme
+        css_vars = f"""
+            --bg-color: #0F172A; /* Deep Navy */
+            --card-bg-color: #1E293B; /* Dark Slate Blue */
+            --text-primary: #E2E8F0; /* Bright Off-white */
+            --text-secondary: #94A3B8; /* Soft Light Grey */
+            --accent-primary: #38BDF8; /* Vibrant Sky Blue */
+            --accent-secondary: {brand_color_dark};
+            --border-color: #334155; /* Mid-dark border */
+            --input-bg: #0F172A; /* Match main bg for seamless look */
+            --input-text: #E2E8F0; /* Ensure input text is light */
+            --input-border: #4A5569; /* Clearer input border for dark */
+            --success-text: #6EE7B7; /* Bright Mint Green */
+            --shadow-soft: 0 2px 8px rgba(0, 0, 0, 0.15);
+            --shadow-medium: 0 4px 12px rgba(0, 0, 0, 0.25);
+            --button-primary-bg: {brand_color_dark};
+            --button-primary-text: #0F172A; /* Dark text on bright button */
+            --button-primary-hover-bg: #FF4A4A; /* Brighter red on hover */
+            --button-secondary-bg: #334155; /* Darker grey button */
+            --button-secondary-text: var(--text-primary);
+            --button-secondary-hover-bg: #4A5569;
+            --theme-button-bg: var(--card-bg-color);
+            --theme-button-text: var(--accent-primary);
+            --theme-button-border: var(--accent-primary);
+            --theme-button-hover-bg: var(--input-bg);
+            --selectbox-dropdown-bg: #1E293B;
+            --selectbox-dropdown-text: var(--text-primary);
+            --selectbox-dropdown-hover-bg: #334155;
+        """
+
+    return f"""
+<style>
+:root {{
+    {css_vars}
+}}
+</style>
+"""
+
+@lru_cache(maxsize=None)
+def get_base_css():
+    return f"""
+<style>
+/* --- Base App Styling --- */
+body {{ margin: 0; font-family: {COMMON_FONT_FAMILY}; line-height: 1.65; /* Improved line height */ }}
+.stApp {{
+    background-color: var(--bg-color);
+    color: var(--text-primary);
+}}
+
+/* --- Headers & Titles --- */
+h1 {{
+    color: var(--accent-secondary); /* Brand Color */
+    text-align: center; font-weight: 700; /* Slightly less bold than 800 for stability */
+    margin-bottom: 0.35rem; letter-spacing: -0.03em;
+    font-size: 2.4em; padding-top: 1.2rem;
+}}
+.sub-title {{
+    color: var(--text-secondary);
+    text-align: center; font-size: 1.1em; margin-bottom: 2rem; font-weight: 400;
+}}
+h2 {{ /* Section Headers */
+    color: var(--accent-primary);
+    font-size: 1.7em; font-weight: 600; /* Balanced weight */
+    border-bottom: 2px solid var(--accent-primary);
+    padding-bottom: 10px; margin-top: 35px; margin-bottom: 25px;
+}}
+h3 {{ /* Input Group Headers */
+    color: var(--text-primary);
+    font-size: 1.2em; font-weight: 600; margin-top: 22px; margin-bottom: 16px;
+    border-left: 3px solid var(--accent-secondary); /* Thinner, cleaner brand accent */
+    padding-left: 12px;
+}}
+
+/* --- Containers & Cards --- */
+.main-container-wrapper {{ padding: 0 1rem; max-width: 1100px; margin: 0 auto; }} /* Slightly narrower */
+.card-container {{
+    background-color: var(--card-bg-color);
+    padding: 28px 32px; border-radius: 10px; /* Standard rounding */
+    box-shadow: var(--shadow-medium);
+    margin-bottom: 30px;
+    border: 1px solid var(--border-color);
+}}
+.card-container h2 {{ margin-top: 0; }}
+
+/* --- Metric Styling --- */
+div[data-testid="stMetric"] {{
+    background-color: var(--card-bg-color);
+    border: 1px solid var(--border-color);
+    border-left: 4px solid var(--accent-primary); /* Slightly thinner accent */
+    border-radius: 8px; padding: 18px; /* Balanced padding */
+    box-shadow: var(--shadow-soft);
+}}
+div[data-testid="stMetric"] > label[data-testid="stMetricLabel"] > div {{
+    font-weight: 500; /* Less aggressive weight */
+    color: var(--accent-primary) !important; /* Ensure Streamlit doesn't override with less contrast */
+    text-transform: uppercase; font-size: 0.8em; letter-spacing: 0.04em;
+}}
+div[data-testid="stMetric"] p {{ /* Metric value */
+    color: var(--text-primary) !important; /* Ensure visibility */
+    font-size: 1.9em; font-weight: 600; /* Strong, but not overly bold */
+}}
+div[data-testid="stMetric"] div[data-testid="stMetricDelta"] {{
+    color: var(--text-secondary) !important;
+    font-size: 0.9em; font-weight: 500;
+}}
+
+/* --- Input Widget Styling (CRITICAL FOR VISIBILITY) --- */
+.stTextInput label, .stNumberInput label, .stRadio label, .stSelectbox label {{
+    color: var(--text-primary) !important; /* CRITICAL: High contrast labels */
+    font-weight: 500; font-size: 0.95em; margin-bottom: 6px; display: inline-block;
+}}
+/* Input fields themselves */
+div[data-testid="stNumberInput"] input, 
+div[data-testid="stTextInput"] input, 
+div[data-testid="stSelectbox"] div[data-baseweb="select"] > div {{
+    background-color: var(--input-bg) !important;
+    color: var(--input-text) !important; /* CRITICAL: High contrast input text */
+    border: 1px solid var(--input-border) !important;
+    border-radius: 6px; padding: 10px;
+    transition: border-color 0.2s ease, box-shadow 0.2s ease;
+}}
+/* Focus state for inputs */
+div[data-testid="stNumberInput"] input:focus, 
+div[data-testid="stTextInput"] input:focus, 
+div[data-testid="stSelectbox"] div[data-baseweb="select"] > div:focus-within {{
+    border-color: var(--accent-secondary) !important;
+    box-shadow: 0 0 0 2px var(--accent-secondary) !important; /* Use box-shadow for outline effect */
+}}
+/* Selectbox dropdown items (CRITICAL FOR VISIBILITY) */
+div[data-baseweb="popover"] ul li {{
+    background-color: var(--selectbox-dropdown-bg) !important;
+    color: var(--selectbox-dropdown-text) !important; /* CRITICAL */
+}}
+div[data-baseweb="popover"] ul li:hover {{
+    background-color: var(--selectbox-dropdown-hover-bg) !important;
+}}
+/* Radio button option text (CRITICAL FOR VISIBILITY) */
+div[data-testid="stRadio"] label span {{
+    font-size: 0.95em;
+    color: var(--input-text) !important; /* CRITICAL */
+    padding-left: 4px; /* Space from radio circle */
+}}
+
+
+/* --- Button Styling (CRITICAL FOR VISIBILITY) --- */
+.stButton>button {{
+    border-radius: 6px; padding: 10px 18px; font-weight: 500; /* Balanced weight */
+    font-size: 0.95em;
+    transition: all 0.2s ease-in-out; border: none;
+    box-shadow: var(--shadow-soft);
+    line-height: 1.5;
+}}
+.stButton>button:hover {{
+    transform: translateY(-1px); /* Subtle hover */
+    box-shadow: var(--shadow-medium);
+}}
+.stButton>button.primary-action {{ /* Used for Calculate button via CSS */
+    background-color: var(--button-primary-bg); color: var(--button-primary-text) !important; /* CRITICAL text color */
+}}
+.stButton>button.primary-action:hover {{ background-color: var(--button-primary-hover-bg); }}
+
+.stButton>button.secondary-action {{ /* Used for Reset button via CSS */
+    background-color: var(--button-secondary-bg); color: var(--button-secondary-text) !important; /* CRITICAL text color */
+}}
+.stButton>button.secondary-action:hover {{ background-color: var(--button-secondary-hover-bg); }}
+
+/* Theme Switcher Button */
+.stButton>button.theme-button {{
+    background-color: var(--theme-button-bg); color: var(--theme-button-text) !important; /* CRITICAL text color */
+    border: 1px solid var(--theme-button-border);
+    padding: 6px 12px; font-size: 0.9em;
+}}
+.stButton>button.theme-button:hover {{ background-color: var(--theme-button-hover-bg); }}
+
+/* --- Cost Breakdown Specific --- */
+.cost-breakdown ul {{ list-style-type: none; padding-left: 0; }}
+.cost-breakdown li {{
+    padding: 10px 5px; border-bottom: 1px solid var(--border-color);
+    font-size: 1em; display: flex; justify-content: space-between; align-items: center;
+    transition: background-color 0.15s ease;
+}}
+.cost-breakdown li:hover {{ background-color: var(--card-bg-color); }} /* Subtle hover, match card for light, distinct for dark */
+.cost-breakdown li:last-child {{ border-bottom: none; }}
+.cost-breakdown strong {{
+    color: var(--success-text) !important; /* CRITICAL: Ensure success text is visible */
+    font-weight: 500; font-size: 1.05em;
+}}
+
+/* --- Horizontal Rule & Footer --- */
+.custom-hr {{
+    border: none; height: 1px;
+    background-color: var(--border-color); /* Solid, clean line */
+    margin: 35px 0;
+}}
+.footer {{
+    text-align: center; color: var(--text-secondary);
+    font-size: 0.85em; /* Slightly smaller footer */
+    padding: 20px 0; margin-top: 25px;
+    border-top: 1px solid var(--border-color);
+}}
+.footer strong {{ color: var(--accent-secondary); }}
+</style>
+"""
+
+@lru_cache(maxsize=None)
+def get_css(theme_mode):
+    return get_theme_css(theme_mode) + get_base_css()